@@ -1 +1,4 @@
-from .agent import root_agent
\ No newline at end of file
+from adk_extras.lazy import lazy_exports
+
+# root_agent (e tudo o que o agente importa) só é carregado quando alguém o pede, ex.: o adk web
+__getattr__ = lazy_exports(__name__, {"root_agent": ".agent"})
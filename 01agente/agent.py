@@ -1,20 +1,32 @@
 from dotenv import load_dotenv
-import os
 from google.adk.agents import LlmAgent
 from google.adk.tools import google_search
 
+from adk_extras.lazy import lazy_factory
+from adk_extras.semantic_cache import default_semantic_cache
+from adk_extras.tracing import default_tracer, instrument
+
 load_dotenv()
 
+# Só mede quando ADK_TRACE está definido
+tracer = default_tracer()
+
+
+def build_root_agent() -> LlmAgent:
+    """Monta o agente; chamado no primeiro acesso a ``root_agent``."""
+    agent = LlmAgent(
+        name="Pesquisador",
+        model="gemini-2.0-flash",
+        description="""
+        Você é um assistente de pesquisa.
+        """,
+        instruction="""
+        Você é um assistente de pesquisa.
+        """,
+        tools=[google_search],
+        **default_semantic_cache().callbacks("pesquisa"),
+    )
+    return instrument(agent, tracer)
 
 
-root_agent = LlmAgent(
-    name="Pesquisador",
-    model="gemini-2.0-flash",
-    description="""
-    Você é um assistente de pesquisa.
-    """,
-    instruction="""
-    Você é um assistente de pesquisa.
-    """,
-    tools=[google_search]
-) 
+__getattr__ = lazy_factory(__name__, "root_agent", build_root_agent)
@@ -3,51 +3,104 @@ import os
 from google.adk.agents import LlmAgent, SequentialAgent
 from google.adk.tools import google_search
 
+from adk_extras.cascade import stage_cascade
+from adk_extras.compaction import CompactionStage
+from adk_extras.lazy import lazy_factory
+from adk_extras.semantic_cache import default_semantic_cache, state_value
+from adk_extras.tracing import default_tracer, instrument
+
+from .entity_index import FastPathExtractor, is_entity_answer
+
 load_dotenv()
 
-extracao_entidade = LlmAgent(
-    name="extrator_de_entidade",
-    model="gemini-2.0-flash",
-    description="""
-    Você é um assistente de extração de entidade.
-    """,
-    instruction="""
-    A cada requisição do usuário extraia a entidade que o mesmo esta pesquisando.
-    """,
-    output_key="entidade",
-)
-
-pesquisador = LlmAgent(
-    name="pesquisador",
-    model="gemini-2.0-flash",
-    description="""
-    Você é um assistente de pesquisa que busca a partir de entidades.
-    """,
-    instruction="""
-    Você é um assistente de pesquisa que busca a partir de {entidade}.
-    """,
-    tools=[google_search],
-    output_key="pesquisa",
-) 
-
-
-sumarizador = LlmAgent(
-    name="sumarizador",
-    model="gemini-2.0-flash",
-    description="""
-    Você é um assistente de sumarização.
-    """,
-    instruction="""
-    Você é um assistente de sumarização que resumir a partir de {pesquisa}.
-    """,
-    output_key="sumario"
-) 
-
-
-root_agent = SequentialAgent(
-    name="Pesquisador",
-    description="""
-    Você é um assistente de pesquisa.
-    """,
-    sub_agents=[extracao_entidade, pesquisador, sumarizador]
-) 
+# Orçamento de tokens da pesquisa no prompt do sumarizador
+MAX_TOKENS_PESQUISA = int(os.getenv("PESQUISA_MAX_TOKENS", "1500"))
+
+# Callbacks de tempo e tokens por etapa, com ADK_TRACE=1
+tracer = default_tracer()
+
+
+def build_root_agent() -> SequentialAgent:
+    """
+    Monta o pipeline; chamado no primeiro acesso a ``root_agent``.
+    PIPELINE_MODE=paralelo executa uma pesquisa por entidade em paralelo (ver agent_paralelo.py)
+    """
+    if os.getenv("PIPELINE_MODE") == "paralelo":
+        from .agent_paralelo import build_pipeline
+        return build_pipeline()
+
+    # Respostas de consultas parecidas são reaproveitadas por etapa (ver adk_extras/semantic_cache.py)
+    cache = default_semantic_cache()
+
+    extracao_entidade = LlmAgent(
+        name="extrator_de_entidade",
+        # Modelo mais barato primeiro; sobe de modelo só quando a resposta não é uma entidade
+        model=stage_cascade("extract", route="extrator_de_entidade", validator=is_entity_answer),
+        description="""
+        Você é um assistente de extração de entidade.
+        """,
+        instruction="""
+        A cada requisição do usuário extraia a entidade que o mesmo esta pesquisando.
+        """,
+        output_key="entidade",
+        **cache.callbacks("entidade"),
+    )
+
+    extrator_rapido = FastPathExtractor(
+        name="extrator_rapido",
+        description="""
+        Extrai a entidade com um índice local e só recorre ao LLM quando não a reconhece.
+        """,
+        fallback=extracao_entidade,
+        output_key="entidade",
+    )
+
+    pesquisador = LlmAgent(
+        name="pesquisador",
+        model="gemini-2.0-flash",
+        description="""
+        Você é um assistente de pesquisa que busca a partir de entidades.
+        """,
+        instruction="""
+        Você é um assistente de pesquisa que busca a partir de {entidade}.
+        """,
+        tools=[google_search],
+        output_key="pesquisa",
+        **cache.callbacks("pesquisa", key=state_value("entidade")),
+    ) 
+
+    sumarizador = LlmAgent(
+        name="sumarizador",
+        model="gemini-2.0-flash",
+        description="""
+        Você é um assistente de sumarização.
+        """,
+        instruction="""
+        Você é um assistente de sumarização que resumir a partir de {pesquisa_compacta}.
+        """,
+        output_key="sumario",
+        **cache.callbacks("sumario"),
+    ) 
+
+    # Tira frases repetidas da pesquisa e a limita ao orçamento antes do sumarizador
+    compactador = CompactionStage(
+        name="compactador_pesquisa",
+        description="""
+        Compacta a pesquisa para o sumarizador.
+        """,
+        source_key="pesquisa",
+        output_key="pesquisa_compacta",
+        max_tokens=MAX_TOKENS_PESQUISA,
+    )
+
+    pipeline = SequentialAgent(
+        name="Pesquisador",
+        description="""
+        Você é um assistente de pesquisa.
+        """,
+        sub_agents=[extrator_rapido, pesquisador, compactador, sumarizador]
+    )
+    return instrument(pipeline, tracer)
+
+
+__getattr__ = lazy_factory(__name__, "root_agent", build_root_agent)
@@ -0,0 +1,123 @@
+from dotenv import load_dotenv
+import os
+from google.adk.agents import LlmAgent, SequentialAgent
+from google.adk.tools import google_search
+
+from adk_extras.compaction import CompactionStage
+from adk_extras.lazy import lazy_factory
+from adk_extras.semantic_cache import default_semantic_cache
+from adk_extras.tracing import default_tracer, instrument
+
+from .entity_index import FastPathExtractor
+from .fanout import FanOutAgent
+
+load_dotenv()
+
+MAX_CONCORRENCIA = int(os.getenv("PESQUISA_MAX_CONCORRENCIA", "4"))
+MAX_TOKENS_PESQUISA = int(os.getenv("PESQUISA_MAX_TOKENS", "1500"))
+
+# Com ADK_TRACE=1 cada pesquisa paralela aparece como um agente no resumo
+tracer = default_tracer()
+
+
+def build_pipeline(
+    model="gemini-2.0-flash", tools=None, max_concurrency=MAX_CONCORRENCIA, use_cache=True,
+    max_tokens=MAX_TOKENS_PESQUISA,
+):
+    """
+    Monta o pipeline com uma pesquisa por entidade, executadas em paralelo.
+
+    ``use_cache=False`` desliga o cache semântico das etapas (usado nos benchmarks).
+    ``max_tokens`` é o orçamento das pesquisas juntas no prompt do sumarizador.
+    """
+    tools = [google_search] if tools is None else tools
+
+    def cached(stage, key=None, namespace=None):
+        return default_semantic_cache().callbacks(stage, key, namespace) if use_cache else {}
+
+    extrator_entidades = LlmAgent(
+        name="extrator_de_entidades",
+        model=model,
+        description="""
+        Você é um assistente de extração de entidades.
+        """,
+        instruction="""
+        A cada requisição do usuário extraia todas as entidades que o mesmo esta pesquisando.
+        Responda apenas com uma lista JSON de strings, por exemplo: ["entidade 1", "entidade 2"].
+        """,
+        output_key="entidades",
+        **cached("entidades"),
+    )
+
+    extrator_rapido = FastPathExtractor(
+        name="extrator_rapido",
+        description="""
+        Extrai as entidades com um índice local e só recorre ao LLM quando não as reconhece.
+        """,
+        fallback=extrator_entidades,
+        output_key="entidades",
+        as_list=True,
+    )
+
+    def pesquisador(indice: int, entidade: str) -> LlmAgent:
+        # Criado a cada requisição, fora de sub_agents: o instrument do pipeline não chega aqui
+        agente = LlmAgent(
+            name=f"pesquisador_{indice}",
+            model=model,
+            description="""
+            Você é um assistente de pesquisa que busca a partir de entidades.
+            """,
+            instruction=lambda ctx: f"Você é um assistente de pesquisa que busca a partir de {entidade}.",
+            tools=tools,
+            output_key=f"pesquisa_{indice}",
+            # Um pesquisador por posição, mas a mesma pesquisa: todos compartilham as entradas
+            **cached("pesquisa", key=lambda ctx: entidade, namespace="pesquisador"),
+        )
+        return instrument(agente, tracer)
+
+    pesquisas = FanOutAgent(
+        name="pesquisas_paralelas",
+        description="""
+        Executa uma pesquisa por entidade em paralelo.
+        """,
+        items_key="entidades",
+        output_key="pesquisa",
+        branch_factory=pesquisador,
+        max_concurrency=max_concurrency,
+    )
+
+    sumarizador = LlmAgent(
+        name="sumarizador",
+        model=model,
+        description="""
+        Você é um assistente de sumarização.
+        """,
+        instruction="""
+        Você é um assistente de sumarização que resumir a partir de {pesquisa_compacta}.
+        """,
+        output_key="sumario",
+        **cached("sumario"),
+    )
+
+    # As pesquisas das entidades costumam repetir frases; o sumarizador recebe cada uma uma vez só
+    compactador = CompactionStage(
+        name="compactador_pesquisa",
+        description="""
+        Compacta as pesquisas para o sumarizador.
+        """,
+        source_key="pesquisa",
+        output_key="pesquisa_compacta",
+        max_tokens=max_tokens,
+    )
+
+    pipeline = SequentialAgent(
+        name="Pesquisador",
+        description="""
+        Você é um assistente de pesquisa.
+        """,
+        sub_agents=[extrator_rapido, pesquisas, compactador, sumarizador]
+    )
+    return instrument(pipeline, tracer)
+
+
+__getattr__ = lazy_factory(__name__, "root_agent", build_pipeline)
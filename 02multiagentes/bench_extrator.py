@@ -0,0 +1,72 @@
+"""
+Benchmark: taxa de acerto do extrator rápido e latência economizada.
+
+Roda um corpus de consultas pelo FastPathExtractor com um LLM simulado como
+fallback, sem rede:
+
+    python -m 02multiagentes.bench_extrator --latency 0.4
+"""
+import argparse
+import asyncio
+import time
+
+from google.adk.agents import LlmAgent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from adk_extras.fake_llm import FakeLlm
+
+from .entity_index import FastPathExtractor
+
+CONSULTAS = [
+    "Quais as últimas notícias da Apple?",
+    "Me fale sobre o lucro do Itaú no trimestre",
+    "Como está PETR4 hoje?",
+    "Compare Nubank e Bradesco",
+    "O que a Nvidia anunciou esta semana?",
+    "Resuma as novidades do ChatGPT",
+    "Vale a pena investir em HGLG11?",
+    "Quem fundou o Mercado Livre?",
+    "Explique computação quântica",
+    "Qual a melhor linguagem para iniciantes?",
+    "Tesla ou BYD: qual vende mais?",
+    "Como funciona o Bitcoin?",
+    "Novidades da AWS para bancos de dados",
+    "Compare Apple, Microsoft e Rivian",
+]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.4, help="segundos por chamada ao modelo")
+    args = parser.parse_args()
+
+    fallback = LlmAgent(
+        name="extrator_de_entidade",
+        model=FakeLlm(latency=args.latency, responder=lambda request: "entidade"),
+        instruction="Extraia a entidade pesquisada.",
+        output_key="entidade",
+    )
+    extrator = FastPathExtractor(name="extrator_rapido", fallback=fallback, output_key="entidade")
+    session_service = InMemorySessionService()
+    runner = Runner(agent=extrator, app_name="bench", session_service=session_service)
+
+    start = time.perf_counter()
+    for i, consulta in enumerate(CONSULTAS):
+        await session_service.create_session(app_name="bench", user_id="u", session_id=str(i))
+        message = types.Content(role="user", parts=[types.Part(text=consulta)])
+        async for _ in runner.run_async(user_id="u", session_id=str(i), new_message=message):
+            pass
+        session = await session_service.get_session(app_name="bench", user_id="u", session_id=str(i))
+        print(f"{consulta[:45]:<45} -> {session.state['entidade']}")
+    elapsed = time.perf_counter() - start
+
+    stats = extrator.stats.as_dict()
+    print(f"\nconsultas: {len(CONSULTAS)}, tempo total: {elapsed:.3f}s")
+    print(f"taxa de acerto: {stats['hit_rate']:.0%}, latência economizada: {stats['saved_seconds']:.3f}s")
+    print(stats)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""
+Benchmark: latência ponta a ponta vs. número de entidades, com LLM simulado.
+
+Compara o fan-out sequencial (max_concurrency=1) com o paralelo usando o mesmo
+pipeline de agent_paralelo.py, sem rede nem chave de API:
+
+    python -m 02multiagentes.bench_fanout --latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from adk_extras.fake_llm import FakeLlm
+
+from .agent_paralelo import build_pipeline
+
+
+def responder_for(entities: int):
+    def responder(llm_request) -> str:
+        instruction = str(llm_request.config.system_instruction or "")
+        if "lista JSON" in instruction:
+            return json.dumps([f"Empresa {i}" for i in range(entities)])
+        return "Texto gerado pelo modelo simulado."
+    return responder
+
+
+async def run_once(entities: int, latency: float, max_concurrency: int) -> float:
+    model = FakeLlm(latency=latency, responder=responder_for(entities))
+    agent = build_pipeline(model=model, tools=[], max_concurrency=max_concurrency, use_cache=False)
+    session_service = InMemorySessionService()
+    await session_service.create_session(app_name="bench", user_id="u", session_id="s")
+    runner = Runner(agent=agent, app_name="bench", session_service=session_service)
+
+    message = types.Content(role="user", parts=[types.Part(text="Compare as empresas.")])
+    start = time.perf_counter()
+    async for _ in runner.run_async(user_id="u", session_id="s", new_message=message):
+        pass
+    elapsed = time.perf_counter() - start
+
+    session = await session_service.get_session(app_name="bench", user_id="u", session_id="s")
+    assert session.state["pesquisa"].count("## ") == entities
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.2, help="segundos por chamada ao modelo")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--entities", default="1,2,4,8")
+    args = parser.parse_args()
+
+    print(f"{'entidades':>9} {'sequencial (s)':>15} {'paralelo (s)':>13}")
+    for entities in (int(n) for n in args.entities.split(",")):
+        sequential = await run_once(entities, args.latency, 1)
+        parallel = await run_once(entities, args.latency, args.concurrency)
+        print(f"{entities:>9} {sequential:>15.3f} {parallel:>13.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,236 @@
+import json
+import logging
+import os
+import re
+import time
+import unicodedata
+from functools import lru_cache
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+from pydantic import Field, PrivateAttr
+
+logger = logging.getLogger(__name__)
+
+ENTIDADES_PADRAO = os.path.join(os.path.dirname(__file__), "entidades.json")
+
+# Tickers da B3 (PETR4, HGLG11) e tickers em formato $AAPL
+_TICKER = re.compile(r"\$([A-Z]{1,5})\b|\b([A-Z]{4}(?:3|4|5|6|11|34))\b")
+# Apelidos até esse tamanho (ETH, BTC, MELI) só valem com a grafia exata: em
+# minúsculas eles aparecem dentro de palavras comuns e de texto corrido.
+MAX_APELIDO_CURTO = 4
+_PALAVRA = re.compile(r"[^\W_][\w&.'-]*")
+# Palavra com maiúscula fora do início da frase, sigla (BYD) ou caixa mista (iPhone, eBay)
+_NOME_PROPRIO = re.compile(r"[A-ZÀ-Ý][\w&'-]*|[a-zà-ÿ]+[A-ZÀ-Ý][\w&'-]*")
+_SIGLA = re.compile(r"[A-ZÀ-Ý0-9&]{2,}")
+_INICIO_DE_FRASE = re.compile(r"(?:^|[.!?:;\n]\s*|[\"'(«“]\s*)$")
+# Um termo ligado a uma entidade por estas palavras é outro assunto: "Tesla ou byd"
+_CONECTIVOS = {"e", "ou", "vs", "vs.", "versus", "x", "contra", "com", "nem"}
+_ARTIGOS = {"o", "a", "os", "as", "do", "da", "dos", "das", "de", "no", "na", "um", "uma"}
+
+
+def _fold(text: str) -> str:
+    """Minúsculas e sem acentos, preservando o comprimento do texto."""
+    return _strip_accents(text).lower()
+
+
+def _strip_accents(text: str) -> str:
+    decomposed = unicodedata.normalize("NFD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _alternation(aliases) -> str:
+    # Apelidos mais longos primeiro, para "Itaú Unibanco" ganhar de "Itaú".
+    return "|".join(re.escape(alias) for alias in sorted(aliases, key=len, reverse=True))
+
+
+class EntityIndex:
+    """
+    Índice pré-compilado de entidades conhecidas. Recebe ``{nome: [apelidos]}``;
+    só os apelidos são procurados, então nomes que também são palavras comuns
+    ("Vale", "Meta") devem aparecer apenas em formas inequívocas. Produtos
+    (AWS, Instagram) são entidades próprias, não apelidos da empresa dona.
+    """
+
+    def __init__(self, entities: dict):
+        self._canonical = {}
+        self._short = {}
+        for name, aliases in entities.items():
+            for alias in aliases:
+                if len(alias) <= MAX_APELIDO_CURTO:
+                    self._short[_strip_accents(alias)] = name
+                else:
+                    self._canonical[_fold(alias)] = name
+        self._pattern = re.compile(rf"(?<!\w)(?:{_alternation(self._canonical)})(?!\w)")
+        self._short_pattern = re.compile(rf"(?<!\w)(?:{_alternation(self._short)})(?!\w)") if self._short else None
+
+    @classmethod
+    def from_file(cls, path: str) -> "EntityIndex":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def match(self, text: str) -> list:
+        """Entidades citadas no texto, na ordem em que aparecem e sem repetição."""
+        return self.scan(text)[0]
+
+    def scan(self, text: str) -> tuple:
+        """
+        Entidades citadas no texto e os termos que parecem entidades mas não estão no índice.
+        :param text: mensagem do usuário
+        :return: ``(entidades, termos_sem_entidade)``; com termos sobrando a extração local está incompleta
+        """
+        found = [(m.start(), m.end(), self._canonical[m.group(0)]) for m in self._pattern.finditer(_fold(text))]
+        if self._short_pattern:
+            found += [
+                (m.start(), m.end(), self._short[m.group(0)])
+                for m in self._short_pattern.finditer(_strip_accents(text))
+            ]
+        for m in _TICKER.finditer(text):
+            ticker = m.group(1) or m.group(2)
+            found.append((m.start(), m.end(), self._canonical.get(_fold(ticker), self._short.get(ticker, ticker))))
+        found.sort()
+        entities = list(dict.fromkeys(name for _, _, name in found))
+        return entities, self._unmatched(text, [(start, end) for start, end, _ in found])
+
+    @staticmethod
+    def _unmatched(text: str, spans: list) -> list:
+        """Nomes próprios fora das entidades reconhecidas, e termos ligados a elas por "e", "ou", "vs"."""
+        words = [(m.start(), m.end(), m.group(0)) for m in _PALAVRA.finditer(text)]
+        covered = [any(start < end_ and end > start_ for start_, end_ in spans) for start, end, _ in words]
+        residual = []
+        for i, (start, end, word) in enumerate(words):
+            if covered[i]:
+                continue
+            word = word.rstrip(".'")
+            if _SIGLA.fullmatch(word) and not word.isdigit():
+                residual.append(word)
+            elif _NOME_PROPRIO.fullmatch(word) and not _INICIO_DE_FRASE.search(text[:start]):
+                residual.append(word)
+            elif word.lower() not in _ARTIGOS | _CONECTIVOS and _linked_to_entity(words, covered, i):
+                residual.append(word)
+        return residual
+
+
+def _linked_to_entity(words: list, covered: list, i: int) -> bool:
+    """A palavra ``i`` está a um conectivo (e artigos) de distância de uma entidade reconhecida."""
+    for step in (-1, 1):
+        j = i + step
+        while 0 <= j < len(words) and words[j][2].lower() in _ARTIGOS:
+            j += step
+        if not (0 <= j < len(words)) or words[j][2].lower() not in _CONECTIVOS:
+            continue
+        j += step
+        while 0 <= j < len(words) and words[j][2].lower() in _ARTIGOS:
+            j += step
+        if 0 <= j < len(words) and covered[j]:
+            return True
+    return False
+
+
+@lru_cache(maxsize=None)
+def default_index() -> EntityIndex:
+    """Índice carregado uma única vez de ENTIDADES_ARQUIVO (ou entidades.json)."""
+    return EntityIndex.from_file(os.getenv("ENTIDADES_ARQUIVO", ENTIDADES_PADRAO))
+
+
+MAX_PALAVRAS_ENTIDADE = 8
+
+
+def is_entity_answer(text: str) -> bool:
+    """
+    Valida a saída do extrator LLM: uma entidade curta numa linha só, e não uma frase explicando a resposta.
+    :param text: resposta do modelo
+    """
+    text = text.strip().strip("'\"")
+    return bool(text) and "\n" not in text and len(text.split()) <= MAX_PALAVRAS_ENTIDADE and not text.endswith((".", ":"))
+
+
+class ExtractorStats:
+    """Contadores de acertos do caminho rápido e da latência economizada."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.local_seconds = 0.0
+        self.llm_seconds = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def saved_seconds(self) -> float:
+        """Estimativa: acertos vezes a latência média observada no LLM."""
+        if not self.misses:
+            return 0.0
+        return self.hits * (self.llm_seconds / self.misses) - self.local_seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "local_seconds": round(self.local_seconds, 6),
+            "llm_seconds": round(self.llm_seconds, 3),
+            "saved_seconds": round(self.saved_seconds, 3),
+        }
+
+
+class FastPathExtractor(BaseAgent):
+    """
+    Extrai as entidades da mensagem do usuário com o índice local e grava
+    ``state[output_key]`` direto. Chama o agente LLM ``fallback`` quando
+    nenhuma entidade conhecida é encontrada ou quando sobra na mensagem algum
+    nome que o índice não reconhece ("Tesla ou BYD"): a extração local seria
+    parcial.
+    """
+
+    fallback: BaseAgent
+    output_key: str
+    as_list: bool = False
+    """Grava uma lista JSON (pipeline paralelo) em vez de um texto único."""
+    index: EntityIndex = Field(default_factory=default_index)
+
+    _stats: ExtractorStats = PrivateAttr(default_factory=ExtractorStats)
+
+    def model_post_init(self, __context) -> None:
+        if not self.sub_agents:
+            self.sub_agents = [self.fallback]
+        super().model_post_init(__context)
+
+    @property
+    def stats(self) -> ExtractorStats:
+        return self._stats
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        text = ""
+        if ctx.user_content and ctx.user_content.parts:
+            text = "".join(part.text or "" for part in ctx.user_content.parts)
+
+        start = time.perf_counter()
+        entities, unmatched = self.index.scan(text)
+        self._stats.local_seconds += time.perf_counter() - start
+
+        if entities and not unmatched:
+            self._stats.hits += 1
+            value = json.dumps(entities, ensure_ascii=False) if self.as_list else ", ".join(entities)
+            logger.info("extrator rápido: %s %s", entities, self._stats.as_dict())
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                content=types.Content(role="model", parts=[types.Part(text=value)]),
+                actions=EventActions(state_delta={self.output_key: value}),
+            )
+            return
+
+        self._stats.misses += 1
+        start = time.perf_counter()
+        async for event in self.fallback.run_async(ctx):
+            yield event
+        self._stats.llm_seconds += time.perf_counter() - start
+        logger.info("extrator rápido: sem entidade conhecida (sobrou %s), usou o LLM %s", unmatched, self._stats.as_dict())
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import re
+from typing import AsyncGenerator, Callable
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+
+MAX_ITEMS = 8
+
+
+class FanOutAgent(BaseAgent):
+    """
+    Executa um agente por item da lista em ``state[items_key]``, em paralelo e com
+    limite de concorrência, e junta as saídas em ``state[output_key]``.
+
+    Diferente do ``ParallelAgent``, os ramos são criados a cada requisição por
+    ``branch_factory(indice, item)``, que deve devolver um agente com ``output_key``.
+    """
+
+    items_key: str
+    output_key: str
+    branch_factory: Callable[[int, str], LlmAgent]
+    max_concurrency: int = 4
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        items = parse_items(ctx.session.state.get(self.items_key))
+        branches = [self.branch_factory(i, item) for i, item in enumerate(items)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        outputs = {}
+
+        runs = [self._run_branch(branch, ctx, semaphore) for branch in branches]
+        async for event in merge_runs(runs):
+            for branch in branches:
+                if branch.output_key in event.actions.state_delta:
+                    outputs[branch.output_key] = event.actions.state_delta[branch.output_key]
+            yield event
+
+        merged = "\n\n".join(
+            f"## {item}\n{outputs.get(branch.output_key, '')}" for item, branch in zip(items, branches)
+        )
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={self.output_key: merged}),
+        )
+
+    async def _run_branch(
+        self, agent: BaseAgent, ctx: InvocationContext, semaphore: asyncio.Semaphore
+    ) -> AsyncGenerator[Event, None]:
+        # Cada ramo recebe um histórico isolado, como no ParallelAgent.
+        branch_ctx = ctx.model_copy()
+        suffix = f"{self.name}.{agent.name}"
+        branch_ctx.branch = f"{ctx.branch}.{suffix}" if ctx.branch else suffix
+        async with semaphore:
+            async for event in agent.run_async(branch_ctx):
+                yield event
+
+
+async def merge_runs(runs: list) -> AsyncGenerator[Event, None]:
+    """
+    Intercala os eventos de vários geradores na ordem em que ficam prontos.
+
+    Cada gerador roda inteiro dentro de uma única task (o tracing do ADK exige
+    isso) e só avança depois que o evento anterior foi consumido pelo runner.
+    """
+    queue = asyncio.Queue()
+    finished = object()
+
+    async def drive(run):
+        try:
+            async for event in run:
+                consumed = asyncio.get_running_loop().create_future()
+                await queue.put((event, consumed))
+                await consumed
+        except Exception as e:
+            await queue.put((e, None))
+        finally:
+            await queue.put((finished, None))
+
+    tasks = [asyncio.create_task(drive(run)) for run in runs]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            item, consumed = await queue.get()
+            if item is finished:
+                remaining -= 1
+                continue
+            if isinstance(item, Exception):
+                raise item
+            yield item
+            consumed.set_result(None)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def parse_items(value) -> list:
+    """Aceita uma lista, um JSON de lista ou texto separado por vírgulas/linhas."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        text = re.sub(r"^```\w*|```$", "", value.strip(), flags=re.MULTILINE).strip()
+        try:
+            value = json.loads(text)
+        except ValueError:
+            value = re.split(r"[\n,;]+", text)
+    if isinstance(value, str):
+        value = [value]
+
+    items = {}
+    for item in value:
+        item = str(item).strip().lstrip("-*• ").strip().strip("'\"")
+        if item:
+            items[item] = None
+    return list(items)[:MAX_ITEMS]
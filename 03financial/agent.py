@@ -1,97 +1,124 @@
+from typing import TYPE_CHECKING
+
 from dotenv import load_dotenv
-from google.adk.agents import LlmAgent, ParallelAgent, SequentialAgent
-from google.adk.tools import google_search
+
+from adk_extras.lazy import lazy_factory
+from adk_extras.tracing import default_tracer, instrument
+from fii_data import compare_fiis, extract_tickers, get_fii_data, get_fii_history, is_ticker_list
+
+if TYPE_CHECKING:
+    from google.adk.agents import SequentialAgent
 
 load_dotenv()
 
-def get_fii_data(tickers_string: str) -> dict:
-    """
-    Retrieves the current data for multiple Brazilian Real Estate Investment Funds (FIIs).
-
-    Args:
-        tickers_string: A string with FII ticker symbols separated by commas (e.g., "HGLG11,KNRI11,XPLG11")
-
-    Returns:
-        Dictionary with ticker symbols as keys and their respective information as values,
-        including current price, daily high/low, dividend yield and fund name.
-    """
-    import yfinance as yf
-    result = {}
-    tickers = [ticker.strip() for ticker in tickers_string.split(',')]
-    
-    for ticker in tickers:
-        if not ticker:
-            continue
-        try:
-            fii = yf.Ticker(f"{ticker}.SA")
-            info = fii.info
-            price_data = fii.history(period="1d")
-
-            result[ticker] = {
-                "fund_name": info.get('longName', 'Unknown'),
-                "current_price": float(price_data['Close'].iloc[-1]),
-                "daily_high": float(price_data['High'].iloc[-1]),
-                "daily_low": float(price_data['Low'].iloc[-1]),
-                "dividend_yield": info.get('dividendYield', 0.0),
-                "currency": "BRL",
-                "ticker": ticker
-            }
-        except Exception as e:
-            result[ticker] = {
-                "error": f"Failed to retrieve FII information: {str(e)}",
-                "ticker": ticker
-            }
-    
-    return result
-
-
-pesquisador_financeiro = LlmAgent(
-    name="pesquisador_financeiro",
-    model="gemini-2.5-flash",
-    description="""
-    Você é um assistente de pesquisa que identifica tickers de fundos imobiliários (FIIs)
-    com base em uma consulta do usuário.
-    """,
-    instruction="""
-    Com base na consulta do usuário, pesquise na web para encontrar os tickers de FIIs relevantes.
-    Sua resposta DEVE ser uma string única contendo os tickers encontrados, separados por vírgula.
-    Exemplo de saída: 'HGLG11,KNRI11,XPLG11'
-    Não inclua nenhuma outra informação ou formatação na sua resposta, apenas a string de tickers.
-    """,
-    tools=[google_search],
-    output_key="tickers_string",
-)
-
-analista_financeiro = LlmAgent(
-    name="analista_financeiro",
-    model="gemini-2.5-flash",
-    description="""
-    Você é um especialista em FIIs que obtém dados de mercado atualizados para uma lista de tickers.
-    """,
-    instruction="""
-    Utilize a ferramenta 'get_fii_data' para buscar as informações dos tickers de FIIs fornecidos em '{tickers_string}'.
-    """,
-    tools=[get_fii_data],
-    output_key="informacoes_fiis",
-)
-
-redator_relatorio = LlmAgent(
-    name="redator_relatorio",
-    model="gemini-2.5-flash",
-    description="""
-    Você é um assistente de escrita que cria relatórios financeiros detalhados.
-    """,
-    instruction="""
-    Com base nos dados financeiros de FIIs em '{informacoes_fiis}', crie um relatório claro e conciso.
-    O relatório deve apresentar os dados de cada FII de forma organizada, incluindo nome, preço atual,
-    máxima e mínima do dia e dividend yield.
-    Finalize com um breve resumo comparativo.
-    """,
-    output_key="relatorio_final",
-)
-
-root_agent = SequentialAgent(
-    name="fii_advisor_agent",
-    description="Um agente sequencial que pesquisa FIIs, analisa os dados e gera um relatório.",
-    sub_agents=[pesquisador_financeiro, analista_financeiro, redator_relatorio],
-)
\ No newline at end of file
+# Campos de cada ferramenta que o redator usa; o resto não entra no prompt
+CAMPOS_COTACAO = ["ticker", "fund_name", "current_price", "daily_high", "daily_low", "dividend_yield", "currency"]
+CAMPOS_HISTORICO = ["ticker", "period_return", "annualized_volatility", "total_dividends"]
+MAX_TOKENS_DADOS = 2000
+
+# Com ADK_TRACE=1 mede os agentes e as ferramentas (get_fii_data, get_fii_history, ...)
+tracer = default_tracer()
+
+
+def build_root_agent() -> "SequentialAgent":
+    """Monta o pipeline; chamado no primeiro acesso a ``root_agent``."""
+    # O ADK só é importado aqui: importar o módulo (ferramentas, constantes, tracer) não o carrega
+    from google.adk.agents import LlmAgent, ParallelAgent, SequentialAgent
+    from google.adk.tools import google_search
+
+    from adk_extras.cascade import stage_cascade
+    from adk_extras.compaction import CompactionStage, keep_tool_response, reset_state
+
+    pesquisador_financeiro = LlmAgent(
+        name="pesquisador_financeiro",
+        # Só emite a lista de tickers: tenta o modelo barato e sobe quando a saída não passa no formato;
+        # se o modelo responder em prosa, os tickers citados são extraídos sem nova chamada
+        model=stage_cascade("search", route="pesquisador_financeiro", validator=is_ticker_list, repair=extract_tickers),
+        description="""
+        Você é um assistente de pesquisa que identifica tickers de fundos imobiliários (FIIs)
+        com base em uma consulta do usuário.
+        """,
+        instruction="""
+        Com base na consulta do usuário, pesquise na web para encontrar os tickers de FIIs relevantes.
+        Sua resposta DEVE ser uma string única contendo os tickers encontrados, separados por vírgula.
+        Exemplo de saída: 'HGLG11,KNRI11,XPLG11'
+        Não inclua nenhuma outra informação ou formatação na sua resposta, apenas a string de tickers.
+        """,
+        tools=[google_search],
+        output_key="tickers_string",
+    )
+
+    analista_financeiro = LlmAgent(
+        name="analista_financeiro",
+        # Sobe de modelo se o barato errar ou chamar uma ferramenta que não existe
+        model=stage_cascade("tools", route="analista_financeiro"),
+        description="""
+        Você é um especialista em FIIs que obtém dados de mercado atualizados para uma lista de tickers.
+        """,
+        instruction="""
+        Utilize a ferramenta 'get_fii_data' para buscar as informações dos tickers de FIIs fornecidos em '{tickers_string}'.
+        Quando o usuário pedir tendência, volatilidade ou histórico de dividendos, utilize também a ferramenta
+        'get_fii_history' com os mesmos tickers.
+        """,
+        tools=[get_fii_data, get_fii_history],
+        output_key="informacoes_fiis",
+        # Guarda as respostas brutas das ferramentas para a compactação abaixo
+        before_agent_callback=reset_state("dados_fiis", "historico_fiis"),
+        after_tool_callback=[
+            keep_tool_response("dados_fiis", "get_fii_data"),
+            keep_tool_response("historico_fiis", "get_fii_history"),
+        ],
+    )
+
+    # Tabelas compactas no lugar do dicionário bruto: o prompt do redator não cresce com a resposta das ferramentas
+    compactador_dados = CompactionStage(
+        name="compactador_dados",
+        description="Compacta as cotações dos FIIs para o redator.",
+        source_key="dados_fiis",
+        output_key="dados_fiis_compactos",
+        fields=CAMPOS_COTACAO,
+        max_tokens=MAX_TOKENS_DADOS,
+    )
+
+    compactador_historico = CompactionStage(
+        name="compactador_historico",
+        description="Compacta o histórico dos FIIs para o redator.",
+        source_key="historico_fiis",
+        output_key="historico_fiis_compacto",
+        fields=CAMPOS_HISTORICO,
+        max_tokens=MAX_TOKENS_DADOS,
+    )
+
+    redator_relatorio = LlmAgent(
+        name="redator_relatorio",
+        model="gemini-2.5-flash",
+        description="""
+        Você é um assistente de escrita que cria relatórios financeiros detalhados.
+        """,
+        instruction="""
+        Com base nos dados financeiros de FIIs abaixo (uma linha por fundo, colunas separadas por '|'),
+        crie um relatório claro e conciso.
+        {dados_fiis_compactos}
+
+        Histórico no período, quando houver (retorno, volatilidade anualizada e dividendos pagos):
+        {historico_fiis_compacto}
+
+        O relatório deve apresentar os dados de cada FII de forma organizada, incluindo nome, preço atual,
+        máxima e mínima do dia e dividend yield.
+        Finalize com um breve resumo comparativo. Para ele, utilize a ferramenta 'compare_fiis' com os tickers
+        em '{tickers_string}' e narre as métricas retornadas (ranking de yield, amplitude do dia, preço vs.
+        médias móveis, correlação e z-scores) sem recalcular nenhum número.
+        """,
+        tools=[compare_fiis],
+        output_key="relatorio_final",
+    )
+
+    pipeline = SequentialAgent(
+        name="fii_advisor_agent",
+        description="Um agente sequencial que pesquisa FIIs, analisa os dados e gera um relatório.",
+        sub_agents=[pesquisador_financeiro, analista_financeiro, compactador_dados, compactador_historico, redator_relatorio],
+    )
+    return instrument(pipeline, tracer)
+
+
+__getattr__ = lazy_factory(__name__, "root_agent", build_root_agent)
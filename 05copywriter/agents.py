@@ -0,0 +1,107 @@
+# agents.py
+from google.adk import Agent
+from pydantic import BaseModel
+
+# adk_extras fica na raiz do repositório: ela precisa estar no PYTHONPATH (launcher.py já a coloca)
+from adk_extras.structured import structured_model
+from adk_extras.tracing import default_tracer, instrument
+
+MODEL = "gemini-2.0-flash"
+# Com ADK_TRACE=1 mede o modelo e as ferramentas MCP (search_many, scrape_content, ...)
+tracer = default_tracer()
+
+
+class ResearchInsights(BaseModel):
+    """Saída do research_agent; o host pede seções isoladas, então todos os campos são opcionais."""
+
+    topic: str = ""
+    key_insights: list[str] = []
+    competitor_analysis: list[str] = []
+    target_audience_pain_points: list[str] = []
+    trending_keywords: list[str] = []
+    sources: list[str] = []
+
+
+class CopyOutput(BaseModel):
+    """Saída do content_agent; o host pede partes do copy em chamadas separadas."""
+
+    headline: str = ""
+    subheadline: str = ""
+    body_copy: str = ""
+    bullet_points: list[str] = []
+    cta: str = ""
+    social_proof: str = ""
+    urgency_element: str = ""
+
+RESEARCH_INSTRUCTION = """
+    Você é um pesquisador especializado em copywriting. Sua função é:
+    
+    1. Receber tópicos ou produtos para pesquisar
+    2. Usar search_many para buscar vários termos relevantes de uma vez
+    3. Usar scrape_many para extrair detalhes importantes de várias URLs de uma vez
+    4. Analisar concorrentes, tendências e pontos de dor do público
+    5. Retornar insights estruturados em JSON:
+    
+    {
+        "topic": "tópico pesquisado",
+        "key_insights": ["insight 1", "insight 2"],
+        "competitor_analysis": ["análise 1", "análise 2"],
+        "target_audience_pain_points": ["dor 1", "dor 2"],
+        "trending_keywords": ["palavra 1", "palavra 2"],
+        "sources": ["url1", "url2"]
+    }
+"""
+
+CONTENT_INSTRUCTION = """
+    Você é um copywriter expert em conversão. Sua função é:
+    
+    1. Receber insights de pesquisa do research_agent
+    2. Criar copy persuasivo baseado nos dados
+    3. Aplicar técnicas comprovadas de copywriting (AIDA, PAS, etc.)
+    4. Adaptar tom e linguagem para o público-alvo
+    5. Incluir CTAs eficazes
+    
+    Estruture sua resposta em JSON:
+    {
+        "headline": "título principal",
+        "subheadline": "subtítulo",
+        "body_copy": "texto principal",
+        "bullet_points": ["benefício 1", "benefício 2"],
+        "cta": "call to action",
+        "social_proof": "prova social sugerida",
+        "urgency_element": "elemento de urgência"
+    }
+    
+    Use as dores do público e insights dos concorrentes para criar copy único e persuasivo.
+"""
+
+def build_research_agent(tools: list, model=MODEL) -> Agent:
+    """
+    Cria o agente de pesquisa
+    :param tools: ferramentas MCP de busca e scraping
+    :param model: nome do modelo ou instância de BaseLlm
+    :return: agente de pesquisa
+    """
+    agent = Agent(
+        name="research_agent",
+        # JSON validado contra ResearchInsights conforme chega; só o campo quebrado é pedido de novo
+        model=structured_model(model, ResearchInsights),
+        description="Especialista em pesquisa web para copywriting",
+        tools=tools,
+        instruction=RESEARCH_INSTRUCTION,
+    )
+    return instrument(agent, tracer)
+
+def build_content_agent(model=MODEL) -> Agent:
+    """
+    Cria o agente de copy
+    :param model: nome do modelo ou instância de BaseLlm
+    :return: agente de copy
+    """
+    agent = Agent(
+        name="content_agent",
+        model=structured_model(model, CopyOutput),
+        description="Copywriter especialista em conversão",
+        instruction=CONTENT_INSTRUCTION,
+    )
+    return instrument(agent, tracer)
@@ -0,0 +1,342 @@
+# balancer.py
+import asyncio
+import itertools
+import json
+import logging
+import os
+import signal
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+REGISTRY = "/_registry"
+CARD_PATH = "/.well-known/agent.json"
+FAILURE_COOLDOWN = 5
+DRAIN_TIMEOUT = 60
+MAX_SESSIONS = 10_000
+# Cabeçalhos que não atravessam o proxy (hop-by-hop ou recalculados pelo aiohttp)
+HOP_HEADERS = {
+    "connection", "keep-alive", "transfer-encoding", "te", "trailer", "upgrade",
+    "proxy-authorization", "proxy-authenticate", "content-length", "host",
+}
+
+
+class Worker:
+    """Processo de um agente registrado no balanceador, com as rotas que ele atende."""
+
+    def __init__(self, worker_id: str, role: str, routes: dict):
+        self.id = worker_id
+        self.role = role
+        self.routes = routes
+        self.outstanding = 0
+        self.served = 0
+        self.failures = 0
+        self.draining = False
+        self.down_until = 0.0
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+    def available(self, now: float) -> bool:
+        return not self.draining and now >= self.down_until
+
+    def stats(self) -> dict:
+        return {
+            "id": self.id,
+            "role": self.role,
+            "routes": self.routes,
+            "outstanding": self.outstanding,
+            "served": self.served,
+            "failures": self.failures,
+            "draining": self.draining,
+        }
+
+
+class LoadBalancer:
+    """
+    Balanceador e registro local dos agentes A2A.
+
+    Cada worker se registra com as rotas que atende (prefixo do caminho → URL
+    base do processo, por exemplo ``/research_agent`` e
+    ``/research_agent/stream``). Cada requisição vai para o worker disponível
+    com menos requisições em andamento; pedidos com um ``session_id`` já
+    visto seguem para o mesmo worker, que guarda a sessão em memória. O
+    agent card (``{prefixo}/.well-known/agent.json``) é buscado num worker e
+    devolvido com a URL do balanceador, então o host resolve os agentes por
+    aqui. Um worker em drenagem não recebe novas requisições e sai do
+    registro quando as que estão em andamento terminam.
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 9000, public_url: str = None):
+        self.host = host
+        self.port = port
+        self.public_url = public_url
+        self.workers = {}
+        self.sessions = OrderedDict()
+        self.app = web.Application()
+        self.app.router.add_get(REGISTRY, self._list)
+        self.app.router.add_post(f"{REGISTRY}/register", self._register)
+        self.app.router.add_post(f"{REGISTRY}/drain", self._drain)
+        self.app.router.add_route("*", "/{path:.*}", self._proxy)
+        self._runner = None
+        self._session = None
+        self._tiebreak = itertools.count()
+
+    @property
+    def url(self) -> str:
+        return self.public_url or f"http://127.0.0.1:{self.port}"
+
+    async def start(self):
+        connector = aiohttp.TCPConnector(limit=0, keepalive_timeout=60)
+        self._session = aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=None), auto_decompress=False
+        )
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        # Com porta 0 o sistema escolhe uma livre; guarda a porta real.
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+        if self._session is not None:
+            await self._session.close()
+
+    def register(self, worker_id: str, role: str, routes: dict) -> Worker:
+        worker = Worker(worker_id, role, routes)
+        self.workers[worker_id] = worker
+        logger.info("Worker %s (%s) registrado: %s", worker_id, role, routes)
+        return worker
+
+    async def drain(self, worker_id: str, timeout: float = DRAIN_TIMEOUT) -> bool:
+        """
+        Para de enviar requisições ao worker e espera as que estão em andamento
+        :param worker_id: id informado no registro
+        :param timeout: segundos máximos de espera
+        :return: True se o worker terminou tudo dentro do prazo
+        """
+        worker = self.workers.get(worker_id)
+        if worker is None:
+            return True
+        worker.draining = True
+        try:
+            await asyncio.wait_for(worker.idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.workers.pop(worker_id, None)
+            logger.info("Worker %s drenado (%d em andamento)", worker_id, worker.outstanding)
+
+    def stats(self) -> list:
+        return [worker.stats() for worker in self.workers.values()]
+
+    def _match(self, path: str) -> Optional[str]:
+        """Prefixo registrado mais longo que atende o caminho."""
+        best = None
+        for worker in self.workers.values():
+            for prefix in worker.routes:
+                if (path == prefix or path.startswith(prefix + "/")) and (best is None or len(prefix) > len(best)):
+                    best = prefix
+        return best
+
+    def _pick(self, prefix: str, session_id: str = None, exclude=()) -> Optional[Worker]:
+        now = time.monotonic()
+        candidates = [
+            worker for worker in self.workers.values()
+            if prefix in worker.routes and worker.id not in exclude and worker.available(now)
+        ]
+        if not candidates:
+            return None
+        if session_id:
+            pinned = self.workers.get(self.sessions.get((prefix, session_id)))
+            if pinned in candidates:
+                self.sessions.move_to_end((prefix, session_id))
+                return pinned
+        # Menos requisições em andamento; empate decidido em rodízio.
+        worker = min(candidates, key=lambda w: (w.outstanding, w.served, next(self._tiebreak)))
+        if session_id:
+            self.sessions[(prefix, session_id)] = worker.id
+            if len(self.sessions) > MAX_SESSIONS:
+                self.sessions.popitem(last=False)
+        return worker
+
+    async def _list(self, request: web.Request) -> web.Response:
+        return web.json_response({"workers": self.stats()})
+
+    async def _register(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        worker = self.register(data.get("id") or uuid.uuid4().hex, data["role"], data["routes"])
+        return web.json_response({"id": worker.id})
+
+    async def _drain(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        drained = await self.drain(data["id"], float(data.get("timeout", DRAIN_TIMEOUT)))
+        return web.json_response({"id": data["id"], "drained": drained})
+
+    async def _proxy(self, request: web.Request) -> web.StreamResponse:
+        path = request.path
+        card = path.endswith(CARD_PATH)
+        prefix = self._match(path[: -len(CARD_PATH)] if card else path)
+        if prefix is None:
+            raise web.HTTPNotFound(text=f"Nenhum agente registrado para {path}")
+        body = await request.read()
+        session_id = _session_id(body)
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_HEADERS}
+
+        tried = set()
+        while True:
+            worker = self._pick(prefix, session_id, exclude=tried)
+            if worker is None:
+                raise web.HTTPServiceUnavailable(text=f"Nenhum worker disponível para {prefix}")
+            target = worker.routes[prefix].rstrip("/") + request.path_qs
+            worker.outstanding += 1
+            worker.idle.clear()
+            try:
+                upstream = await self._session.request(request.method, target, data=body, headers=headers)
+            except aiohttp.ClientError as e:
+                # Nada foi enviado ao cliente ainda: tenta outro worker.
+                self._release(worker)
+                worker.failures += 1
+                worker.down_until = time.monotonic() + FAILURE_COOLDOWN
+                tried.add(worker.id)
+                logger.warning("Worker %s indisponível (%s), tentando outro", worker.id, e)
+                continue
+            try:
+                if card:
+                    return await self._card(upstream, prefix)
+                return await self._relay(request, upstream)
+            finally:
+                upstream.release()
+                self._release(worker)
+                worker.served += 1
+
+    async def _relay(self, request: web.Request, upstream: aiohttp.ClientResponse) -> web.StreamResponse:
+        """Repassa a resposta do worker pedaço a pedaço (NDJSON chega ao cliente sem buffer)."""
+        headers = {k: v for k, v in upstream.headers.items() if k.lower() not in HOP_HEADERS}
+        response = web.StreamResponse(status=upstream.status, headers=headers)
+        await response.prepare(request)
+        async for chunk in upstream.content.iter_any():
+            await response.write(chunk)
+        await response.write_eof()
+        return response
+
+    async def _card(self, upstream: aiohttp.ClientResponse, prefix: str) -> web.Response:
+        """Agent card do worker com a URL trocada pela do balanceador."""
+        card = await upstream.json(content_type=None)
+        if isinstance(card, dict) and "url" in card:
+            card["url"] = self.url + prefix
+        return web.json_response(card, status=upstream.status)
+
+    @staticmethod
+    def _release(worker: Worker):
+        worker.outstanding -= 1
+        if worker.outstanding == 0:
+            worker.idle.set()
+
+
+def _session_id(body: bytes) -> Optional[str]:
+    """
+    Sessão da requisição: ``session_id`` no corpo (endpoints de streaming) ou,
+    numa chamada JSON-RPC do A2A, ``sessionId``/``contextId`` em ``params`` ou
+    ``contextId`` na mensagem
+    """
+    if not body:
+        return None
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return None
+    if not isinstance(payload, dict):
+        return None
+    if payload.get("session_id"):
+        return payload["session_id"]
+    params = payload.get("params")
+    if not isinstance(params, dict):
+        return None
+    message = params.get("message") if isinstance(params.get("message"), dict) else {}
+    for value in (params.get("sessionId"), params.get("session_id"), params.get("contextId"), message.get("contextId")):
+        if value:
+            return value
+    return None
+
+
+def advertise_url(port: int) -> str:
+    """URL pela qual o balanceador alcança um servidor local nesta porta."""
+    return f"http://{os.getenv('AGENT_ADVERTISE_HOST', '127.0.0.1')}:{port}"
+
+
+class Registration:
+    """
+    Registro de um worker no balanceador (``BALANCER_URL``). ``run`` registra,
+    serve até SIGTERM/SIGINT, drena no balanceador e só então encerra o
+    servidor, sem cortar requisições em andamento.
+    """
+
+    def __init__(self, balancer_url: str, role: str, routes: dict, worker_id: str = None):
+        self.balancer_url = balancer_url.rstrip("/")
+        self.role = role
+        self.routes = routes
+        # Id estável (papel + porta): um worker reiniciado na mesma porta substitui o registro antigo
+        self.id = worker_id or f"{role}-{urlsplit(next(iter(routes.values()))).port}"
+
+    async def register(self):
+        async with aiohttp.ClientSession() as session:
+            payload = {"id": self.id, "role": self.role, "routes": self.routes}
+            async with session.post(f"{self.balancer_url}{REGISTRY}/register", json=payload) as response:
+                response.raise_for_status()
+
+    async def drain(self, timeout: float = DRAIN_TIMEOUT) -> bool:
+        client_timeout = aiohttp.ClientTimeout(total=timeout + 5)
+        async with aiohttp.ClientSession(timeout=client_timeout) as session:
+            payload = {"id": self.id, "timeout": timeout}
+            async with session.post(f"{self.balancer_url}{REGISTRY}/drain", json=payload) as response:
+                response.raise_for_status()
+                return (await response.json())["drained"]
+
+    async def run(self, serve: Awaitable):
+        """
+        Executa o servidor registrado no balanceador
+        :param serve: corrotina que mantém o servidor no ar (ex.: ``server.astart()``)
+        """
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+        task = asyncio.ensure_future(serve)
+        await self.register()
+        stopping = asyncio.ensure_future(stop.wait())
+        await asyncio.wait({task, stopping}, return_when=asyncio.FIRST_COMPLETED)
+        stopping.cancel()
+        try:
+            await self.drain()
+        except aiohttp.ClientError as e:
+            logger.warning("Não foi possível drenar %s no balanceador: %s", self.id, e)
+        if not task.done():
+            task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+async def serve_agent(serve: Awaitable, role: str, routes: dict):
+    """
+    Mantém o servidor de um agente no ar. Com ``BALANCER_URL`` definido, o
+    worker se registra no balanceador e drena antes de sair.
+    :param serve: corrotina que mantém o servidor no ar
+    :param role: nome do agente
+    :param routes: prefixo do caminho → URL base deste processo
+    """
+    balancer_url = os.getenv("BALANCER_URL")
+    if not balancer_url:
+        await serve
+        return
+    await Registration(balancer_url, role, routes).run(serve)
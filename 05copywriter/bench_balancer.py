@@ -0,0 +1,135 @@
+"""
+Benchmark: vazão do sistema (briefings/s) conforme o número de workers do
+research_agent atrás do balanceador.
+
+Os workers são processos reais subidos pelo Launcher e registrados no
+LoadBalancer, com o StubLlm no lugar do Gemini. Cada worker de pesquisa
+atende ``--capacity`` gerações simultâneas de ``--model-latency`` segundos,
+como a cota de modelo de um processo, então a pesquisa é o gargalo. O host
+(CopywriterWorkflow) resolve os filhos pelo balanceador. No maior cenário um
+worker é drenado no meio da carga para conferir que nenhum briefing falha:
+
+    cd 05copywriter && PYTHONPATH=.. python bench_balancer.py --workers 1 2 4 --briefs 32
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+from agents import build_content_agent, build_research_agent
+from balancer import LoadBalancer, advertise_url, serve_agent
+from launcher import Launcher
+from load_test import run_load
+from streaming import AgentStreamer, StreamServer
+from stub_model import StubLlm
+from workflow import CopywriterWorkflow
+
+
+async def run_worker(args):
+    """Processo worker: um agente com StubLlm servido em AGENT_PORT e registrado no balanceador."""
+    port = int(os.environ["AGENT_PORT"])
+    model = StubLlm(latency=args.model_latency, chunks=args.chunks, capacity=args.capacity)
+    if args.role == "research_agent":
+        agent = build_research_agent([], model=model)
+    else:
+        agent = build_content_agent(model=model)
+    server = StreamServer(f"/{args.role}", AgentStreamer(agent).stream, "127.0.0.1", port)
+    await server.start()
+    routes = {f"/{args.role}": advertise_url(port), f"/{args.role}/stream": advertise_url(port)}
+    try:
+        await serve_agent(asyncio.Event().wait(), args.role, routes)
+    finally:
+        await server.stop()
+
+
+def worker_command(args, role: str, capacity: int) -> list:
+    return [
+        sys.executable, __file__, "worker", "--role", role,
+        "--capacity", str(capacity), "--model-latency", str(args.model_latency), "--chunks", str(args.chunks),
+    ]
+
+
+async def wait_registered(balancer: LoadBalancer, count: int, timeout: float = 60):
+    for _ in range(int(timeout * 10)):
+        if len(balancer.workers) >= count:
+            return
+        await asyncio.sleep(0.1)
+    raise TimeoutError(f"{len(balancer.workers)} de {count} workers registrados")
+
+
+async def run_scenario(args, workers: int, drain: bool) -> dict:
+    balancer = LoadBalancer(host="127.0.0.1", port=0)
+    await balancer.start()
+    roles = {
+        "research_agent": (worker_command(args, "research_agent", args.capacity), args.base_port, workers),
+        # Copy com folga: o gargalo medido é a pesquisa.
+        "content_agent": (worker_command(args, "content_agent", 0), args.base_port + 100, 1),
+    }
+    launcher = Launcher(roles, balancer.url)
+    await launcher.start()
+    await wait_registered(balancer, workers + 1)
+
+    workflow = CopywriterWorkflow(f"{balancer.url}/research_agent/stream", f"{balancer.url}/content_agent/stream")
+    host = StreamServer("/copywriter_host", workflow.stream, "127.0.0.1", 0)
+    await host.start()
+    url = f"http://127.0.0.1:{host.port}/copywriter_host/stream"
+
+    try:
+        load = asyncio.create_task(run_load(url, args.briefs, args.concurrency, stream=True))
+        if drain:
+            await asyncio.sleep(args.drain_after)
+            await launcher.retire("research_agent")
+        report = await load
+        served = sorted(w["served"] for w in balancer.stats() if w["role"] == "research_agent")
+    finally:
+        await workflow.close()
+        await host.stop()
+        await launcher.stop()
+        await balancer.stop()
+    return {**report, "served": served}
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command")
+    worker = sub.add_parser("worker")
+    worker.add_argument("--role", required=True)
+    for p in (parser, worker):
+        p.add_argument("--capacity", type=int, default=2)
+        p.add_argument("--model-latency", type=float, default=0.25)
+        p.add_argument("--chunks", type=int, default=8)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--briefs", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--base-port", type=int, default=21000)
+    parser.add_argument("--drain-after", type=float, default=1.0)
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        await run_worker(args)
+        return
+
+    print(
+        f"{args.briefs} briefings, {args.concurrency} clientes, pesquisa com capacidade {args.capacity} "
+        f"por worker e {args.model_latency * 1000:.0f} ms por geração"
+    )
+    baseline = None
+    for workers in args.workers:
+        report = await run_scenario(args, workers, drain=False)
+        baseline = baseline or report["briefs_per_s"] / workers
+        print(
+            f"research x{workers:<3} {report['briefs_per_s']:7.2f} briefings/s   "
+            f"p50 {report['latency_p50_ms']:8.1f} ms   eficiência {report['briefs_per_s'] / (baseline * workers):5.0%}   "
+            f"erros {report['errors']}   seções por worker {report['served']}"
+        )
+    workers = max(args.workers)
+    if workers > 1:
+        report = await run_scenario(args, workers, drain=True)
+        print(
+            f"research x{workers} drenando 1 após {args.drain_after:.0f}s: "
+            f"{report['briefs_per_s']:.2f} briefings/s, erros {report['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,299 @@
+"""
+Benchmark de regressão do sistema completo: host, research_agent e
+content_agent com um modelo determinístico (StubLlm), o pool de servidores
+MCP locais e um servidor HTTP local no lugar da web, sem rede nem chave de API.
+
+Reproduz um corpus de briefings (um JSON por linha) em malha fechada
+(``--users`` clientes, cada um enviando o próximo briefing quando o anterior
+termina) ou em malha aberta (chegadas de Poisson a ``--rate`` briefings/s,
+independentes das respostas) e grava um relatório JSON com vazão, latência
+ponta a ponta e TTFT (p50/p95/p99), latência por salto (host → research,
+host → content e cada ferramenta MCP) e taxa de erros:
+
+    cd 05copywriter && PYTHONPATH=.. python bench_cluster.py --users 8 --briefs 64 --output cluster.json
+    cd 05copywriter && PYTHONPATH=.. python bench_cluster.py --rate 4 --duration 30
+    cd 05copywriter && PYTHONPATH=.. python bench_cluster.py --baseline cluster.json --tolerance 0.2
+
+Com ``--baseline`` compara o p95 e a vazão com um relatório anterior e sai com
+código 1 se algum piorar mais que a tolerância ou se a taxa de erros subir.
+``--host-url`` aponta para um host já em execução (endpoint /stream); nesse
+caso os saltos MCP não são medidos.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import aiohttp
+from mcp import StdioServerParameters
+
+from agents import build_content_agent, build_research_agent
+from bench_scraper import StubHandler, StubServer
+from load_test import percentile
+from mcp_pool import McpPool, McpPoolToolset
+from streaming import AgentStreamer, StreamServer, iter_ndjson
+from stub_model import StubLlm
+from workflow import CopywriterWorkflow
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "briefs.jsonl")
+
+
+def load_corpus(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize(values: list) -> dict:
+    """Contagem e percentis (ms) de uma lista de durações em segundos."""
+    if not values:
+        return {"count": 0}
+    summary = {"count": len(values)}
+    for q in (50, 95, 99):
+        summary[f"p{q}_ms"] = round(percentile(values, q) * 1000, 1)
+    summary["max_ms"] = round(max(values) * 1000, 1)
+    return summary
+
+
+class Recorder:
+    """Acumula as amostras de latência e os erros de cada salto."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def add(self, hop: str, seconds: float, ok: bool = True):
+        self.samples[hop].append(seconds)
+        if not ok:
+            self.errors[hop] += 1
+
+    def error(self, hop: str):
+        self.errors[hop] += 1
+
+    def report(self) -> dict:
+        hops = {}
+        for hop in sorted(set(self.samples) | set(self.errors)):
+            hops[hop] = {**summarize(self.samples[hop]), "errors": self.errors[hop]}
+        return hops
+
+
+async def start_cluster(args, recorder: Recorder):
+    """
+    Sobe o servidor de páginas, o pool MCP, os agentes com StubLlm e o host
+    :return: URL do endpoint de streaming do host e a função que derruba tudo
+    """
+    StubHandler.latency = args.page_latency
+    pages = StubServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=pages.serve_forever, daemon=True).start()
+
+    cache_dir = tempfile.TemporaryDirectory()
+    env = {
+        "PYTHONPATH": ".",
+        "SEARCH_FAKE_BASE_URL": f"http://127.0.0.1:{pages.server_address[1]}",
+        "SEARCH_FAKE_LATENCY": str(args.search_latency),
+        "SCRAPE_CACHE": "1" if args.page_cache else "0",
+        "SCRAPE_CACHE_DIR": cache_dir.name,
+    }
+    pool = McpPool(
+        StdioServerParameters(
+            command=sys.executable,
+            args=["mcp_search_server.py"],
+            env=env,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ),
+        size=args.pool_size,
+        observer=lambda name, seconds, ok: recorder.add(f"mcp:{name}", seconds, ok),
+    )
+    toolset = McpPoolToolset(pool)
+    tools = await toolset.get_tools()
+
+    def model():
+        return StubLlm(latency=args.model_latency, chunk_delay=args.chunk_delay, chunks=args.chunks)
+
+    servers = []
+    for agent in (build_research_agent(tools, model=model()), build_content_agent(model=model())):
+        server = StreamServer(f"/{agent.name}", AgentStreamer(agent).stream, "127.0.0.1", 0)
+        await server.start()
+        servers.append(server)
+    research, content = servers
+
+    workflow = CopywriterWorkflow(
+        f"http://127.0.0.1:{research.port}/research_agent/stream",
+        f"http://127.0.0.1:{content.port}/content_agent/stream",
+    )
+    host = StreamServer("/copywriter_host", workflow.stream, "127.0.0.1", 0)
+    await host.start()
+
+    async def stop():
+        await workflow.close()
+        for server in (host, *servers):
+            await server.stop()
+        await toolset.close()
+        pages.shutdown()
+        cache_dir.cleanup()
+
+    return f"http://127.0.0.1:{host.port}/copywriter_host/stream", stop
+
+
+async def send_brief(session: aiohttp.ClientSession, url: str, brief: dict, session_id: str, recorder: Recorder):
+    """Envia um briefing ao host e registra latência total, TTFT e os saltos do evento final."""
+    payload = {"message": f"Crie copy para: {json.dumps(brief, ensure_ascii=False)}", "session_id": session_id}
+    start = time.perf_counter()
+    first = None
+    timings = None
+    failed = False
+    try:
+        async with session.post(url, json=payload) as response:
+            response.raise_for_status()
+            async for event in iter_ndjson(response):
+                if event.get("error"):
+                    failed = True
+                    recorder.error(f"section:{event.get('section')}")
+                if first is None and event["partial"] and event["text"]:
+                    first = time.perf_counter() - start
+                if event["final"] and "timings" in event:
+                    timings = event["timings"]
+    except Exception:
+        failed = True
+    if failed or timings is None:
+        recorder.error("end_to_end")
+        return
+    recorder.add("end_to_end", time.perf_counter() - start)
+    if first is not None:
+        recorder.add("ttft", first)
+    for section in timings.values():
+        hop = "host_research" if section["agent"] == "research_agent" else "host_content"
+        recorder.add(hop, section["duration_ms"] / 1000)
+
+
+async def closed_loop(session, url: str, corpus: list, users: int, briefs: int, recorder: Recorder):
+    """``users`` clientes, cada um envia o próximo briefing quando recebe a resposta do anterior."""
+    counter = iter(range(briefs))
+
+    async def user():
+        for i in counter:
+            await send_brief(session, url, corpus[i % len(corpus)], f"bench_{i}", recorder)
+
+    await asyncio.gather(*(user() for _ in range(users)))
+    return briefs
+
+
+async def open_loop(session, url: str, corpus: list, rate: float, duration: float, seed: int, recorder: Recorder):
+    """Chegadas de Poisson a ``rate`` briefings/s durante ``duration`` segundos, sem esperar respostas."""
+    rng = random.Random(seed)
+    tasks = []
+    deadline = time.perf_counter() + duration
+    next_arrival = time.perf_counter()
+    while next_arrival < deadline:
+        await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+        i = len(tasks)
+        tasks.append(asyncio.create_task(send_brief(session, url, corpus[i % len(corpus)], f"bench_{i}", recorder)))
+        next_arrival += rng.expovariate(rate)
+    await asyncio.gather(*tasks)
+    return len(tasks)
+
+
+def build_report(args, sent: int, elapsed: float, recorder: Recorder) -> dict:
+    hops = recorder.report()
+    completed = hops.get("end_to_end", {}).get("count", 0)
+    errors = hops.get("end_to_end", {}).get("errors", 0)
+    return {
+        "mode": "open" if args.rate else "closed",
+        "config": {
+            key: getattr(args, key)
+            for key in ("users", "briefs", "rate", "duration", "chunks", "chunk_delay", "model_latency",
+                        "page_latency", "search_latency", "pool_size", "page_cache")
+        },
+        "sent": sent,
+        "completed": completed,
+        "errors": errors,
+        "error_rate": round(errors / sent, 4) if sent else 0.0,
+        "elapsed_s": round(elapsed, 3),
+        "briefs_per_s": round(completed / elapsed, 2) if elapsed else 0.0,
+        "latency": hops.pop("end_to_end", {"count": 0}),
+        "ttft": hops.pop("ttft", {"count": 0}),
+        "hops": hops,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Compara o relatório com a linha de base
+    :return: lista de regressões encontradas (vazia se nenhuma)
+    """
+    regressions = []
+    if report["briefs_per_s"] < baseline["briefs_per_s"] * (1 - tolerance):
+        regressions.append(f"vazão {report['briefs_per_s']} < {baseline['briefs_per_s']} briefings/s")
+    if report["error_rate"] > baseline["error_rate"]:
+        regressions.append(f"taxa de erros {report['error_rate']} > {baseline['error_rate']}")
+    pairs = [("latency", report["latency"], baseline["latency"]), ("ttft", report["ttft"], baseline["ttft"])]
+    pairs += [(hop, stats, baseline["hops"][hop]) for hop, stats in report["hops"].items() if hop in baseline["hops"]]
+    for name, current, previous in pairs:
+        if "p95_ms" in current and "p95_ms" in previous and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name} p95 {current['p95_ms']} ms > {previous['p95_ms']} ms")
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--users", type=int, default=8, help="clientes da malha fechada")
+    parser.add_argument("--briefs", type=int, default=32, help="briefings da malha fechada")
+    parser.add_argument("--rate", type=float, help="briefings/s da malha aberta")
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos da malha aberta")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunks", type=int, default=8)
+    parser.add_argument("--chunk-delay", type=float, default=0.01)
+    parser.add_argument("--model-latency", type=float, default=0.05)
+    parser.add_argument("--page-latency", type=float, default=0.02)
+    parser.add_argument("--search-latency", type=float, default=0.05)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--page-cache", action="store_true")
+    parser.add_argument("--host-url", help="endpoint /stream de um host já em execução")
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    recorder = Recorder()
+    stop = None
+    url = args.host_url
+    if url is None:
+        url, stop = await start_cluster(args, recorder)
+
+    try:
+        connector = aiohttp.TCPConnector(limit=0)
+        async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=None)) as session:
+            start = time.perf_counter()
+            if args.rate:
+                sent = await open_loop(session, url, corpus, args.rate, args.duration, args.seed, recorder)
+            else:
+                sent = await closed_loop(session, url, corpus, args.users, args.briefs, recorder)
+            elapsed = time.perf_counter() - start
+    finally:
+        if stop is not None:
+            await stop()
+
+    report = build_report(args, sent, elapsed, recorder)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSÃO: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
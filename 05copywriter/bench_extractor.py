@@ -0,0 +1,126 @@
+"""
+Benchmark: extração de texto com BeautifulSoup (implementação anterior do
+scrape_content) contra o TextExtractor incremental, em bytes/s e pico de memória.
+
+Usa os arquivos .html de --corpus (páginas salvas do navegador); sem ele, gera
+um corpus sintético com navegação, scripts inline grandes, artigo e rodapé,
+em utf-8 e em windows-1252 (com <meta charset>, com http-equiv e sem
+declaração nenhuma, como em muitos sites brasileiros). A coluna "inválidos"
+conta caracteres U+FFFD no texto extraído: encoding detectado errado.
+
+    cd 05copywriter && python bench_extractor.py
+    cd 05copywriter && python bench_extractor.py --corpus ~/paginas_salvas
+"""
+import argparse
+import glob
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from extractor import extract_text
+
+WORDS = (
+    "copywriting público conversão oferta benefício produto marca cliente dor desejo "
+    "prova social garantia escassez headline chamada ação funil tráfego engajamento"
+).split()
+
+
+def legacy_extract_text(html: bytes, max_chars: int = 2000) -> str:
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Remove scripts e estilos
+    for script in soup(["script", "style"]):
+        script.decompose()
+
+    text = soup.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    text = ' '.join(chunk for chunk in chunks if chunk)
+
+    return text[:max_chars]
+
+
+def sentence(rng: random.Random, n: int = 14) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+# Declaração de charset no <head> e encoding dos bytes de cada variante do corpus sintético
+ENCODINGS = [
+    ('<meta charset="utf-8">', "utf-8"),
+    ('<meta charset="iso-8859-1">', "cp1252"),
+    ('<meta http-equiv="Content-Type" content="text/html; charset=windows-1252">', "cp1252"),
+    ("", "cp1252"),
+]
+
+
+def synthetic_page(rng: random.Random, paragraphs: int, charset: str = "") -> str:
+    script = "var data = " + repr([rng.random() for _ in range(paragraphs * 40)]) + ";"
+    nav = "".join(f'<li><a href="/p/{i}">{rng.choice(WORDS)}</a></li>' for i in range(60))
+    body = "".join(f"<p>{sentence(rng)} <b>{sentence(rng, 4)}</b> {sentence(rng)}</p>\n" for _ in range(paragraphs))
+    return (
+        f"<!doctype html><html><head>{charset}<title>Página de teste</title>"
+        f"<style>{'.c { margin: 0 } ' * 500}</style><script>{script}</script></head><body>"
+        f'<header class="site-header"><nav><ul>{nav}</ul></nav></header>'
+        f'<div class="cookie-banner">{sentence(rng)}</div>'
+        f"<main><article><h1>{sentence(rng, 6)}</h1>{body}</article></main>"
+        f'<aside class="sidebar"><ul>{nav}</ul></aside>'
+        f"<footer>{sentence(rng) * 20}</footer><script>{script}</script></body></html>"
+    )
+
+
+def build_corpus(directory: str, pages: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    paths = []
+    for i in range(pages):
+        path = os.path.join(directory, f"pagina_{i:03d}.html")
+        charset, encoding = ENCODINGS[i % len(ENCODINGS)]
+        with open(path, "w", encoding=encoding) as f:
+            f.write(synthetic_page(rng, paragraphs=rng.choice((20, 200, 2000)), charset=charset))
+        paths.append(path)
+    return paths
+
+
+def measure(label: str, fn, documents: list):
+    total = sum(len(doc) for doc in documents)
+    start = time.perf_counter()
+    invalid = sum(fn(doc).count("\ufffd") for doc in documents)
+    elapsed = time.perf_counter() - start
+
+    # O pico de memória é medido numa segunda passada, pois o tracemalloc distorce o tempo.
+    peak = 0
+    for doc in documents:
+        tracemalloc.start()
+        fn(doc)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    print(f"{label:<22} {total / elapsed / 1e6:8.1f} MB/s {elapsed:8.3f}s   pico {peak / 1e6:7.2f} MB   inválidos {invalid}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", help="diretório com páginas .html salvas")
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--max-chars", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = sorted(glob.glob(os.path.join(args.corpus, "*.html"))) if args.corpus else build_corpus(tmp, args.pages)
+        documents = []
+        for path in paths:
+            with open(path, "rb") as f:
+                documents.append(f.read())
+
+    total = sum(len(doc) for doc in documents)
+    print(f"{len(documents)} páginas, {total / 1e6:.1f} MB, limite {args.max_chars} caracteres")
+    measure("bs4 (anterior)", lambda doc: legacy_extract_text(doc, args.max_chars), documents)
+    measure("streaming", lambda doc: extract_text(doc, args.max_chars), documents)
+    measure("streaming main_only", lambda doc: extract_text(doc, args.max_chars, main_only=True), documents)
+    measure("streaming sem limite", lambda doc: extract_text(doc, 10**9), documents)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: vazão de chamadas de ferramenta MCP (chamadas/s) vs. tamanho do pool.
+
+Cada chamada é um scrape_content contra um servidor HTTP local com latência
+simulada, disparada por vários clientes concorrentes. Também mede o custo de
+abrir um servidor novo por sessão (processo + imports + initialize):
+
+    cd 05copywriter && python bench_mcp_pool.py --calls 400 --sizes 1 2 4 8
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from bench_scraper import StubHandler, StubServer
+from mcp_pool import McpPool
+
+SERVER_PARAMS = StdioServerParameters(
+    command=sys.executable,
+    args=["mcp_search_server.py"],
+    cwd=os.path.dirname(os.path.abspath(__file__)),
+)
+
+
+async def cold_session_call(url: str) -> float:
+    start = time.perf_counter()
+    async with stdio_client(SERVER_PARAMS) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            await session.call_tool("scrape_content", {"url": url})
+    return time.perf_counter() - start
+
+
+async def run_pool(size: int, urls: list, concurrency: int):
+    start = time.perf_counter()
+    async with McpPool(SERVER_PARAMS, size=size) as pool:
+        warmup = time.perf_counter() - start
+        queue = list(urls)
+
+        async def client():
+            while queue:
+                await pool.call_tool("scrape_content", {"url": queue.pop()})
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        calls = [w["calls"] for w in pool.stats()]
+    print(f"pool {size:<3} {len(urls) / elapsed:10.1f} chamadas/s   aquecimento {warmup:6.2f}s   por worker {calls}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    StubHandler.latency = args.latency
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/pagina/{i}" for i in range(args.calls)]
+
+    cold = await cold_session_call(urls[0])
+    print(f"{args.calls} chamadas, {args.concurrency} clientes, latência {args.latency * 1000:.0f} ms")
+    print(f"servidor novo por sessão: {cold:.2f}s até a primeira resposta")
+    for size in args.sizes:
+        await run_pool(size, urls, args.concurrency)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""
+Benchmark: chamadas de rede e tempo de uma pesquisa repetida sobre o mesmo nicho
+com o PageCache em disco.
+
+Três rodadas sobre as mesmas URLs, contra um servidor HTTP local com ETag:
+fria (baixa tudo), quente (dentro do TTL, sem rede) e expirada (GET
+condicional, respostas 304 sem download nem parse):
+
+    cd 05copywriter && python bench_page_cache.py --pages 200
+"""
+import argparse
+import asyncio
+import tempfile
+import threading
+import time
+
+from bench_scraper import StubHandler, StubServer
+from page_cache import PageCache
+from scraper import Scraper
+
+
+class Clock:
+    def __init__(self):
+        self.offset = 0.0
+
+    def __call__(self):
+        return time.time() + self.offset
+
+
+async def research_round(label: str, scraper: Scraper, urls: list):
+    StubHandler.requests = 0
+    StubHandler.bytes_sent = 0
+    start = time.perf_counter()
+    await scraper.scrape_many(urls)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<10} {elapsed:8.3f}s {StubHandler.requests:6d} requisições"
+        f" {StubHandler.bytes_sent / 1e6:8.2f} MB baixados"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    StubHandler.latency = args.latency
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/concorrente/{i}" for i in range(args.pages)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        clock = Clock()
+        cache = PageCache(tmp, fresh_ttl=3600, clock=clock)
+        scraper = Scraper(cache=cache)
+        print(f"{args.pages} páginas, latência {args.latency * 1000:.0f} ms")
+        try:
+            await research_round("fria", scraper, urls)
+            await research_round("quente", scraper, urls)
+            clock.offset = 7200
+            await research_round("expirada", scraper, urls)
+        finally:
+            await scraper.close()
+        stats = cache.stats()
+        cache.close()
+    print({k: stats[k] for k in ("hits", "revalidated", "misses", "hit_rate", "disk_bytes", "raw_bytes")})
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
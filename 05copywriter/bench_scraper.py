@@ -0,0 +1,141 @@
+"""
+Benchmark: páginas/s do scraping legado (requests, uma conexão por página)
+contra o Scraper assíncrono em modo single (uma URL por chamada, conexão
+reaproveitada) e em modo batch (scrape_many).
+
+Sobe um servidor HTTP local com latência simulada, sem acesso à rede:
+
+    cd 05copywriter && python bench_scraper.py --pages 64 --latency 0.05
+
+``--paragraphs`` aumenta as páginas: com mais texto que o limite o download
+para no meio, e o resto do corpo é descartado para a conexão ser reaproveitada.
+"""
+import argparse
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from bench_extractor import legacy_extract_text
+from scraper import Scraper
+
+
+def page(paragraphs: int) -> bytes:
+    return (
+        "<html><head><title>Página {n}</title><style>body {{ color: red }}</style>"
+        "<script>var x = {n};</script></head><body>"
+        + "<p>Conteúdo de teste sobre copywriting, público-alvo e concorrentes.</p>" * paragraphs
+        + "</body></html>"
+    ).encode("utf-8")
+
+
+PAGE = page(200)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0.0
+    page = PAGE
+    connections = 0
+    requests = 0
+    bytes_sent = 0
+
+    def setup(self):
+        super().setup()
+        type(self).connections += 1
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        type(self).requests += 1
+        etag = f'"{len(self.path)}-{hash(self.path) & 0xffff:x}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = self.page.replace(b"{n}", self.path.encode())
+        type(self).bytes_sent += len(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # O backlog padrão (5) derruba conexões simultâneas e custa 1 s de retransmissão.
+    request_queue_size = 256
+
+
+def legacy_scrape(url: str) -> str:
+    # Mesmo caminho do scrape_content original: requests.get sem sessão.
+    headers = {'User-Agent': 'Mozilla/5.0 (compatible; Research Bot)'}
+    response = requests.get(url, headers=headers, timeout=10)
+    return legacy_extract_text(response.content)
+
+
+async def run_single(scraper: Scraper, urls: list):
+    for url in urls:
+        await scraper.scrape(url)
+
+
+def report(label: str, elapsed: float, pages: int):
+    print(f"{label:<8} {elapsed:8.3f}s {pages / elapsed:10.1f} páginas/s {StubHandler.connections:6d} conexões")
+
+
+async def bench_async(urls: list, concurrency: int):
+    scraper = Scraper(concurrency=concurrency, per_host=concurrency)
+    try:
+        StubHandler.connections = 0
+        start = time.perf_counter()
+        await run_single(scraper, urls)
+        report("single", time.perf_counter() - start, len(urls))
+
+        StubHandler.connections = 0
+        start = time.perf_counter()
+        await scraper.scrape_many(urls)
+        report("batch", time.perf_counter() - start, len(urls))
+    finally:
+        await scraper.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--paragraphs", type=int, default=200, help="parágrafos por página (200 ≈ 15 KB)")
+    args = parser.parse_args()
+
+    StubHandler.latency = args.latency
+    StubHandler.page = page(args.paragraphs)
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/pagina/{i}" for i in range(args.pages)]
+
+    print(
+        f"{args.pages} páginas de {len(StubHandler.page) // 1024} KB, "
+        f"latência {args.latency * 1000:.0f} ms, concorrência {args.concurrency}"
+    )
+    StubHandler.connections = 0
+    start = time.perf_counter()
+    for url in urls:
+        legacy_scrape(url)
+    report("legado", time.perf_counter() - start, args.pages)
+
+    asyncio.run(bench_async(urls, args.concurrency))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
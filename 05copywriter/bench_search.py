@@ -0,0 +1,53 @@
+"""
+Benchmark: vazão do search_many (consultas/s) por tamanho de lote e concorrência,
+com o FakeSearchBackend e parte das consultas repetidas no mesmo lote.
+
+    cd 05copywriter && python bench_search.py --latency 0.05 --duplicates 0.25
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from search import FakeSearchBackend, SearchService
+
+
+def make_queries(batch: int, duplicates: float, rng: random.Random) -> list:
+    unique = max(1, round(batch * (1 - duplicates)))
+    base = [f"copywriting nicho {rng.randrange(10**9)}" for _ in range(unique)]
+    return base + [rng.choice(base) for _ in range(batch - unique)]
+
+
+async def run(batch: int, concurrency: int, latency: float, duplicates: float, rng: random.Random):
+    backend = FakeSearchBackend(latency=latency)
+    service = SearchService(backend, concurrency=concurrency)
+    queries = make_queries(batch, duplicates, rng)
+    rng.shuffle(queries)
+
+    # Chamadas concorrentes de vários clientes: as repetidas em voo são compartilhadas.
+    start = time.perf_counter()
+    await asyncio.gather(*(service.search(query) for query in queries))
+    elapsed = time.perf_counter() - start
+    print(
+        f"lote {batch:<5} concorrência {concurrency:<4} {batch / elapsed:10.1f} consultas/s"
+        f" {backend.calls:6d} chamadas ao backend {service.shared:5d} compartilhadas"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--duplicates", type=float, default=0.25)
+    parser.add_argument("--batches", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"latência {args.latency * 1000:.0f} ms, {args.duplicates:.0%} de consultas repetidas")
+    for batch in args.batches:
+        for concurrency in args.concurrency:
+            await run(batch, concurrency, args.latency, args.duplicates, rng)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,125 @@
+"""
+Benchmark: tempo até o primeiro token (TTFT) e tempo total do host no caminho
+com resposta única (POST /copywriter_host) e no streaming NDJSON
+(POST /copywriter_host/stream).
+
+Os agentes de pesquisa e de copy são simulados: cada um emite ``--chunks``
+pedaços parciais com ``--delay`` segundos entre eles, servidos pelos mesmos
+StreamServer/AgentStreamer dos agentes reais, em portas locais:
+
+    cd 05copywriter && python bench_streaming.py --chunks 20 --delay 0.05
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import AsyncGenerator
+
+import aiohttp
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.genai import types
+
+from streaming import AgentStreamer, StreamServer, iter_ndjson
+from test_client import build_payload
+from workflow import CopywriterWorkflow
+
+
+class StubAgent(BaseAgent):
+    """Agente simulado que gera o texto em pedaços, como um modelo em streaming."""
+
+    chunks: int = 20
+    delay: float = 0.05
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        pieces = [f"{self.name} parte {i}. " for i in range(self.chunks)]
+        for piece in pieces:
+            await asyncio.sleep(self.delay)
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                partial=True,
+                content=types.Content(role="model", parts=[types.Part(text=piece)]),
+            )
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text="".join(pieces))]),
+        )
+
+
+async def buffered(session: aiohttp.ClientSession, url: str, payload: dict):
+    start = time.perf_counter()
+    async with session.post(url, json=payload) as response:
+        await response.json()
+    total = time.perf_counter() - start
+    return total, total
+
+
+async def streamed(session: aiohttp.ClientSession, url: str, payload: dict):
+    start = time.perf_counter()
+    first = None
+    async with session.post(url, json=payload) as response:
+        async for event in iter_ndjson(response):
+            if first is None and event["partial"] and event["text"]:
+                first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+async def start_stub_cluster(chunks: int, delay: float):
+    """
+    Sobe research_agent e content_agent simulados e o host em portas locais
+    :return: URL do endpoint do host e a função que derruba tudo
+    """
+    servers = []
+    for name in ("research_agent", "content_agent"):
+        agent = StubAgent(name=name, chunks=chunks, delay=delay)
+        server = StreamServer(f"/{name}", AgentStreamer(agent).stream, "127.0.0.1", 0)
+        await server.start()
+        servers.append(server)
+    research, content = servers
+
+    workflow = CopywriterWorkflow(
+        f"http://127.0.0.1:{research.port}/research_agent/stream",
+        f"http://127.0.0.1:{content.port}/content_agent/stream",
+    )
+    host = StreamServer("/copywriter_host", workflow.stream, "127.0.0.1", 0)
+    await host.start()
+
+    async def stop():
+        await workflow.close()
+        for server in (host, *servers):
+            await server.stop()
+
+    return f"http://127.0.0.1:{host.port}/copywriter_host", stop
+
+
+def report(label: str, samples: list):
+    ttft = statistics.median(sample[0] for sample in samples)
+    total = statistics.median(sample[1] for sample in samples)
+    print(f"{label:<15} TTFT {ttft * 1000:8.1f} ms   total {total * 1000:8.1f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.05)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    base, stop = await start_stub_cluster(args.chunks, args.delay)
+    print(f"{args.chunks} pedaços por agente, {args.delay * 1000:.0f} ms entre pedaços, {args.runs} execuções")
+    async with aiohttp.ClientSession() as session:
+        samples = [await buffered(session, base, build_payload(f"b{i}")) for i in range(args.runs)]
+        report("resposta única", samples)
+        samples = [await streamed(session, f"{base}/stream", build_payload(f"s{i}")) for i in range(args.runs)]
+        report("streaming", samples)
+
+    await stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,42 +1,20 @@
 # content_agent.py
 import asyncio
-from google.adk import Agent
+import os
 from a2a_framework import A2AServer, generate_agent_card, AgentSkill
+from agents import build_content_agent
+from balancer import advertise_url, serve_agent
+from streaming import AgentStreamer, StreamServer
 
 async def run_content_agent():
     AGENT_NAME = "content_agent"
     AGENT_DESCRIPTION = "Agente especializado em criação de copy persuasivo"
     HOST = "0.0.0.0"
-    PORT = 12000
+    PORT = int(os.getenv("AGENT_PORT", 12000))
+    STREAM_PORT = PORT + 1
     AGENT_URL = f"http://{HOST}:{PORT}"
     
-    content_agent = Agent(
-        name="content_agent",
-        model="gemini-2.0-flash",
-        description="Copywriter especialista em conversão",
-        instructions="""
-        Você é um copywriter expert em conversão. Sua função é:
-        
-        1. Receber insights de pesquisa do research_agent
-        2. Criar copy persuasivo baseado nos dados
-        3. Aplicar técnicas comprovadas de copywriting (AIDA, PAS, etc.)
-        4. Adaptar tom e linguagem para o público-alvo
-        5. Incluir CTAs eficazes
-        
-        Estruture sua resposta em JSON:
-        {
-            "headline": "título principal",
-            "subheadline": "subtítulo",
-            "body_copy": "texto principal",
-            "bullet_points": ["benefício 1", "benefício 2"],
-            "cta": "call to action",
-            "social_proof": "prova social sugerida",
-            "urgency_element": "elemento de urgência"
-        }
-        
-        Use as dores do público e insights dos concorrentes para criar copy único e persuasivo.
-        """
-    )
+    content_agent = build_content_agent()
     
     AGENT_SKILLS = [
         AgentSkill(
@@ -62,8 +40,17 @@ async def run_content_agent():
         agent=content_agent
     )
     
-    print(f"Iniciando Content Agent em {AGENT_URL}")
-    await server.astart()
+    # Endpoint de streaming (NDJSON) ao lado do A2A
+    stream_server = StreamServer("/content_agent", AgentStreamer(content_agent).stream, HOST, STREAM_PORT)
+    await stream_server.start()
+
+    print(f"Iniciando Content Agent em {AGENT_URL} (streaming na porta {STREAM_PORT})")
+    # Com BALANCER_URL definido, registra no balanceador e drena antes de sair
+    routes = {
+        "/content_agent": advertise_url(PORT),
+        "/content_agent/stream": advertise_url(STREAM_PORT),
+    }
+    await serve_agent(server.astart(), AGENT_NAME, routes)
 
 if __name__ == "__main__":
     asyncio.run(run_content_agent())
@@ -0,0 +1,237 @@
+# extractor.py
+import codecs
+import re
+from html.parser import HTMLParser
+
+MAX_CHARS = 2000
+CHUNK_SIZE = 16 * 1024
+# Bytes do início do documento olhados para achar BOM e <meta charset>
+SNIFF_BYTES = 4096
+
+# Subárvores cujo texto nunca é conteúdo
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "canvas", "iframe", "object"}
+# Subárvores ignoradas no modo main_only
+BOILERPLATE_TAGS = {"nav", "header", "footer", "aside", "form", "button", "select", "menu", "dialog"}
+BOILERPLATE_ATTR = re.compile(
+    r"nav|menu|footer|header|sidebar|cookie|banner|breadcrumb|comment|share|social|"
+    r"promo|newsletter|related|popup|modal|subscribe",
+    re.IGNORECASE,
+)
+MAIN_TAGS = {"main", "article"}
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "figcaption",
+    "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol",
+    "p", "pre", "section", "table", "td", "th", "title", "tr", "ul",
+}
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param",
+    "source", "track", "wbr",
+}
+
+_WHITESPACE = re.compile(r"\s+")
+# <meta charset="x"> e <meta http-equiv="Content-Type" content="text/html; charset=x">
+_META_CHARSET = re.compile(rb"<meta[^>]*?charset\s*=\s*[\"']?\s*([\w.:-]+)", re.IGNORECASE)
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+class _BudgetFilled(Exception):
+    pass
+
+
+class TextExtractor(HTMLParser):
+    """
+    Extrator de texto incremental: recebe o HTML em pedaços, descarta
+    script/style sem montar árvore e para assim que o limite de caracteres
+    é atingido.
+
+    No modo ``main_only`` também ignora navegação, cabeçalhos, rodapés e
+    blocos cujo class/id indica boilerplate; se a página tiver <main> ou
+    <article>, apenas o texto dentro deles é mantido.
+    """
+
+    def __init__(self, max_chars: int = MAX_CHARS, main_only: bool = False, encoding: str = None):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.main_only = main_only
+        self.done = False
+        self.encoding = None
+        self._declared = encoding
+        self._decoder = None
+        self._head = b""
+        self._parts = []
+        self._size = 0
+        self._space = False
+        self._skip_tag = None
+        self._skip_depth = 0
+        self._main_depth = 0
+        self._main_seen = False
+
+    def feed(self, data) -> bool:
+        """
+        Processa mais um pedaço do documento
+        :param data: bytes ou texto
+        :return: True quando o limite foi atingido e o resto pode ser descartado
+        """
+        if self.done:
+            return True
+        if isinstance(data, bytes):
+            data = self._decode(data)
+        try:
+            super().feed(data)
+        except _BudgetFilled:
+            self.done = True
+        return self.done
+
+    def text(self) -> str:
+        """Finaliza o parse e devolve o texto extraído."""
+        if not self.done:
+            try:
+                super().feed(self._decode(b"", final=True))
+                self.close()
+            except _BudgetFilled:
+                pass
+            self.done = True
+        return "".join(self._parts)[:self.max_chars]
+
+    def _decode(self, data: bytes, final: bool = False) -> str:
+        # O decoder só é criado com o começo do documento em mãos (BOM, <meta charset>).
+        if self._decoder is None:
+            self._head += data
+            if len(self._head) < SNIFF_BYTES and not final:
+                return ""
+            self.encoding = sniff_encoding(self._head, self._declared)
+            self._decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+            data, self._head = self._head, b""
+        return self._decoder.decode(data, final)
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth += 1
+            return
+        if tag in VOID_TAGS:
+            self._space = self._space or tag in BLOCK_TAGS
+            return
+        if tag in SKIP_TAGS or (self.main_only and self._is_boilerplate(tag, attrs)):
+            self._skip_tag = tag
+            self._skip_depth = 1
+            return
+        if self.main_only and tag in MAIN_TAGS:
+            if not self._main_seen:
+                # O texto visto antes do conteúdo principal é descartado.
+                self._main_seen = True
+                self._parts.clear()
+                self._size = 0
+                self._space = False
+            self._main_depth += 1
+        if tag in BLOCK_TAGS:
+            self._space = True
+
+    def handle_startendtag(self, tag, attrs):
+        if self._skip_tag is None and tag in BLOCK_TAGS:
+            self._space = True
+
+    def handle_endtag(self, tag):
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+                if self._skip_depth == 0:
+                    self._skip_tag = None
+            return
+        if self.main_only and tag in MAIN_TAGS and self._main_depth:
+            self._main_depth -= 1
+        if tag in BLOCK_TAGS:
+            self._space = True
+
+    def handle_data(self, data):
+        if self._skip_tag is not None:
+            return
+        if self._main_seen and not self._main_depth:
+            return
+        collapsed = _WHITESPACE.sub(" ", data)
+        words = collapsed.strip()
+        if not words:
+            self._space = self._space or bool(collapsed)
+            return
+        if self._size and (self._space or collapsed[0] == " "):
+            self._parts.append(" ")
+            self._size += 1
+        self._parts.append(words)
+        self._size += len(words)
+        self._space = collapsed[-1] == " "
+        if self._size >= self.max_chars:
+            raise _BudgetFilled
+
+    def _is_boilerplate(self, tag, attrs) -> bool:
+        if tag in BOILERPLATE_TAGS:
+            return True
+        for name, value in attrs:
+            if name in ("id", "class", "role") and value and BOILERPLATE_ATTR.search(value):
+                return True
+        return False
+
+
+def sniff_encoding(head: bytes, declared: str = None) -> str:
+    """
+    Encoding do documento, na ordem do HTML: BOM, charset do cabeçalho HTTP,
+    <meta charset> ou http-equiv no começo do documento; sem nada disso,
+    utf-8 se o começo for utf-8 válido, senão windows-1252
+    :param head: primeiros bytes do documento
+    :param declared: charset do Content-Type, se houver
+    :return: nome do codec
+    """
+    for bom, codec in _BOMS:
+        if head.startswith(bom):
+            return codec
+    for candidate in (declared, _meta_charset(head[:SNIFF_BYTES])):
+        codec = _codec(candidate)
+        if codec:
+            return codec
+    try:
+        head[:SNIFF_BYTES].decode("utf-8")
+    except UnicodeDecodeError as e:
+        # Só um caractere cortado no fim do trecho ainda é utf-8.
+        if e.start < min(len(head), SNIFF_BYTES) - 3:
+            return "cp1252"
+    return "utf-8"
+
+
+def _meta_charset(head: bytes):
+    match = _META_CHARSET.search(head)
+    return match.group(1).decode("ascii", "ignore") if match else None
+
+
+def _codec(encoding: str):
+    if not encoding:
+        return None
+    try:
+        name = codecs.lookup(encoding).name
+    except LookupError:
+        return None
+    # Como nos navegadores: latin-1 e ascii declarados são windows-1252, e um
+    # <meta> dizendo utf-16 num documento sem BOM é utf-8.
+    if name in ("latin-1", "iso8859-1", "ascii"):
+        return "cp1252"
+    if name.startswith("utf-16"):
+        return "utf-8"
+    return name
+
+
+def extract_text(html, max_chars: int = MAX_CHARS, main_only: bool = False, encoding: str = None) -> str:
+    """
+    Extrai o texto visível de um HTML já baixado
+    :param html: conteúdo bruto (bytes) ou texto da página
+    :param max_chars: tamanho máximo do texto retornado
+    :param main_only: extrai apenas o conteúdo principal
+    :param encoding: charset do cabeçalho HTTP; sem ele, vem do BOM ou do <meta charset>
+    :return: texto com espaços normalizados
+    """
+    extractor = TextExtractor(max_chars, main_only, encoding)
+    for start in range(0, len(html), CHUNK_SIZE):
+        if extractor.feed(html[start:start + CHUNK_SIZE]):
+            break
+    return extractor.text()
@@ -1,42 +1,37 @@
 # host_agent.py
 import asyncio
-from google.adk import Agent
+import os
 from a2a_framework import A2AServer, generate_agent_card, AgentSkill
+from balancer import advertise_url, serve_agent
+from streaming import StreamServer
+from workflow import CopywriterWorkflow, WorkflowAgent
 
 async def run_host_agent():
     AGENT_NAME = "copywriter_host"
     AGENT_DESCRIPTION = "Orquestra o processo completo de copywriting"
     HOST = "0.0.0.0"
-    PORT = 10000
+    PORT = int(os.getenv("AGENT_PORT", 10000))
+    STREAM_PORT = PORT + 1
     AGENT_URL = f"http://{HOST}:{PORT}"
     
-    # URLs dos agentes filhos
-    agent_urls = [
-        "http://localhost:11000/research_agent",
-        "http://localhost:12000/content_agent"
-    ]
-    
-    host_agent = Agent(
-        name="copywriter_host",
-        model="gemini-2.0-flash",
+    # Com o balanceador (launcher.py), os filhos são resolvidos por ele
+    BALANCER_URL = os.getenv("BALANCER_URL")
+    if BALANCER_URL:
+        stream_urls = [f"{BALANCER_URL}/research_agent/stream", f"{BALANCER_URL}/content_agent/stream"]
+    else:
+        # Endpoints de streaming dos filhos (porta A2A + 1)
+        stream_urls = [
+            "http://localhost:11001/research_agent/stream",
+            "http://localhost:12001/content_agent/stream"
+        ]
+
+    # O mesmo fluxo atende o A2A e o streaming: pesquisa em paralelo e cada
+    # parte do copy assim que as seções de que depende chegam
+    workflow = CopywriterWorkflow(*stream_urls, name=AGENT_NAME)
+    host_agent = WorkflowAgent(
+        name=AGENT_NAME,
         description="Coordena pesquisa e criação de copy",
-        instructions="""
-        Você coordena um processo completo de copywriting:
-        
-        1. Receba o briefing do cliente (produto, público-alvo, objetivo)
-        2. Envie para research_agent: pesquisar o produto/nicho
-        3. Aguarde os insights de pesquisa
-        4. Envie insights para content_agent: criar o copy
-        5. Revise e formate o resultado final
-        
-        Workflow:
-        - Input: briefing do cliente
-        - Step 1: research_agent -> insights
-        - Step 2: content_agent -> copy final
-        - Output: copy completo com justificativas
-        """,
-        is_host_agent=True,
-        remote_agent_addresses=agent_urls
+        workflow=workflow,
     )
     
     AGENT_SKILLS = [
@@ -63,8 +58,20 @@ async def run_host_agent():
         agent=host_agent
     )
     
-    print(f"Iniciando Host Agent em {AGENT_URL}")
-    await server.astart()
+    # Endpoint de streaming: repassa os eventos da pesquisa e do copy conforme chegam
+    stream_server = StreamServer("/copywriter_host", workflow.stream, HOST, STREAM_PORT)
+    await stream_server.start()
+
+    print(f"Iniciando Host Agent em {AGENT_URL} (streaming na porta {STREAM_PORT})")
+    try:
+        # Com BALANCER_URL definido, registra no balanceador e drena antes de sair
+        routes = {
+            "/copywriter_host": advertise_url(PORT),
+            "/copywriter_host/stream": advertise_url(STREAM_PORT),
+        }
+        await serve_agent(server.astart(), AGENT_NAME, routes)
+    finally:
+        await workflow.close()
 
 if __name__ == "__main__":
     asyncio.run(run_host_agent())
@@ -0,0 +1,144 @@
+# launcher.py
+"""
+Sobe o balanceador e N processos por agente, registrados nele:
+
+    python launcher.py --research 4 --content 2 --hosts 1
+
+Cada worker recebe a porta em ``AGENT_PORT`` (A2A na porta, streaming na
+porta + 1), o endereço do balanceador em ``BALANCER_URL`` e a raiz do
+repositório no ``PYTHONPATH`` (para ``adk_extras``). O cliente fala
+só com o balanceador (ex.: http://localhost:9000/copywriter_host/stream) e o
+host resolve os agentes filhos por ele. Workers que caem são reiniciados; no
+SIGTERM/SIGINT cada worker drena no balanceador antes de sair.
+
+Com ``--prefork`` cada papel vira um warm pool (``adk_extras.prefork``): um
+processo importa ADK e o agente uma vez e faz fork dos N workers, que sobem
+sem pagar o import a frio. Nesse modo o launcher supervisiona um pool por
+papel (e ``retire`` encerra o pool inteiro); o pool reinicia os workers.
+
+    python launcher.py --prefork --research 4 --content 2 --hosts 1
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+
+from balancer import DRAIN_TIMEOUT, LoadBalancer
+
+logger = logging.getLogger(__name__)
+
+RESPAWN_DELAY = 1
+# Papel → (script, porta base)
+ROLES = {
+    "research_agent": ("research_agent.py", 11000),
+    "content_agent": ("content_agent.py", 12000),
+    "copywriter_host": ("host_agent.py", 10000),
+}
+# Papel → função que o worker executa, para o modo --prefork
+ENTRYPOINTS = {
+    "research_agent": "research_agent:run_research_agent",
+    "content_agent": "content_agent:run_content_agent",
+    "copywriter_host": "host_agent:run_host_agent",
+}
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Launcher:
+    """
+    Mantém ``count`` processos por papel. Cada papel é ``(comando, porta base,
+    quantidade)``; o worker ``i`` usa ``porta base + 2 * i``.
+    """
+
+    def __init__(self, roles: dict, balancer_url: str, cwd: str = None, env: dict = None):
+        self.roles = roles
+        self.balancer_url = balancer_url
+        self.env = env or {}
+        self.cwd = cwd or os.path.dirname(os.path.abspath(__file__))
+        self.procs = {}
+        self._tasks = []
+        self._stopping = False
+        self._retired = set()
+
+    async def start(self):
+        for role, (command, base_port, count) in self.roles.items():
+            for i in range(count):
+                self._tasks.append(asyncio.create_task(self._supervise(role, command, base_port + 2 * i)))
+
+    async def _supervise(self, role: str, command: list, port: int):
+        env = {**os.environ, **self.env, "AGENT_PORT": str(port), "BALANCER_URL": self.balancer_url}
+        while not self._stopping and (role, port) not in self._retired:
+            proc = await asyncio.create_subprocess_exec(*command, cwd=self.cwd, env=env)
+            self.procs[(role, port)] = proc
+            code = await proc.wait()
+            if not self._stopping and (role, port) not in self._retired:
+                logger.warning("Worker %s:%d saiu com código %s, reiniciando", role, port, code)
+                await asyncio.sleep(RESPAWN_DELAY)
+
+    async def retire(self, role: str, timeout: float = DRAIN_TIMEOUT):
+        """Drena e encerra o último worker do papel, sem reiniciá-lo."""
+        key = max(key for key in self.procs if key[0] == role and key not in self._retired)
+        self._retired.add(key)
+        await self._terminate(self.procs[key], timeout)
+
+    async def stop(self, timeout: float = DRAIN_TIMEOUT):
+        self._stopping = True
+        await asyncio.gather(*(self._terminate(proc, timeout) for proc in self.procs.values()))
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    @staticmethod
+    async def _terminate(proc: asyncio.subprocess.Process, timeout: float):
+        if proc.returncode is not None:
+            return
+        # SIGTERM: o worker drena no balanceador e só então encerra.
+        proc.send_signal(signal.SIGTERM)
+        try:
+            await asyncio.wait_for(proc.wait(), timeout + 10)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+
+
+def prefork_command(role: str, base_port: int, count: int) -> list:
+    """Comando do warm pool do papel: ``count`` workers nas portas ``base_port + 2 * i``."""
+    return [
+        sys.executable, "-m", "adk_extras.prefork", "--target", ENTRYPOINTS[role], "--workers", str(count),
+        "--port-env", "AGENT_PORT", "--port-base", str(base_port), "--port-step", "2",
+    ]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--research", type=int, default=int(os.getenv("RESEARCH_WORKERS", 2)))
+    parser.add_argument("--content", type=int, default=int(os.getenv("CONTENT_WORKERS", 1)))
+    parser.add_argument("--hosts", type=int, default=int(os.getenv("HOST_WORKERS", 1)))
+    parser.add_argument("--port", type=int, default=int(os.getenv("BALANCER_PORT", 9000)))
+    parser.add_argument("--prefork", action="store_true", default=os.getenv("PREFORK") == "1",
+                        help="um warm pool por papel: importa uma vez e faz fork dos workers")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    balancer = LoadBalancer(port=args.port)
+    await balancer.start()
+    counts = {"research_agent": args.research, "content_agent": args.content, "copywriter_host": args.hosts}
+    if args.prefork:
+        roles = {role: (prefork_command(role, port, counts[role]), port, 1) for role, (_, port) in ROLES.items()}
+    else:
+        roles = {role: ([sys.executable, script], port, counts[role]) for role, (script, port) in ROLES.items()}
+    env = {"PYTHONPATH": os.pathsep.join(filter(None, [REPO_ROOT, os.getenv("PYTHONPATH")]))}
+    launcher = Launcher(roles, balancer.url, env=env)
+    await launcher.start()
+    print(f"Balanceador em {balancer.url} com {counts}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+    await launcher.stop()
+    await balancer.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
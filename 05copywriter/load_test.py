@@ -0,0 +1,111 @@
+# load_test.py
+"""
+Teste de carga do host: dispara N briefings concorrentes com o payload do
+test_client.py e mostra latência p50/p95/p99 e briefings/s.
+
+    python load_test.py --briefs 100 --concurrency 20            # host em execução
+    python load_test.py --briefs 100 --concurrency 20 --stream   # endpoint NDJSON, mede também o TTFT
+    python load_test.py --briefs 100 --stub                      # agentes simulados locais
+    python load_test.py --stream --url http://localhost:9000/copywriter_host/stream   # via launcher.py
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+
+import aiohttp
+
+from test_client import STREAM_URL, URL, build_payload
+
+
+def percentile(values: list, q: float) -> float:
+    """Percentil pelo método nearest-rank."""
+    ordered = sorted(values)
+    index = max(0, math.ceil(q / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+async def send_brief(session: aiohttp.ClientSession, url: str, session_id: str, stream: bool) -> tuple:
+    """
+    Envia um briefing e espera o resultado completo
+    :return: (latência total, tempo até o primeiro token ou None)
+    """
+    start = time.perf_counter()
+    first = None
+    async with session.post(url, json=build_payload(session_id)) as response:
+        response.raise_for_status()
+        if not stream:
+            await response.json()
+        else:
+            async for line in response.content:
+                if first is None and line.strip():
+                    event = json.loads(line)
+                    if event.get("partial") and event.get("text"):
+                        first = time.perf_counter() - start
+    return time.perf_counter() - start, first
+
+
+async def run_load(url: str, briefs: int, concurrency: int, stream: bool) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, ttfts, errors = [], [], []
+
+    async def worker(session, i):
+        async with semaphore:
+            try:
+                latency, first = await send_brief(session, url, f"load_{i}", stream)
+                latencies.append(latency)
+                if first is not None:
+                    ttfts.append(first)
+            except Exception as e:
+                errors.append(str(e))
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=None)) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(session, i) for i in range(briefs)))
+        elapsed = time.perf_counter() - start
+
+    report = {
+        "briefs": briefs,
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "elapsed_s": round(elapsed, 3),
+        "briefs_per_s": round(len(latencies) / elapsed, 2),
+    }
+    for name, values in (("latency", latencies), ("ttft", ttfts)):
+        if values:
+            for q in (50, 95, 99):
+                report[f"{name}_p{q}_ms"] = round(percentile(values, q) * 1000, 1)
+    return report
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--briefs", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--url")
+    parser.add_argument("--stub", action="store_true", help="sobe agentes simulados locais")
+    parser.add_argument("--chunks", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    stop = None
+    url = args.url or (STREAM_URL if args.stream else URL)
+    if args.stub:
+        from bench_streaming import start_stub_cluster
+
+        base, stop = await start_stub_cluster(args.chunks, args.delay)
+        url = f"{base}/stream" if args.stream else base
+
+    try:
+        report = await run_load(url, args.briefs, args.concurrency, args.stream)
+    finally:
+        if stop is not None:
+            await stop()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,210 @@
+# mcp_pool.py
+import asyncio
+import datetime
+import logging
+import time
+from typing import Callable, List, Optional
+
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.mcp_tool.mcp_tool import MCPTool
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+logger = logging.getLogger(__name__)
+
+PING_INTERVAL = 15
+PING_TIMEOUT = 5
+CALL_TIMEOUT = 60
+START_TIMEOUT = 30
+RESPAWN_DELAY = 1
+
+
+class McpWorker:
+    """
+    Um processo servidor MCP via stdio. A task do worker abre e fecha a sessão
+    (o anyio exige que seja na mesma task), verifica a saúde com ping e recria
+    o processo quando ele morre ou para de responder.
+    """
+
+    def __init__(self, params: StdioServerParameters, index: int, ping_interval: float = PING_INTERVAL):
+        self.params = params
+        self.index = index
+        self.ping_interval = ping_interval
+        self.session: Optional[ClientSession] = None
+        self.ready = asyncio.Event()
+        self.inflight = 0
+        self.calls = 0
+        self.failures = 0
+        self.restarts = 0
+        self._stopping = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run(), name=f"mcp-worker-{self.index}")
+
+    async def stop(self):
+        self._stopping.set()
+        if self._task is not None:
+            await self._task
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                async with stdio_client(self.params) as (read, write):
+                    async with ClientSession(read, write) as session:
+                        await session.initialize()
+                        self.session = session
+                        self.ready.set()
+                        await self._health_loop(session)
+            except Exception as e:
+                logger.warning("Servidor MCP %d caiu (%s), reiniciando", self.index, e)
+            finally:
+                self.ready.clear()
+                self.session = None
+            if not self._stopping.is_set():
+                self.restarts += 1
+                await asyncio.sleep(RESPAWN_DELAY)
+
+    async def _health_loop(self, session: ClientSession):
+        while True:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.ping_interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.wait_for(session.send_ping(), PING_TIMEOUT)
+
+
+class McpPool:
+    """
+    Pool de servidores MCP stdio pré-aquecidos. Cada chamada vai para o worker
+    pronto com menos chamadas em andamento; falhas de transporte são repetidas
+    uma vez em outro worker. ``observer(nome, segundos, ok)`` recebe a duração
+    de cada chamada.
+    """
+
+    def __init__(
+        self,
+        params: StdioServerParameters,
+        size: int = 4,
+        ping_interval: float = PING_INTERVAL,
+        call_timeout: float = CALL_TIMEOUT,
+        observer: Callable[[str, float, bool], None] = None,
+    ):
+        self.params = params
+        self.observer = observer
+        self.size = size
+        self.call_timeout = datetime.timedelta(seconds=call_timeout)
+        self.workers = [McpWorker(params, i, ping_interval) for i in range(size)]
+        self._started = False
+        self._tools = None
+
+    async def start(self, timeout: float = START_TIMEOUT):
+        if self._started:
+            return
+        self._started = True
+        for worker in self.workers:
+            worker.start()
+        await asyncio.wait_for(asyncio.gather(*(w.ready.wait() for w in self.workers)), timeout)
+
+    async def close(self):
+        await asyncio.gather(*(worker.stop() for worker in self.workers))
+        self._started = False
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def list_tools(self) -> list:
+        if self._tools is None:
+            worker = await self._acquire()
+            self._tools = (await worker.session.list_tools()).tools
+        return self._tools
+
+    async def call_tool(self, name: str, arguments: dict = None):
+        """
+        Executa uma ferramenta em algum worker do pool
+        :param name: nome da ferramenta MCP
+        :param arguments: argumentos da ferramenta
+        :return: CallToolResult do servidor
+        """
+        tried = set()
+        start = time.perf_counter()
+        while True:
+            worker = await self._acquire(exclude=tried)
+            worker.inflight += 1
+            try:
+                result = await worker.session.call_tool(name, arguments, read_timeout_seconds=self.call_timeout)
+                worker.calls += 1
+                self._observe(name, start, not result.isError)
+                return result
+            except Exception:
+                worker.failures += 1
+                tried.add(worker.index)
+                if len(tried) > 1 or self.size == 1:
+                    self._observe(name, start, False)
+                    raise
+                logger.warning("Chamada %s falhou no servidor MCP %d, repetindo", name, worker.index)
+            finally:
+                worker.inflight -= 1
+
+    def _observe(self, name: str, start: float, ok: bool):
+        if self.observer is not None:
+            self.observer(name, time.perf_counter() - start, ok)
+
+    async def _acquire(self, exclude=()) -> McpWorker:
+        while True:
+            ready = [w for w in self.workers if w.ready.is_set() and w.index not in exclude]
+            if ready:
+                return min(ready, key=lambda w: w.inflight)
+            waiting = [asyncio.ensure_future(w.ready.wait()) for w in self.workers if w.index not in exclude]
+            try:
+                done, _ = await asyncio.wait(waiting, timeout=START_TIMEOUT, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for future in waiting:
+                    future.cancel()
+            if not done:
+                raise TimeoutError("Nenhum servidor MCP disponível")
+
+    def stats(self) -> list:
+        return [
+            {
+                "worker": w.index,
+                "ready": w.ready.is_set(),
+                "inflight": w.inflight,
+                "calls": w.calls,
+                "failures": w.failures,
+                "restarts": w.restarts,
+            }
+            for w in self.workers
+        ]
+
+
+class PooledMcpTool(MCPTool):
+    """MCPTool que executa as chamadas no pool em vez de uma sessão única."""
+
+    def __init__(self, mcp_tool, pool: McpPool):
+        super().__init__(mcp_tool=mcp_tool, mcp_session_manager=None)
+        self._pool = pool
+
+    async def _run_async_impl(self, *, args, tool_context, credential):
+        return await self._pool.call_tool(self.name, args)
+
+
+class McpPoolToolset(BaseToolset):
+    """Toolset do ADK com as ferramentas de um McpPool."""
+
+    def __init__(self, pool: McpPool, tool_filter=None):
+        super().__init__(tool_filter=tool_filter)
+        self.pool = pool
+
+    async def get_tools(self, readonly_context=None) -> List[PooledMcpTool]:
+        await self.pool.start()
+        tools = [PooledMcpTool(tool, self.pool) for tool in await self.pool.list_tools()]
+        return [tool for tool in tools if self._is_tool_selected(tool, readonly_context)]
+
+    async def close(self):
+        await self.pool.close()
@@ -1,59 +1,113 @@
 # mcp_search_server.py
-from mcp import FastMCP
-import requests
+import asyncio
 import os
-from bs4 import BeautifulSoup
+from mcp.server.fastmcp import FastMCP, Context
+from page_cache import PageCache, default_cache_dir
+from scraper import Scraper
+from search import SearchService, SharedSearchCache, default_backend
 
 mcp = FastMCP("Web Search Server")
 
+# Busca com cache por consulta e deduplicação das consultas em andamento. O cache fica
+# num SQLite ao lado do de páginas, compartilhado pelos processos do pool (McpPool);
+# a deduplicação é por processo. SEARCH_CACHE_SHARED=0 usa só a memória deste processo.
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", 60 * 60))
+search_cache = None
+if os.getenv("SEARCH_CACHE_SHARED", "1") != "0":
+    search_cache = SharedSearchCache(os.path.join(default_cache_dir(), "searches.db"), ttl=SEARCH_CACHE_TTL)
+search_service = SearchService(
+    default_backend(),
+    ttl=SEARCH_CACHE_TTL,
+    concurrency=int(os.getenv("SEARCH_CONCORRENCIA", 8)),
+    store=search_cache,
+)
+
+# Cache em disco das páginas; SCRAPE_CACHE=0 desliga
+page_cache = None
+if os.getenv("SCRAPE_CACHE", "1") != "0":
+    page_cache = PageCache(
+        default_cache_dir(),
+        max_bytes=int(os.getenv("SCRAPE_CACHE_MB", 256)) * 1024 * 1024,
+        fresh_ttl=float(os.getenv("SCRAPE_CACHE_TTL", 60 * 60)),
+    )
+
+# Pool de conexões compartilhado por todas as chamadas de scraping
+scraper = Scraper(
+    concurrency=int(os.getenv("SCRAPE_CONCORRENCIA", 16)),
+    per_host=int(os.getenv("SCRAPE_POR_HOST", 4)),
+    per_host_interval=float(os.getenv("SCRAPE_INTERVALO_HOST", 0.0)),
+    main_only=os.getenv("SCRAPE_CONTEUDO_PRINCIPAL") == "1",
+    cache=page_cache,
+)
+
 @mcp.tool()
-def search_google(query: str, n_results: int = 5) -> list:
+async def search_google(query: str, n_results: int = 5) -> list:
     """
     Busca no Google usando API de busca
     :param query: termo de busca
     :param n_results: número de resultados
     :return: lista de resultados com título, URL e snippet
     """
-    # Simulação de busca - substitua pela sua API preferida
-    results = []
     try:
-        # Aqui você integraria com Serper.dev, Google Custom Search, etc.
-        # Para demonstração, retornamos dados mockados
-        for i in range(n_results):
-            results.append({
-                "title": f"Resultado {i+1} para '{query}'",
-                "url": f"https://example{i+1}.com",
-                "snippet": f"Informação relevante sobre {query} encontrada no site {i+1}"
-            })
+        return await search_service.search(query, n_results)
     except Exception as e:
         return [{"error": f"Erro na busca: {str(e)}"}]
-    
-    return results
 
 @mcp.tool()
-def scrape_content(url: str) -> str:
+async def search_many(queries: list[str], n_results: int = 5) -> dict:
+    """
+    Executa várias buscas em paralelo. Prefira esta ferramenta a chamar
+    search_google uma vez por termo.
+    :param queries: lista de termos de busca
+    :param n_results: número de resultados por busca
+    :return: dicionário termo -> lista de resultados com título, URL e snippet
+    """
+    return await search_service.search_many(queries, n_results)
+
+@mcp.tool()
+async def scrape_content(url: str) -> str:
     """
     Extrai conteúdo textual de uma página web
     :param url: URL para extrair conteúdo
     :return: texto extraído da página
     """
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0 (compatible; Research Bot)'}
-        response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Remove scripts e estilos
-        for script in soup(["script", "style"]):
-            script.decompose()
-            
-        text = soup.get_text()
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
-        
-        return text[:2000]  # Limita o tamanho
-    except Exception as e:
-        return f"Erro ao extrair conteúdo: {str(e)}"
+    return await scraper.scrape(url)
+
+@mcp.tool()
+async def scrape_many(urls: list[str], ctx: Context, stream: bool = False) -> dict:
+    """
+    Extrai o conteúdo de várias páginas em paralelo. Prefira esta ferramenta a
+    chamar scrape_content uma vez por URL.
+    :param urls: lista de URLs para extrair conteúdo
+    :param stream: se verdadeiro, envia cada página como notificação assim que termina
+    :return: dicionário URL -> texto extraído
+    """
+    if not stream:
+        return await scraper.scrape_many(urls)
+
+    results = {}
+    total = len(set(urls))
+    async for url, text in scraper.iter_scrape(urls):
+        results[url] = text
+        await ctx.info(f"{url}\n{text}")
+        await ctx.report_progress(len(results), total, message=url)
+    return {url: results[url] for url in dict.fromkeys(urls)}
+
+@mcp.tool()
+async def cache_stats() -> dict:
+    """
+    Métricas do cache de páginas (acertos, revalidações 304, downloads,
+    descartes e espaço em disco) e do cache de buscas; com os caches em
+    SQLite, os contadores somam todos os processos do pool
+    :return: dicionário com os contadores do cache
+    """
+    if page_cache is None:
+        return {"enabled": False, "search": await asyncio.to_thread(search_service.stats)}
+    return {
+        "enabled": True,
+        **await asyncio.to_thread(page_cache.stats),
+        "search": await asyncio.to_thread(search_service.stats),
+    }
 
 if __name__ == "__main__":
     mcp.run(transport='stdio')
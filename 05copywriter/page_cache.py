@@ -0,0 +1,277 @@
+# page_cache.py
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import zlib
+from typing import NamedTuple, Optional
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_FRESH_TTL = 60 * 60
+SCHEMA_VERSION = 2
+COUNTERS = (
+    "hits", "revalidated", "stale", "misses", "stored", "evictions", "bytes_downloaded", "bytes_saved",
+)
+
+
+class CachedPage(NamedTuple):
+    url: str
+    digest: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    raw_size: int
+    text: str
+
+
+class PageCache:
+    """
+    Cache em disco das páginas baixadas e do texto extraído delas.
+
+    O HTML bruto de páginas baixadas por inteiro é gravado comprimido (zlib)
+    em arquivos endereçados pelo sha256 do conteúdo, então URLs com o mesmo
+    conteúdo compartilham o blob; páginas cujo download parou no limite de
+    texto guardam só o texto. O texto é guardado por URL e por ``variant``
+    (as opções de extração, ex.: limite de caracteres e main_only), já que
+    scrapers com opções diferentes extraem textos diferentes da mesma página.
+    Um índice SQLite guarda, por URL, o digest, ETag/Last-Modified e quando a
+    página foi validada. Dentro de ``fresh_ttl`` a página é servida sem rede;
+    depois disso é revalidada com GET condicional. O tamanho total (blobs e
+    textos) é limitado a ``max_bytes`` com descarte das URLs menos acessadas.
+    Os contadores ficam no próprio SQLite para somar todos os processos do
+    pool de servidores MCP.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        fresh_ttl: float = DEFAULT_FRESH_TTL,
+        clock=time.time,
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.fresh_ttl = fresh_ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(root, "index.db"), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # É um cache: um índice de outra versão é descartado, e os blobs órfãos com ele.
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS pages; DROP TABLE IF EXISTS blobs; DROP TABLE IF EXISTS texts;"
+                "DROP TABLE IF EXISTS counters;"
+            )
+            shutil.rmtree(os.path.join(root, "objects"), ignore_errors=True)
+            os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY, digest TEXT, raw_size INTEGER NOT NULL, etag TEXT, last_modified TEXT,"
+            " fetched_at REAL NOT NULL, accessed_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at);"
+            "CREATE INDEX IF NOT EXISTS pages_digest ON pages (digest);"
+            "CREATE TABLE IF NOT EXISTS texts ("
+            " url TEXT NOT NULL, variant TEXT NOT NULL, text TEXT NOT NULL, size INTEGER NOT NULL,"
+            " PRIMARY KEY (url, variant));"
+            "CREATE TABLE IF NOT EXISTS blobs (digest TEXT PRIMARY KEY, size INTEGER NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);"
+            f"PRAGMA user_version = {SCHEMA_VERSION};"
+        )
+        self._conn.commit()
+
+    def lookup(self, url: str, variant: str = "") -> Optional[CachedPage]:
+        """
+        Busca a página no índice
+        :param url: URL da página
+        :param variant: opções de extração do texto
+        :return: CachedPage ou None se a URL, ou o texto nessa variante, não estiver no cache
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT p.url, p.digest, p.etag, p.last_modified, p.fetched_at, p.raw_size, t.text"
+                " FROM pages p JOIN texts t ON t.url = p.url AND t.variant = ? WHERE p.url = ?",
+                (variant, url),
+            ).fetchone()
+        return CachedPage(*row) if row else None
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        return self.clock() - page.fetched_at <= self.fresh_ttl
+
+    def validators(self, page: CachedPage) -> dict:
+        """Cabeçalhos do GET condicional para revalidar a página."""
+        headers = {}
+        if page.etag:
+            headers["If-None-Match"] = page.etag
+        if page.last_modified:
+            headers["If-Modified-Since"] = page.last_modified
+        return headers
+
+    def hit(self, page: CachedPage):
+        """Registra uma página servida do cache sem acesso à rede."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (self.clock(), page.url))
+            self._count(hits=1, bytes_saved=page.raw_size)
+
+    def revalidated(self, page: CachedPage):
+        """Registra um 304: a página continua válida e não precisa ser baixada nem processada."""
+        now = self.clock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, page.url)
+            )
+            self._count(revalidated=1, bytes_saved=page.raw_size)
+
+    def stale(self, page: CachedPage):
+        """Registra uma página vencida servida porque a revalidação falhou; a próxima consulta tenta de novo."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (self.clock(), page.url))
+            self._count(stale=1)
+
+    def store(
+        self,
+        url: str,
+        raw: bytes,
+        text: str,
+        variant: str = "",
+        complete: bool = True,
+        etag: str = None,
+        last_modified: str = None,
+    ):
+        """
+        Grava o conteúdo baixado e o texto extraído
+        :param url: URL da página
+        :param raw: bytes baixados
+        :param text: texto extraído
+        :param variant: opções de extração do texto
+        :param complete: se ``raw`` é o corpo inteiro; um corpo cortado no limite de texto não vira blob
+        :param etag: cabeçalho ETag da resposta
+        :param last_modified: cabeçalho Last-Modified da resposta
+        """
+        digest = hashlib.sha256(raw).hexdigest() if complete else None
+        compressed = zlib.compress(raw) if complete else None
+        size = len(text.encode("utf-8"))
+        now = self.clock()
+        with self._lock, self._conn:
+            # Trava de escrita antes de tocar nos arquivos: o descarte de outro processo
+            # não apaga um blob entre a gravação do arquivo e a da linha que o referencia.
+            self._conn.execute("BEGIN IMMEDIATE")
+            previous = self._conn.execute("SELECT digest FROM pages WHERE url = ?", (url,)).fetchone()
+            if complete:
+                self._write_blob(digest, compressed)
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO blobs (digest, size) VALUES (?, ?)", (digest, len(compressed))
+                )
+            if previous is not None and (digest is None or previous[0] != digest):
+                # Conteúdo novo: os textos das outras variantes eram da versão anterior.
+                self._conn.execute("DELETE FROM texts WHERE url = ? AND variant != ?", (url, variant))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, digest, raw_size, etag, last_modified, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, digest, len(raw), etag, last_modified, now, now),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO texts (url, variant, text, size) VALUES (?, ?, ?, ?)",
+                (url, variant, text, size),
+            )
+            if previous is not None and previous[0] and previous[0] != digest:
+                self._drop_blob_if_orphan(previous[0])
+            self._count(misses=1, stored=1, bytes_downloaded=len(raw))
+            self._evict()
+
+    def raw(self, url: str) -> Optional[bytes]:
+        """HTML bruto armazenado para a URL, descomprimido; None se a página não foi baixada por inteiro."""
+        with self._lock:
+            row = self._conn.execute("SELECT digest FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        try:
+            with open(self._blob_path(row[0]), "rb") as f:
+                return zlib.decompress(f.read())
+        except FileNotFoundError:
+            return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._conn.execute("SELECT name, value FROM counters"))
+            pages, raw_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0) FROM pages"
+            ).fetchone()
+            blobs, blob_size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+            text_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM texts").fetchone()[0]
+        stats = {name: counters.get(name, 0) for name in COUNTERS}
+        lookups = stats["hits"] + stats["revalidated"] + stats["stale"] + stats["misses"]
+        stats.update(
+            pages=pages,
+            blobs=blobs,
+            disk_bytes=blob_size + text_size,
+            raw_bytes=raw_size,
+            max_bytes=self.max_bytes,
+            hit_rate=round((stats["hits"] + stats["revalidated"]) / lookups, 4) if lookups else 0.0,
+        )
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _count(self, **deltas):
+        self._conn.executemany(
+            "INSERT INTO counters (name, value) VALUES (?, ?)"
+            " ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+            deltas.items(),
+        )
+
+    def _total_size(self) -> int:
+        return (
+            self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            + self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM texts").fetchone()[0]
+        )
+
+    def _evict(self):
+        """Remove as URLs menos acessadas até caber no limite, na transação de quem grava."""
+        total = self._total_size()
+        while total > self.max_bytes:
+            row = self._conn.execute("SELECT url, digest FROM pages ORDER BY accessed_at LIMIT 1").fetchone()
+            if row is None:
+                break
+            url, digest = row
+            total -= self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM texts WHERE url = ?", (url,)).fetchone()[0]
+            self._conn.execute("DELETE FROM texts WHERE url = ?", (url,))
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self._count(evictions=1)
+            if digest:
+                total -= self._drop_blob_if_orphan(digest)
+
+    def _drop_blob_if_orphan(self, digest: str) -> int:
+        """Apaga o blob (linha e arquivo) se nenhuma URL o usa mais; devolve o tamanho liberado."""
+        if self._conn.execute("SELECT 1 FROM pages WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+            return 0
+        row = self._conn.execute("SELECT size FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        self._conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+        try:
+            os.remove(self._blob_path(digest))
+        except FileNotFoundError:
+            pass
+        return row[0] if row else 0
+
+    def _write_blob(self, digest: str, compressed: bytes):
+        path = self._blob_path(digest)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp, path)
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.z")
+
+
+def default_cache_dir() -> str:
+    """Diretório do cache: SCRAPE_CACHE_DIR ou ~/.cache/copywriter/pages."""
+    return os.getenv("SCRAPE_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "copywriter", "pages")
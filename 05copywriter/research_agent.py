@@ -1,55 +1,44 @@
 # research_agent.py
 import asyncio
-from google.adk import Agent
-from google.adk.tools.mcp import MCPToolset, StdioServerParameters
+import os
+import sys
+from mcp import StdioServerParameters
 from a2a_framework import A2AServer, generate_agent_card, AgentSkill
+from agents import build_research_agent
+from balancer import advertise_url, serve_agent
+from streaming import AgentStreamer, StreamServer
+from mcp_pool import McpPool, McpPoolToolset
+
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", 4))
 
 async def get_mcp_tools():
-    """Conecta ao servidor MCP e retorna as ferramentas"""
-    tools, exit_stack = await MCPToolset.from_server(
-        connection_params=StdioServerParameters(
-            command="python",
-            args=["mcp_search_servver.py"],
-            env={"PYTHONPATH": "."}
-        )
+    """Sobe o pool de servidores MCP pré-aquecidos e retorna as ferramentas"""
+    pool = McpPool(
+        StdioServerParameters(
+            command=sys.executable,
+            args=["mcp_search_server.py"],
+            env={"PYTHONPATH": "."},
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ),
+        size=MCP_POOL_SIZE,
     )
-    return tools, exit_stack
+    toolset = McpPoolToolset(pool)
+    tools = await toolset.get_tools()
+    return tools, toolset
 
 async def run_research_agent():
     AGENT_NAME = "research_agent"
     AGENT_DESCRIPTION = "Agente especializado em pesquisa web para copywriting"
     HOST = "0.0.0.0"
-    PORT = 11000
+    PORT = int(os.getenv("AGENT_PORT", 11000))
+    STREAM_PORT = PORT + 1
     AGENT_URL = f"http://{HOST}:{PORT}"
     
     # Conecta às ferramentas MCP
-    mcp_tools, exit_stack = await get_mcp_tools()
+    mcp_tools, toolset = await get_mcp_tools()
     
     # Cria o agente de pesquisa
-    research_agent = Agent(
-        name="research_agent",
-        model="gemini-2.0-flash",
-        description="Especialista em pesquisa web para copywriting",
-        tools=mcp_tools,
-        instructions="""
-        Você é um pesquisador especializado em copywriting. Sua função é:
-        
-        1. Receber tópicos ou produtos para pesquisar
-        2. Usar search_google para encontrar informações relevantes
-        3. Usar scrape_content para extrair detalhes importantes
-        4. Analisar concorrentes, tendências e pontos de dor do público
-        5. Retornar insights estruturados em JSON:
-        
-        {
-            "topic": "tópico pesquisado",
-            "key_insights": ["insight 1", "insight 2"],
-            "competitor_analysis": ["análise 1", "análise 2"],
-            "target_audience_pain_points": ["dor 1", "dor 2"],
-            "trending_keywords": ["palavra 1", "palavra 2"],
-            "sources": ["url1", "url2"]
-        }
-        """
-    )
+    research_agent = build_research_agent(mcp_tools)
     
     # Configuração A2A
     AGENT_SKILLS = [
@@ -77,8 +66,20 @@ async def run_research_agent():
         agent=research_agent
     )
     
-    print(f"Iniciando Research Agent em {AGENT_URL}")
-    await server.astart()
+    # Endpoint de streaming (NDJSON) ao lado do A2A
+    stream_server = StreamServer("/research_agent", AgentStreamer(research_agent).stream, HOST, STREAM_PORT)
+    await stream_server.start()
+
+    print(f"Iniciando Research Agent em {AGENT_URL} (streaming na porta {STREAM_PORT})")
+    try:
+        # Com BALANCER_URL definido, registra no balanceador e drena antes de sair
+        routes = {
+            "/research_agent": advertise_url(PORT),
+            "/research_agent/stream": advertise_url(STREAM_PORT),
+        }
+        await serve_agent(server.astart(), AGENT_NAME, routes)
+    finally:
+        await toolset.close()
 
 if __name__ == "__main__":
     asyncio.run(run_research_agent())
@@ -1,3 +1,6 @@
+# Em cada terminal, a partir desta pasta: adk_extras fica na raiz do repositório
+export PYTHONPATH=..
+
 # Terminal 1 - Research Agent
 python research_agent.py
 
@@ -9,3 +12,13 @@ python host_agent.py
 
 # Terminal 4 - Teste
 python test_client.py
+
+# Ou, recebendo os eventos da pesquisa e do copy conforme chegam
+python test_client.py --stream
+
+# Ou vários workers por agente atrás do balanceador (cliente em localhost:9000)
+python launcher.py --research 4 --content 2 --hosts 1
+python load_test.py --stream --url http://localhost:9000/copywriter_host/stream
+
+# Mesma coisa com um warm pool por agente: importa uma vez e faz fork dos workers
+python launcher.py --prefork --research 4 --content 2 --hosts 1
@@ -0,0 +1,186 @@
+# scraper.py
+import asyncio
+import time
+from typing import AsyncIterator
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from extractor import CHUNK_SIZE, MAX_CHARS, TextExtractor
+from page_cache import PageCache
+
+USER_AGENT = "Mozilla/5.0 (compatible; Research Bot)"
+# Resto de corpo que vale ler e descartar depois do limite de texto: com o corpo
+# inteiro lido a conexão volta ao pool; sem isso ela é fechada.
+DRAIN_LIMIT = 256 * 1024
+
+
+class HostRateLimiter:
+    """Garante um intervalo mínimo entre o início de duas requisições ao mesmo host."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next = {}
+        self._locks = {}
+
+    async def wait(self, host: str):
+        if self.interval <= 0:
+            return
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            start = max(now, self._next.get(host, now))
+            self._next[host] = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class Scraper:
+    """
+    Cliente HTTP assíncrono com pool de conexões compartilhado (keep-alive),
+    concorrência limitada e limite de taxa por host. Com ``cache``, páginas
+    recentes não vão à rede e as demais são revalidadas com GET condicional;
+    se a revalidação falhar (erro de rede ou status diferente de 200/304), o
+    texto vencido é servido no lugar da página de erro.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 16,
+        per_host: int = 4,
+        per_host_interval: float = 0.0,
+        timeout: float = 10,
+        max_chars: int = MAX_CHARS,
+        main_only: bool = False,
+        cache: PageCache = None,
+    ):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        # Sem ``total``: ele conta a espera por uma vaga no pool (limit_per_host), e
+        # lotes grandes estourariam antes de enviar a requisição. Os limites de
+        # socket só correm com a conexão em uso.
+        self.timeout = aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+        self.max_chars = max_chars
+        self.main_only = main_only
+        self.cache = cache
+        self.limiter = HostRateLimiter(per_host_interval)
+        # Textos no cache são por opções de extração: outro limite ou main_only não reaproveita.
+        self.variant = f"{max_chars}:{'main' if main_only else 'all'}"
+        self._session = None
+
+    async def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.concurrency,
+                limit_per_host=self.per_host,
+                ttl_dns_cache=300,
+                keepalive_timeout=30,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers={'User-Agent': USER_AGENT},
+            )
+        return self._session
+
+    async def scrape(self, url: str) -> str:
+        """
+        Baixa e extrai o texto de uma página, parando o download assim que o
+        limite de caracteres é preenchido
+        :param url: URL para extrair conteúdo
+        :return: texto extraído ou mensagem de erro
+        """
+        page = None
+        try:
+            # O SQLite do cache bloqueia (disputa de escrita entre os processos do pool): fora do event loop
+            page = await asyncio.to_thread(self.cache.lookup, url, self.variant) if self.cache else None
+            if page is not None and self.cache.is_fresh(page):
+                await asyncio.to_thread(self.cache.hit, page)
+                return page.text
+
+            session = await self.session()
+            await self.limiter.wait(urlsplit(url).netloc)
+            headers = self.cache.validators(page) if page is not None else None
+            async with session.get(url, headers=headers) as response:
+                if page is not None and response.status == 304:
+                    await asyncio.to_thread(self.cache.revalidated, page)
+                    return page.text
+                if page is not None and response.status != 200:
+                    await asyncio.to_thread(self.cache.stale, page)
+                    return page.text
+
+                extractor = TextExtractor(self.max_chars, self.main_only, response.charset)
+                raw = bytearray()
+                complete = True
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    raw += chunk
+                    if extractor.feed(chunk):
+                        complete = await _drain(response, raw)
+                        break
+                text = extractor.text()
+
+            if self.cache and response.status == 200:
+                await asyncio.to_thread(
+                    self.cache.store,
+                    url,
+                    bytes(raw),
+                    text,
+                    variant=self.variant,
+                    complete=complete,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+            return text
+        except Exception as e:
+            if page is not None:
+                await asyncio.to_thread(self.cache.stale, page)
+                return page.text
+            return f"Erro ao extrair conteúdo: {str(e)}"
+
+    async def iter_scrape(self, urls: list) -> AsyncIterator[tuple]:
+        """
+        Extrai várias páginas em paralelo, entregando cada uma assim que termina
+        :param urls: lista de URLs
+        :return: pares (url, texto) na ordem de conclusão
+        """
+        urls = list(dict.fromkeys(urls))
+
+        async def scrape_one(url):
+            return url, await self.scrape(url)
+
+        for finished in asyncio.as_completed([scrape_one(url) for url in urls]):
+            yield await finished
+
+    async def scrape_many(self, urls: list) -> dict:
+        """
+        Extrai várias páginas em paralelo
+        :param urls: lista de URLs
+        :return: dicionário URL -> texto, na ordem recebida
+        """
+        results = {url: text async for url, text in self.iter_scrape(urls)}
+        return {url: results[url] for url in dict.fromkeys(urls)}
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+
+async def _drain(response: aiohttp.ClientResponse, raw: bytearray) -> bool:
+    """
+    Lê o resto do corpo quando ele cabe em DRAIN_LIMIT, para a conexão ser
+    devolvida ao pool em vez de fechada
+    :param response: resposta cujo download parou no limite de texto
+    :param raw: bytes já lidos do corpo; o resto é acrescentado aqui
+    :return: True se o corpo foi lido até o fim
+    """
+    length = response.content_length
+    if length is not None and not response.headers.get("Content-Encoding") and length - len(raw) > DRAIN_LIMIT:
+        return False
+    drained = 0
+    while drained <= DRAIN_LIMIT:
+        chunk = await response.content.readany()
+        if not chunk:
+            return True
+        raw += chunk
+        drained += len(chunk)
+    return False
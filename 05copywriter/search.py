@@ -0,0 +1,272 @@
+# search.py
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from urllib.parse import quote
+
+import aiohttp
+
+DEFAULT_TTL = 60 * 60
+DEFAULT_MAXSIZE = 1024
+DEFAULT_CONCURRENCY = 8
+SERPER_URL = "https://google.serper.dev/search"
+
+
+class SearchBackend(ABC):
+    """Interface dos provedores de busca usados pelo servidor MCP."""
+
+    @abstractmethod
+    async def search(self, query: str, n_results: int) -> list:
+        """
+        Executa uma busca
+        :param query: termo de busca
+        :param n_results: número de resultados
+        :return: lista de resultados com título, URL e snippet
+        """
+
+    async def close(self):
+        pass
+
+
+class FakeSearchBackend(SearchBackend):
+    """
+    Busca simulada, sem rede, com latência configurável para testes e benchmarks.
+    Com ``base_url`` os resultados apontam para esse site (ex.: um servidor local).
+    """
+
+    def __init__(self, latency: float = 0.0, base_url: str = None):
+        self.latency = latency
+        self.base_url = base_url
+        self.calls = 0
+
+    async def search(self, query: str, n_results: int) -> list:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        slug = quote("-".join(query.lower().split()))
+        return [
+            {
+                "title": f"Resultado {i+1} para '{query}'",
+                "url": f"{self.base_url}/{slug}/{i+1}" if self.base_url else f"https://example{i+1}.com",
+                "snippet": f"Informação relevante sobre {query} encontrada no site {i+1}",
+            }
+            for i in range(n_results)
+        ]
+
+
+class SerperBackend(SearchBackend):
+    """Google Search via Serper.dev, com uma sessão HTTP reaproveitada entre as buscas."""
+
+    def __init__(self, api_key: str, gl: str = "br", hl: str = "pt-br", timeout: float = 10):
+        self.api_key = api_key
+        self.gl = gl
+        self.hl = hl
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session = None
+
+    async def search(self, query: str, n_results: int) -> list:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                headers={"X-API-KEY": self.api_key, "Content-Type": "application/json"},
+            )
+        payload = {"q": query, "num": n_results, "gl": self.gl, "hl": self.hl}
+        async with self._session.post(SERPER_URL, json=payload) as response:
+            response.raise_for_status()
+            data = await response.json()
+        return [
+            {"title": item.get("title"), "url": item.get("link"), "snippet": item.get("snippet")}
+            for item in data.get("organic", [])[:n_results]
+        ]
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+
+class SharedSearchCache:
+    """
+    Cache de buscas em SQLite, compartilhado pelos processos do pool de
+    servidores MCP. Os contadores ficam no mesmo arquivo e somam todos os
+    processos, então qualquer um deles responde pelas métricas do pool.
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL, maxsize: int = DEFAULT_MAXSIZE, clock=time.time):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS searches (key TEXT PRIMARY KEY, results TEXT NOT NULL, stored_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS searches_stored ON searches (stored_at);"
+            "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);"
+        )
+        self._conn.commit()
+
+    def get(self, key: str):
+        """Resultados da consulta dentro do TTL, contados como acerto; None se não houver"""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT results, stored_at FROM searches WHERE key = ?", (key,)).fetchone()
+            if row is None or self.clock() - row[1] > self.ttl:
+                return None
+            self._count(hits=1)
+        return json.loads(row[0])
+
+    def put(self, key: str, results: list):
+        """Grava os resultados de uma consulta que foi ao backend e descarta as mais antigas acima de ``maxsize``"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO searches (key, results, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(results, ensure_ascii=False), self.clock()),
+            )
+            self._conn.execute(
+                "DELETE FROM searches WHERE key IN"
+                " (SELECT key FROM searches ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+            self._count(misses=1)
+
+    def count(self, **deltas):
+        with self._lock, self._conn:
+            self._count(**deltas)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._conn.execute("SELECT name, value FROM counters"))
+            size = self._conn.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
+        return {"size": size, **{name: counters.get(name, 0) for name in ("hits", "misses", "shared")}}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _count(self, **deltas):
+        self._conn.executemany(
+            "INSERT INTO counters (name, value) VALUES (?, ?)"
+            " ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+            deltas.items(),
+        )
+
+
+class SearchService:
+    """
+    Camada sobre o backend: cache por consulta com TTL, deduplicação de
+    consultas idênticas em andamento (single-flight) e buscas em lote com
+    concorrência limitada.
+
+    Com ``store`` (SharedSearchCache) o cache fica no SQLite compartilhado
+    pelos processos do pool em vez da memória deste processo; a deduplicação
+    das consultas em andamento continua sendo por processo.
+    """
+
+    def __init__(
+        self,
+        backend: SearchBackend,
+        ttl: float = DEFAULT_TTL,
+        maxsize: int = DEFAULT_MAXSIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        clock=time.time,
+        store: SharedSearchCache = None,
+    ):
+        self.backend = backend
+        self.store = store
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def search(self, query: str, n_results: int = 5) -> list:
+        key = (" ".join(query.lower().split()), n_results)
+        if self.store is not None:
+            # SQLite bloqueia: fora do event loop
+            results = await asyncio.to_thread(self.store.get, _store_key(key))
+            if results is not None:
+                self.hits += 1
+                return results
+        else:
+            entry = self._cache.get(key)
+            if entry is not None:
+                results, stored_at = entry
+                if self.clock() - stored_at <= self.ttl:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return results
+                del self._cache[key]
+
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.shared += 1
+            if self.store is not None:
+                await asyncio.to_thread(self.store.count, shared=1)
+            return await asyncio.shield(flight)
+
+        self.misses += 1
+        flight = self._inflight[key] = asyncio.ensure_future(self._fetch(key, query, n_results))
+        return await asyncio.shield(flight)
+
+    async def search_many(self, queries: list, n_results: int = 5) -> dict:
+        """
+        Executa várias buscas em paralelo
+        :param queries: lista de termos de busca
+        :param n_results: número de resultados por busca
+        :return: dicionário termo -> resultados, na ordem recebida
+        """
+        queries = list(dict.fromkeys(queries))
+        results = await asyncio.gather(
+            *(self.search(query, n_results) for query in queries), return_exceptions=True
+        )
+        return {
+            query: [{"error": f"Erro na busca: {str(result)}"}] if isinstance(result, Exception) else result
+            for query, result in zip(queries, results)
+        }
+
+    def stats(self) -> dict:
+        """Contadores do cache; com ``store``, somados entre os processos e com os deste em ``process``"""
+        local = {"hits": self.hits, "misses": self.misses, "shared": self.shared}
+        if self.store is not None:
+            return {**self.store.stats(), "inflight": len(self._inflight), "process": local}
+        return {"size": len(self._cache), **local, "inflight": len(self._inflight)}
+
+    async def _fetch(self, key, query: str, n_results: int) -> list:
+        try:
+            async with self._semaphore:
+                results = await self.backend.search(query, n_results)
+            if self.store is not None:
+                await asyncio.to_thread(self.store.put, _store_key(key), results)
+                return results
+            self._cache[key] = (results, self.clock())
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+            return results
+        finally:
+            self._inflight.pop(key, None)
+
+
+def _store_key(key: tuple) -> str:
+    query, n_results = key
+    return f"{n_results}:{query}"
+
+
+def default_backend() -> SearchBackend:
+    """Serper.dev quando SERPER_API_KEY está definida; caso contrário, a busca simulada."""
+    api_key = os.getenv("SERPER_API_KEY")
+    if api_key:
+        return SerperBackend(api_key)
+    return FakeSearchBackend(
+        latency=float(os.getenv("SEARCH_FAKE_LATENCY", 0)),
+        base_url=os.getenv("SEARCH_FAKE_BASE_URL"),
+    )
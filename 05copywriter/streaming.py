@@ -0,0 +1,160 @@
+# streaming.py
+import json
+import uuid
+from contextlib import aclosing
+from typing import AsyncIterator, Callable
+
+import aiohttp
+from aiohttp import web
+from google.adk.agents import BaseAgent
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+NDJSON = "application/x-ndjson"
+
+
+def event_to_dict(event, agent: str) -> dict:
+    """
+    Converte um evento do ADK na linha JSON enviada ao cliente
+    :param event: evento do ADK
+    :param agent: nome do agente A2A que produziu o evento
+    :return: dicionário com texto, parcial/final e ferramentas chamadas
+    """
+    parts = event.content.parts if event.content and event.content.parts else []
+    data = {
+        "agent": agent,
+        "author": event.author,
+        "partial": bool(event.partial),
+        "final": event.is_final_response(),
+        "text": "".join(part.text or "" for part in parts if part.text and not part.thought),
+    }
+    calls = [call.name for call in event.get_function_calls()]
+    if calls:
+        data["tool_calls"] = calls
+    return data
+
+
+class AgentStreamer:
+    """
+    Executa um agente ADK com streaming SSE do modelo e entrega os eventos como
+    dicionários. A sessão só vive durante o stream: ao terminar (ou se o cliente
+    desconectar) ela é apagada, senão o ``InMemorySessionService`` cresceria a
+    cada brief do workflow.
+    """
+
+    def __init__(self, agent: BaseAgent, app_name: str = None):
+        self.app_name = app_name or agent.name
+        self.session_service = InMemorySessionService()
+        self.runner = Runner(agent=agent, app_name=self.app_name, session_service=self.session_service)
+
+    async def stream(self, payload: dict) -> AsyncIterator[dict]:
+        user_id = payload.get("user_id", "a2a")
+        session_id = payload.get("session_id") or uuid.uuid4().hex
+        session = await self.session_service.get_session(
+            app_name=self.app_name, user_id=user_id, session_id=session_id
+        )
+        if session is None:
+            await self.session_service.create_session(
+                app_name=self.app_name, user_id=user_id, session_id=session_id
+            )
+        message = types.Content(role="user", parts=[types.Part(text=payload["message"])])
+        try:
+            async for event in self.runner.run_async(
+                user_id=user_id,
+                session_id=session_id,
+                new_message=message,
+                run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+            ):
+                yield event_to_dict(event, self.app_name)
+        finally:
+            await self.session_service.delete_session(
+                app_name=self.app_name, user_id=user_id, session_id=session_id
+            )
+
+
+class StreamServer:
+    """
+    Servidor HTTP ao lado do A2AServer com duas rotas para o mesmo agente:
+    ``POST {endpoint}`` responde um JSON único ao final e
+    ``POST {endpoint}/stream`` envia cada evento como uma linha JSON (NDJSON)
+    assim que ele é produzido.
+
+    Roda em uma porta própria (a do A2A + 1) e com o ``InMemorySessionService``
+    do ``AgentStreamer``: as sessões não são compartilhadas com o A2AServer e
+    quem fala o protocolo A2A continua recebendo a resposta inteira no final.
+    Só clientes que chamam ``{endpoint}/stream`` nessa porta (o host, o
+    balanceador) recebem os eventos em streaming.
+    """
+
+    def __init__(self, endpoint: str, handler: Callable[[dict], AsyncIterator[dict]], host: str, port: int):
+        self.endpoint = endpoint
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.app = web.Application()
+        self.app.router.add_post(endpoint, self._buffered)
+        self.app.router.add_post(f"{endpoint}/stream", self._stream)
+        self._runner = None
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        # Com porta 0 o sistema escolhe uma livre; guarda a porta real.
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _buffered(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        final = ""
+        events = 0
+        async for event in self.handler(payload):
+            events += 1
+            if event["final"] and event["text"]:
+                final = event["text"]
+        return web.json_response({"response": final, "events": events})
+
+    async def _stream(self, request: web.Request) -> web.StreamResponse:
+        payload = await request.json()
+        response = web.StreamResponse(headers={"Content-Type": NDJSON, "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        try:
+            # aclosing: se o cliente cair no meio, o handler encerra (e apaga a sessão) na hora
+            async with aclosing(self.handler(payload)) as events:
+                async for event in events:
+                    await response.write(json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n")
+        except ConnectionResetError:
+            # O cliente desconectou: não há para quem enviar o erro nem o fim do stream.
+            return response
+        except Exception as e:
+            error = {"agent": self.endpoint.strip("/"), "final": True, "partial": False, "text": "", "error": str(e)}
+            await response.write(json.dumps(error, ensure_ascii=False).encode("utf-8") + b"\n")
+        await response.write_eof()
+        return response
+
+
+async def iter_ndjson(response: aiohttp.ClientResponse) -> AsyncIterator[dict]:
+    """Lê uma resposta NDJSON linha a linha, conforme os dados chegam."""
+    async for line in response.content:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+async def relay(session: aiohttp.ClientSession, url: str, payload: dict) -> AsyncIterator[dict]:
+    """
+    Repassa os eventos do endpoint de streaming de um agente filho
+    :param session: sessão HTTP do chamador
+    :param url: URL do endpoint ``/stream`` do agente
+    :param payload: mensagem e session_id
+    :return: eventos do agente filho, na ordem em que chegam
+    """
+    async with session.post(url, json=payload) as response:
+        response.raise_for_status()
+        async for event in iter_ndjson(response):
+            yield event
@@ -0,0 +1,104 @@
+# stub_model.py
+import asyncio
+import hashlib
+import json
+import re
+from typing import AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import PrivateAttr
+
+_URL = re.compile(r"https?://[^\s\"'\\,\]]+")
+_JSON_KEY = re.compile(r'"(\w+)"\s*:')
+
+
+class StubLlm(BaseLlm):
+    """
+    Modelo determinístico para benchmarks, sem rede nem chave de API.
+
+    Com as ferramentas do servidor MCP disponíveis, segue o roteiro do
+    research_agent: ``search_many`` com termos do pedido, ``scrape_many`` com
+    as URLs encontradas e então a resposta. A resposta é um JSON com as chaves
+    do modelo pedido na mensagem (ou na instrução), com valores derivados do
+    hash do pedido. Em streaming o texto sai em ``chunks`` pedaços.
+    ``capacity`` limita as gerações simultâneas no processo (0 = sem limite),
+    como a cota de um modelo por worker.
+    """
+
+    model: str = "stub-llm"
+    latency: float = 0.0
+    chunk_delay: float = 0.0
+    chunks: int = 8
+    max_urls: int = 3
+    capacity: int = 0
+    calls: int = 0
+    _slots: asyncio.Semaphore = PrivateAttr(default=None)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if not self.capacity:
+            async for response in self._generate(llm_request, stream):
+                yield response
+            return
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.capacity)
+        async with self._slots:
+            async for response in self._generate(llm_request, stream):
+                yield response
+
+    async def _generate(self, llm_request: LlmRequest, stream: bool) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+        call = self._next_tool_call(llm_request)
+        if call is not None:
+            name, args = call
+            part = types.Part(function_call=types.FunctionCall(name=name, args=args))
+            yield LlmResponse(content=types.Content(role="model", parts=[part]))
+            return
+
+        text = self._answer(llm_request)
+        if stream:
+            size = max(1, -(-len(text) // self.chunks))
+            for start in range(0, len(text), size):
+                await asyncio.sleep(self.chunk_delay)
+                piece = types.Part(text=text[start:start + size])
+                yield LlmResponse(content=types.Content(role="model", parts=[piece]), partial=True)
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+    def _next_tool_call(self, llm_request: LlmRequest):
+        tools = llm_request.tools_dict
+        last = llm_request.contents[-1] if llm_request.contents else None
+        responses = [part.function_response for part in (last.parts if last else None) or [] if part.function_response]
+        if not responses:
+            if "search_many" in tools:
+                topic = _request_text(llm_request)[:60]
+                return "search_many", {"queries": [topic, f"concorrentes {topic}"], "n_results": self.max_urls}
+            return None
+        if responses[0].name == "search_many" and "scrape_many" in tools:
+            urls = list(dict.fromkeys(_URL.findall(str(responses[0].response))))[: self.max_urls]
+            if urls:
+                return "scrape_many", {"urls": urls}
+        return None
+
+    def _answer(self, llm_request: LlmRequest) -> str:
+        request = _request_text(llm_request)
+        keys = _JSON_KEY.findall(request) or _JSON_KEY.findall(str(llm_request.config.system_instruction or ""))
+        seed = hashlib.sha256(request.encode("utf-8")).hexdigest()
+        answer = {}
+        for i, key in enumerate(dict.fromkeys(keys or ["resposta"])):
+            value = f"{key} {seed[i * 4:i * 4 + 8]}"
+            answer[key] = [value, f"{value} b"] if key.endswith(("s", "points")) else value
+        return json.dumps(answer, ensure_ascii=False)
+
+
+def _request_text(llm_request: LlmRequest) -> str:
+    """Texto da última mensagem do usuário que não é resposta de ferramenta."""
+    for content in reversed(llm_request.contents):
+        if content.role == "user" and content.parts and any(part.text for part in content.parts):
+            return "".join(part.text or "" for part in content.parts)
+    return ""
@@ -2,29 +2,72 @@
 import asyncio
 import aiohttp
 import json
+import sys
+import time
+
+BRIEFING = {
+    "produto": "Curso online de Python para iniciantes",
+    "publico_alvo": "Profissionais que querem migrar para tech",
+    "objetivo": "Aumentar conversões na landing page",
+    "tom": "Profissional mas acessível"
+}
+
+URL = "http://localhost:10000/copywriter_host"
+STREAM_URL = "http://localhost:10001/copywriter_host/stream"
+
+def build_payload(session_id: str = "test_session_001") -> dict:
+    return {
+        "message": f"Crie copy para: {json.dumps(BRIEFING, ensure_ascii=False)}",
+        "session_id": session_id
+    }
 
 async def test_copywriter_system():
     """Testa o sistema completo de copywriting"""
-    
-    briefing = {
-        "produto": "Curso online de Python para iniciantes",
-        "publico_alvo": "Profissionais que querem migrar para tech",
-        "objetivo": "Aumentar conversões na landing page",
-        "tom": "Profissional mas acessível"
-    }
-    
-    url = "http://localhost:10000/copywriter_host"
-    
+
     async with aiohttp.ClientSession() as session:
-        payload = {
-            "message": f"Crie copy para: {json.dumps(briefing, ensure_ascii=False)}",
-            "session_id": "test_session_001"
-        }
-        
-        async with session.post(url, json=payload) as response:
+        async with session.post(URL, json=build_payload()) as response:
             result = await response.json()
             print("=== RESULTADO DO COPYWRITING ===")
             print(json.dumps(result, indent=2, ensure_ascii=False))
 
+async def test_copywriter_stream():
+    """Testa o sistema consumindo os eventos em streaming, conforme chegam"""
+
+    start = time.perf_counter()
+    first_token = None
+    current = None
+    result = ""
+
+    async with aiohttp.ClientSession() as session:
+        async with session.post(STREAM_URL, json=build_payload()) as response:
+            async for line in response.content:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                label = event["agent"] + (f" / {event['section']}" if event.get("section") else "")
+                if event.get("error"):
+                    print(f"\n[erro em {label}] {event['error']}")
+                    continue
+                # As seções chegam intercaladas; um cabeçalho a cada troca.
+                if label != current:
+                    current = label
+                    print(f"\n=== {label} ===")
+                for tool in event.get("tool_calls", []):
+                    print(f"[ferramenta] {tool}")
+                if event["partial"] and event["text"]:
+                    if first_token is None:
+                        first_token = time.perf_counter() - start
+                    print(event["text"], end="", flush=True)
+                elif event["final"]:
+                    result = event["text"]
+
+    print("\n\n=== RESULTADO DO COPYWRITING ===")
+    print(result)
+    if first_token is not None:
+        print(f"\nPrimeiro token em {first_token:.2f}s, total {time.perf_counter() - start:.2f}s")
+
 if __name__ == "__main__":
-    asyncio.run(test_copywriter_system())
+    if "--stream" in sys.argv:
+        asyncio.run(test_copywriter_stream())
+    else:
+        asyncio.run(test_copywriter_system())
@@ -0,0 +1,216 @@
+# workflow.py
+import asyncio
+import json
+import re
+import time
+import uuid
+from typing import AsyncGenerator, AsyncIterator
+
+import aiohttp
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.genai import types
+
+from streaming import relay
+
+# Seções independentes da pesquisa, pedidas em paralelo ao research_agent
+RESEARCH_SECTIONS = {
+    "key_insights": (
+        "Pesquise o produto/nicho do briefing e retorne apenas os principais insights, "
+        'em JSON: {"key_insights": ["insight 1", "insight 2"], "sources": ["url1"]}'
+    ),
+    "competitor_analysis": (
+        "Pesquise os concorrentes do produto do briefing e retorne apenas a análise deles, "
+        'em JSON: {"competitor_analysis": ["análise 1", "análise 2"], "sources": ["url1"]}'
+    ),
+    "target_audience_pain_points": (
+        "Pesquise o público-alvo do briefing e retorne apenas as dores dele, "
+        'em JSON: {"target_audience_pain_points": ["dor 1", "dor 2"], "sources": ["url1"]}'
+    ),
+    "trending_keywords": (
+        "Pesquise as palavras-chave em alta no nicho do briefing, "
+        'em JSON: {"trending_keywords": ["palavra 1", "palavra 2"], "sources": ["url1"]}'
+    ),
+}
+
+# Partes do copy e as seções de pesquisa de que cada uma depende
+CONTENT_PARTS = {
+    "headline": (
+        ("key_insights", "target_audience_pain_points"),
+        'Crie apenas a headline e a subheadline, em JSON: {"headline": "...", "subheadline": "..."}',
+    ),
+    "bullet_points": (
+        ("target_audience_pain_points", "competitor_analysis"),
+        'Crie apenas os bullet points de benefícios, em JSON: {"bullet_points": ["benefício 1", "benefício 2"]}',
+    ),
+    "body_copy": (
+        tuple(RESEARCH_SECTIONS),
+        "Crie o texto principal, o CTA, a prova social e o elemento de urgência, em JSON: "
+        '{"body_copy": "...", "cta": "...", "social_proof": "...", "urgency_element": "..."}',
+    ),
+}
+
+
+class CopywriterWorkflow:
+    """
+    Fluxo do host no endpoint de streaming. As seções da pesquisa rodam em
+    paralelo e cada parte do copy começa assim que as seções de que depende
+    terminam; os eventos dos agentes filhos são repassados ao cliente, marcados
+    com a seção, conforme chegam. O evento final traz o tempo de cada chamada
+    aos filhos em ``timings``. As conexões com os filhos ficam num pool
+    persistente (keep-alive) compartilhado entre os briefings.
+    """
+
+    def __init__(
+        self,
+        research_url: str,
+        content_url: str,
+        name: str = "copywriter_host",
+        max_connections: int = 100,
+    ):
+        self.research_url = research_url
+        self.content_url = content_url
+        self.name = name
+        self.max_connections = max_connections
+        self._session = None
+
+    async def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=None))
+        return self._session
+
+    async def stream(self, payload: dict) -> AsyncIterator[dict]:
+        """
+        Executa o briefing recebido
+        :param payload: mensagem do cliente e session_id
+        :return: eventos das seções de pesquisa e das partes do copy, e o resultado final do host
+        """
+        session = await self.session()
+        session_id = payload.get("session_id") or uuid.uuid4().hex
+        briefing = payload["message"]
+        loop = asyncio.get_running_loop()
+        results = {name: loop.create_future() for name in (*RESEARCH_SECTIONS, *CONTENT_PARTS)}
+        queue = asyncio.Queue()
+        finished = object()
+        started = time.perf_counter()
+        timings = {}
+
+        async def run_node(name: str, url: str, instruction: str, deps: tuple = ()):
+            text = ""
+            try:
+                inputs = [(dep, await results[dep]) for dep in deps]
+                node_start = time.perf_counter()
+                message = f"{briefing}\n\n{instruction}"
+                if inputs:
+                    message += "\n\nPesquisa:\n" + "\n\n".join(f"## {dep}\n{value}" for dep, value in inputs)
+                # Uma sessão por seção: o mesmo filho atende várias seções ao mesmo tempo.
+                child = {"message": message, "session_id": f"{session_id}:{name}"}
+                async for event in relay(session, url, child):
+                    event["section"] = name
+                    if event["final"] and event["text"]:
+                        text = event["text"]
+                    await queue.put(event)
+                timings[name] = {
+                    "agent": url.rstrip("/").rsplit("/", 2)[-2],
+                    "start_ms": round((node_start - started) * 1000, 1),
+                    "duration_ms": round((time.perf_counter() - node_start) * 1000, 1),
+                }
+            except Exception as e:
+                await queue.put({
+                    "agent": self.name, "author": self.name, "section": name,
+                    "partial": False, "final": False, "text": "", "error": str(e),
+                })
+            finally:
+                # Em caso de erro as partes dependentes seguem com a seção vazia.
+                results[name].set_result(text)
+                await queue.put(finished)
+
+        nodes = [run_node(name, self.research_url, instruction) for name, instruction in RESEARCH_SECTIONS.items()]
+        nodes += [
+            run_node(name, self.content_url, instruction, deps)
+            for name, (deps, instruction) in CONTENT_PARTS.items()
+        ]
+        tasks = [asyncio.create_task(node) for node in nodes]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                event = await queue.get()
+                if event is finished:
+                    remaining -= 1
+                    continue
+                yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        copy = merge_sections({name: results[name].result() for name in CONTENT_PARTS})
+        research = merge_sections({name: results[name].result() for name in RESEARCH_SECTIONS})
+        final = json.dumps({**copy, "research": research}, ensure_ascii=False)
+        yield {
+            "agent": self.name, "author": self.name, "partial": False, "final": True, "text": final,
+            "timings": timings,
+        }
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+
+class WorkflowAgent(BaseAgent):
+    """
+    Agente ADK que executa o ``CopywriterWorkflow``: é o agente servido pelo
+    A2AServer do host, então o A2A usa o mesmo fluxo em paralelo do endpoint
+    de streaming. Os pedaços dos filhos viram eventos parciais e o copy
+    completo, a resposta final.
+    """
+
+    workflow: CopywriterWorkflow
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        parts = ctx.user_content.parts if ctx.user_content and ctx.user_content.parts else []
+        payload = {"message": "".join(part.text or "" for part in parts), "session_id": ctx.session.id}
+        async for event in self.workflow.stream(payload):
+            if event["final"] and event["agent"] == self.workflow.name:
+                yield self._event(ctx, event["text"])
+            elif event["partial"] and event["text"]:
+                yield self._event(ctx, event["text"], partial=True)
+
+    def _event(self, ctx: InvocationContext, text: str, partial: bool = False) -> Event:
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            partial=partial,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+        )
+
+
+def parse_json_object(text: str):
+    """Extrai o primeiro objeto JSON de uma resposta do modelo (com ou sem bloco ```json)."""
+    text = re.sub(r"^```\w*|```$", "", text.strip(), flags=re.MULTILINE)
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        return None
+    try:
+        value = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def merge_sections(texts: dict) -> dict:
+    """Junta os JSON de cada seção num único objeto; seções que não são JSON entram como texto."""
+    merged = {}
+    for name, text in texts.items():
+        value = parse_json_object(text)
+        if value is None:
+            merged[name] = text
+            continue
+        sources = value.pop("sources", None)
+        merged.update(value)
+        if sources:
+            merged.setdefault("sources", [])
+            merged["sources"] += [source for source in sources if source not in merged["sources"]]
+    return merged
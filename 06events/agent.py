@@ -1,9 +1,20 @@
+import asyncio
+import atexit
+import uuid
+
 from google.adk.agents import Agent
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 from google.genai import types
 from dotenv import load_dotenv
 from datetime import datetime, timezone
+from functools import cache
+
+from adk_extras.lazy import lazy_factory
+from adk_extras.sqlite_sessions import default_session_service
+from adk_extras.tracing import default_tracer, instrument, trace_session_service
+
+from .event_log import EventLogReader, EventLogWriter
+from .report import MarkdownReportSink, open_report_sink
 
 load_dotenv()
 
@@ -17,127 +28,177 @@ def tool_agent2(input_data: str) -> str:
 def tool_agent3(input_data: str) -> str:
     return f"Conteúdo processado pelo Agente 3: {input_data}"
 
-# Defina os subagentes
-agent1 = Agent(
-    name="AgentX",
-    model="gemini-2.0-flash", # ou outro modelo
-    description="Agente especializado em análise de dados.",
-    instruction="Sua tarefa é analisar dados e fornecer insights detalhados. Utilize a tool_agent1.",
-    tools=[tool_agent1]
-)
-
-agent2 = Agent(
-    name="AgentY",
-    model="gemini-2.0-flash",
-    description="Agente especializado em geração de texto criativo.",
-    instruction="Sua tarefa é gerar texto criativo com base em prompts. Utilize a tool_agent2.",
-    tools=[tool_agent2]
-)
-
-agent3 = Agent(
-    name="AgentZ",
-    model="gemini-2.0-flash",
-    description="Agente especializado em sumarização de documentos.",
-    instruction="Sua tarefa é sumarizar documentos extensos. Utilize a tool_agent3.",
-    tools=[tool_agent3]
-)
-
-# Defina o agente-raiz que orquestrará os subagentes
-# Ele delega com base na descrição dos sub_agents
-root_agent = Agent(
-    name="OrchestratorAgent",
-    model="gemini-2.0-flash",
-    description="Agente principal que coordena a equipe de agentes especializados.",
-    instruction="Você é um orquestrador. Direcione as consultas aos agentes especializados (AgentX, AgentY, AgentZ) com base na solicitação do usuário. Seja direto e conciso na delegação e na apresentação do resultado final. Não fale sobre as ferramentas internas.",
-    sub_agents=[agent1, agent2, agent3] # Aqui você define a hierarquia [8, 16]
-)
-
-
-import asyncio
+# Com ADK_TRACE=1 os callbacks medem agentes, modelo, ferramentas e sessão; sem ele nada é instalado
+tracer = default_tracer()
+
+
+def build_root_agent() -> Agent:
+    """Monta o orquestrador e os subagentes; chamado no primeiro acesso a ``root_agent``."""
+    # Defina os subagentes
+    agent1 = Agent(
+        name="AgentX",
+        model="gemini-2.0-flash", # ou outro modelo
+        description="Agente especializado em análise de dados.",
+        instruction="Sua tarefa é analisar dados e fornecer insights detalhados. Utilize a tool_agent1.",
+        tools=[tool_agent1]
+    )
+
+    agent2 = Agent(
+        name="AgentY",
+        model="gemini-2.0-flash",
+        description="Agente especializado em geração de texto criativo.",
+        instruction="Sua tarefa é gerar texto criativo com base em prompts. Utilize a tool_agent2.",
+        tools=[tool_agent2]
+    )
+
+    agent3 = Agent(
+        name="AgentZ",
+        model="gemini-2.0-flash",
+        description="Agente especializado em sumarização de documentos.",
+        instruction="Sua tarefa é sumarizar documentos extensos. Utilize a tool_agent3.",
+        tools=[tool_agent3]
+    )
+
+    # Defina o agente-raiz que orquestrará os subagentes
+    # Ele delega com base na descrição dos sub_agents
+    root_agent = Agent(
+        name="OrchestratorAgent",
+        model="gemini-2.0-flash",
+        description="Agente principal que coordena a equipe de agentes especializados.",
+        instruction="Você é um orquestrador. Direcione as consultas aos agentes especializados (AgentX, AgentY, AgentZ) com base na solicitação do usuário. Seja direto e conciso na delegação e na apresentação do resultado final. Não fale sobre as ferramentas internas.",
+        sub_agents=[agent1, agent2, agent3] # Aqui você define a hierarquia [8, 16]
+    )
+    return instrument(root_agent, tracer)
+
+
+__getattr__ = lazy_factory(__name__, "root_agent", build_root_agent)
+
+
+def event_text(event) -> str:
+    """Texto de todas as partes do evento, ou string vazia."""
+    if not (event.content and event.content.parts):
+        return ""
+    return "\n".join(part.text for part in event.content.parts if hasattr(part, 'text') and part.text is not None)
+
+def event_to_info(event) -> dict:
+    # A API de Eventos do ADK fornece detalhes sobre o tipo de evento e seu autor [12, 21]
+    # Isso é crucial para depuração e para capturar o fluxo de execução [21, 22]
+    event_info = {
+        "id": event.id,
+        "timestamp": datetime.fromtimestamp(event.timestamp, tz=timezone.utc).isoformat(),
+        "author": event.author,
+        "type": type(event).__name__, # Ex: Event, ToolStartEvent, ToolEndEvent, LlmAgentCompletionEvent
+        "is_final_response": event.is_final_response()
+    }
 
-async def run_and_collect_events(query: str, root_agent: Agent):
-    session_service = InMemorySessionService() # Ou DatabaseSessionService para persistência [20]
+    # Capturar conteúdo textual de qualquer parte do evento
+    text = event_text(event)
+    if text:
+        event_info["content"] = text
+    # Para conteúdo multimodal (ex: imagens), você pode ter uma lógica diferente [19, 23]
+    # if "[[IMAGE_DATA:" in event_info.get("content", ""):
+    #     # Lógica para extrair e processar dados de imagem
+
+    if event.actions: # Eventos de ação, como transferência de agente [12]
+        event_info["actions"] = event.actions.dict()
+
+    if event.get_function_calls(): # Se o evento envolve chamadas de função [12]
+        event_info["function_calls"] = [call.dict() for call in event.get_function_calls()]
+
+    if event.get_function_responses(): # Se o evento envolve respostas de função [12]
+        event_info["function_responses"] = [resp.dict() for resp in event.get_function_responses()]
+    return event_info
+
+@cache
+def session_service_for(tracer):
+    """
+    Serviço de sessões do processo, um por tracer: reaproveitado entre execuções para o
+    cache LRU de sessões continuar quente, e fechado na saída do processo
+    :param tracer: Tracer (adk_extras.tracing) que mede as chamadas ao serviço, ou None
+    :return: SqliteSessionService em SESSIONS_DB
+    """
+    service = default_session_service()
+    atexit.register(service.close)
+    return trace_session_service(service, tracer)
+
+async def run_and_collect_events(
+    query: str, root_agent: Agent, event_log: str = None, verbose: bool = True, sinks: list = None,
+    session_id: str = None, tracer=None,
+):
+    """
+    Executa a consulta e coleta os eventos
+    :param event_log: caminho de um log binário (EventLogWriter); os eventos são gravados nele
+        conforme chegam, em vez de ficarem numa lista em memória
+    :param sinks: relatórios (ReportSink) escritos evento a evento durante a execução
+    :param verbose: imprime um resumo de cada evento
+    :param session_id: sessão persistida em SQLite (SESSIONS_DB); sem ele cada execução abre uma
+        conversa nova, e o id de uma sessão já existente continua de onde ela parou
+    :param tracer: Tracer (adk_extras.tracing) do agente; os sinks ganham uma seção com os tempos da execução
+    :return: consulta, session_id (para retomar a conversa) e eventos (lista de dicionários, ou o EventLogReader do log)
+    """
+    session_service = session_service_for(tracer) # Sessões duráveis, compartilhadas entre processos
     app_name = "MultiAgentApp"
     user_id = "your_user_id"
-    session_id = "your_session_id" # Use um session_id único por conversa se quiser múltiplos registros
+    session_id = session_id or uuid.uuid4().hex
 
-    session = await session_service.create_session(app_name=app_name, user_id=user_id, session_id=session_id)
+    session = await session_service.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+    if session is None:
+        session = await session_service.create_session(app_name=app_name, user_id=user_id, session_id=session_id)
     runner = Runner(agent=root_agent, app_name=app_name, session_service=session_service)
 
     collected_content = {
         "user_query": query,
+        "session_id": session_id,
         "events": []
     }
+    writer = EventLogWriter(event_log) if event_log else None
+    if writer is not None:
+        writer.meta("user_query", query)
+    sinks = sinks or []
+    for sink in sinks:
+        sink.open(query)
 
     print(f"\n>>> Consulta do Usuário: {query}")
     content_message = types.Content(role='user', parts=[types.Part(text=query)])
-
-    async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content_message):
-        # A API de Eventos do ADK fornece detalhes sobre o tipo de evento e seu autor [12, 21]
-        # Isso é crucial para depuração e para capturar o fluxo de execução [21, 22]
-        event_info = {
-            "id": event.id,
-            "timestamp": datetime.fromtimestamp(event.timestamp, tz=timezone.utc).isoformat(),
-            "author": event.author,
-            "type": type(event).__name__, # Ex: Event, ToolStartEvent, ToolEndEvent, LlmAgentCompletionEvent
-            "is_final_response": event.is_final_response()
-        }
-
-        if event.content and event.content.parts:
-            # Capturar conteúdo textual de qualquer parte do evento
-            text_parts = [part.text for part in event.content.parts if hasattr(part, 'text') and part.text is not None]
-            if text_parts:
-                event_info["content"] = "\n".join(text_parts)
-            # Para conteúdo multimodal (ex: imagens), você pode ter uma lógica diferente [19, 23]
-            # if "[[IMAGE_DATA:" in event_info.get("content", ""):
-            #     # Lógica para extrair e processar dados de imagem
-
-        if event.actions: # Eventos de ação, como transferência de agente [12]
-            event_info["actions"] = event.actions.dict()
-
-        if event.get_function_calls(): # Se o evento envolve chamadas de função [12]
-            event_info["function_calls"] = [call.dict() for call in event.get_function_calls()]
-
-        if event.get_function_responses(): # Se o evento envolve respostas de função [12]
-            event_info["function_responses"] = [resp.dict() for resp in event.get_function_responses()]
-        
-        collected_content["events"].append(event_info)
-
-        print(f"  [Event] Autor: {event_info.get('author')}, Tipo: {event_info.get('type')}, Final: {event_info.get('is_final_response')}, Conteúdo: {event_info.get('content', '')[:100]}...") # Imprimir apenas os primeiros 100 caracteres do conteúdo
+    invocation_id = None
+
+    try:
+        async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content_message):
+            invocation_id = event.invocation_id
+            if writer is not None:
+                writer.append(event)
+            if sinks or writer is None:
+                event_info = event_to_info(event)
+                for sink in sinks:
+                    sink.write_event(event_info)
+                if writer is None:
+                    collected_content["events"].append(event_info)
+
+            if verbose:
+                print(f"  [Event] Autor: {event.author}, Tipo: {type(event).__name__}, Final: {event.is_final_response()}, Conteúdo: {event_text(event)[:100]}...") # Imprimir apenas os primeiros 100 caracteres do conteúdo
+        trace = tracer.run(invocation_id) if tracer is not None else None
+        if trace is not None:
+            for sink in sinks:
+                sink.write_timings(trace.summary())
+    finally:
+        session_service.flush()
+        if tracer is not None:
+            tracer.flush()
+        if writer is not None:
+            writer.close()
+        for sink in sinks:
+            sink.close()
+    if writer is not None:
+        collected_content["events"] = EventLogReader(event_log)
     return collected_content
 
 def generate_markdown_report(data: dict, filename: str = "agent_report.md"):
-    markdown_output = []
-    markdown_output.append(f"# Relatório de Execução do Agente de IA\n")
-    markdown_output.append(f"## Consulta do Usuário\n")
-    markdown_output.append(f"```\n{data['user_query']}\n```\n")
-    markdown_output.append(f"## Eventos de Execução\n")
-
-    for event in data["events"]:
-        markdown_output.append(f"### Evento ID: `{event['id']}`\n")
-        markdown_output.append(f"- **Timestamp**: {event['timestamp']}\n")
-        markdown_output.append(f"- **Autor**: `{event['author']}`\n")
-        markdown_output.append(f"- **Tipo**: `{event['type']}`\n")
-        markdown_output.append(f"- **Resposta Final**: `{event['is_final_response']}`\n")
-
-        if "content" in event and event["content"]:
-            markdown_output.append(f"- **Conteúdo**:\n")
-            markdown_output.append(f"```\n{event['content']}\n```\n")
-        
-        if "actions" in event and event["actions"]:
-            markdown_output.append(f"- **Ações**: `{event['actions']}`\n")
-        
-        if "function_calls" in event and event["function_calls"]:
-            markdown_output.append(f"- **Chamadas de Função**: `{event['function_calls']}`\n")
-
-        if "function_responses" in event and event["function_responses"]:
-            markdown_output.append(f"- **Respostas de Função**: `{event['function_responses']}`\n")
-
-        markdown_output.append("---\n") # Separador para clareza entre eventos
-
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write("\n".join(markdown_output))
-    
+    # Eventos já coletados (lista ou EventLogReader) vão para o arquivo um a um
+    with MarkdownReportSink(filename) as sink:
+        sink.open(data["user_query"])
+        for event in data["events"]:
+            sink.write_event(event)
+
     print(f"\nRelatório Markdown gerado em '{filename}'")
 
 # Exemplo de uso:
@@ -149,8 +210,14 @@ async def main_process():
     # Em um cenário real, você pode precisar de um `after_tool_callback` [12] para garantir que os resultados das ferramentas
     # ou dos subagentes sejam capturados e expostos nos eventos do agente-raiz.
     
-    report_data = await run_and_collect_events(user_query, root_agent)
-    generate_markdown_report(report_data)
+    # O relatório é escrito enquanto os eventos chegam; .jsonl e .html também são aceitos
+    sinks = [open_report_sink("agent_report.md")]
+    report_data = await run_and_collect_events(
+        user_query, build_root_agent(), event_log="agent_events.log", sinks=sinks, tracer=tracer
+    )
+    report_data["events"].close()
+    print(f"\nRelatório Markdown gerado em '{sinks[0].filename}'")
 
 if __name__ == "__main__":
+    # Módulo do pacote 06events: rode da raiz do repositório com python -m 06events.agent
     asyncio.run(main_process())
\ No newline at end of file
@@ -0,0 +1,114 @@
+"""
+Benchmark: tempo e pico de memória do relatório com 100 mil eventos, no
+generate_markdown_report original (lista de strings em memória, gravada no
+fim) contra os ReportSink incrementais (Markdown, JSONL e HTML).
+
+Os eventos vêm de um gerador, um a um, como chegam do runner.run_async; o
+relatório original precisa de todos eles em memória, como era coletado:
+
+    python -m 06events.bench_report --events 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from .agent import event_to_info
+from .bench_event_log import synthetic_events
+from .report import HtmlReportSink, JsonlReportSink, MarkdownReportSink
+
+QUERY = "Me analise os dados mais recentes de vendas e sumarize o artigo sobre computação quântica."
+
+
+def legacy_generate_markdown_report(data: dict, filename: str):
+    """generate_markdown_report antes dos sinks: monta tudo em memória e grava no fim."""
+    markdown_output = []
+    markdown_output.append(f"# Relatório de Execução do Agente de IA\n")
+    markdown_output.append(f"## Consulta do Usuário\n")
+    markdown_output.append(f"```\n{data['user_query']}\n```\n")
+    markdown_output.append(f"## Eventos de Execução\n")
+    for event in data["events"]:
+        markdown_output.append(f"### Evento ID: `{event['id']}`\n")
+        markdown_output.append(f"- **Timestamp**: {event['timestamp']}\n")
+        markdown_output.append(f"- **Autor**: `{event['author']}`\n")
+        markdown_output.append(f"- **Tipo**: `{event['type']}`\n")
+        markdown_output.append(f"- **Resposta Final**: `{event['is_final_response']}`\n")
+        if "content" in event and event["content"]:
+            markdown_output.append(f"- **Conteúdo**:\n")
+            markdown_output.append(f"```\n{event['content']}\n```\n")
+        if "actions" in event and event["actions"]:
+            markdown_output.append(f"- **Ações**: `{event['actions']}`\n")
+        if "function_calls" in event and event["function_calls"]:
+            markdown_output.append(f"- **Chamadas de Função**: `{event['function_calls']}`\n")
+        if "function_responses" in event and event["function_responses"]:
+            markdown_output.append(f"- **Respostas de Função**: `{event['function_responses']}`\n")
+        markdown_output.append("---\n")
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write("\n".join(markdown_output))
+
+
+def event_stream(templates: list, count: int):
+    """``count`` eventos no formato de event_to_info, gerados sob demanda a partir de modelos."""
+    for i in range(count):
+        event = dict(templates[i % len(templates)])
+        event["id"] = f"ev{i:08d}"
+        yield event
+
+
+def measure(label: str, run, count: int, path: str):
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    size = os.path.getsize(path)
+    print(
+        f"{label:<22} {elapsed:7.2f}s   {count / elapsed:9.0f} eventos/s   pico {peak / 1024 / 1024:8.1f} MB   "
+        f"arquivo {size / 1024 / 1024:7.1f} MB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=100_000)
+    args = parser.parse_args()
+
+    templates = [event_to_info(event) for event in synthetic_events(1000)]
+    directory = tempfile.mkdtemp()
+    print(f"{args.events} eventos")
+
+    legacy_path = os.path.join(directory, "legado.md")
+
+    def legacy():
+        # A coleta original guardava todos os eventos antes de gerar o relatório.
+        data = {"user_query": QUERY, "events": list(event_stream(templates, args.events))}
+        legacy_generate_markdown_report(data, legacy_path)
+
+    measure("markdown original", legacy, args.events, legacy_path)
+
+    for label, sink_class, name in (
+        ("markdown incremental", MarkdownReportSink, "relatorio.md"),
+        ("jsonl incremental", JsonlReportSink, "relatorio.jsonl"),
+        ("html incremental", HtmlReportSink, "relatorio.html"),
+    ):
+        path = os.path.join(directory, name)
+
+        def streaming():
+            with sink_class(path) as sink:
+                sink.open(QUERY)
+                for event in event_stream(templates, args.events):
+                    sink.write_event(event)
+
+        measure(label, streaming, args.events, path)
+
+    with open(legacy_path, encoding="utf-8") as a, open(os.path.join(directory, "relatorio.md"), encoding="utf-8") as b:
+        assert a.read() == b.read(), "relatório incremental difere do original"
+    for name in ("legado.md", "relatorio.md", "relatorio.jsonl", "relatorio.html"):
+        os.remove(os.path.join(directory, name))
+
+
+if __name__ == "__main__":
+    main()
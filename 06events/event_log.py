@@ -0,0 +1,305 @@
+import json
+import mmap
+import os
+import struct
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+MAGIC = b"ADKEVT1\n"
+INLINE_LIMIT = 256
+BUFFER_SIZE = 64 * 1024
+
+# Tipos de registro
+STRING = 1
+EVENT = 2
+META = 3
+
+# Bits de flags do evento
+FINAL = 1
+CONTENT = 2
+ACTIONS = 4
+CALLS = 8
+RESPONSES = 16
+
+_RECORD = struct.Struct("<IB")         # tamanho do corpo, tipo
+_EVENT = struct.Struct("<dIIBB")       # timestamp, autor, tipo, flags, tamanho do id
+_INLINE = struct.Struct("<BI")         # 0, tamanho
+_OUTLINE = struct.Struct("<BQI")       # 1, offset no arquivo de corpos, tamanho
+_FIELDS = (("content", CONTENT), ("actions", ACTIONS), ("function_calls", CALLS), ("function_responses", RESPONSES))
+
+
+def bodies_path(path: str) -> str:
+    return path + ".bodies"
+
+
+class EventLogWriter:
+    """
+    Grava os eventos de uma execução num log binário, à medida que chegam.
+
+    Cada registro é ``<tamanho><tipo><corpo>``. Autores e tipos de evento são
+    internados: a primeira ocorrência grava um registro ``STRING`` e os eventos
+    guardam só o índice. Conteúdo, ações e chamadas/respostas de função vão em
+    JSON compacto (sem campos vazios); acima de ``inline_limit`` bytes ficam
+    fora da linha, no arquivo ``.bodies``, e o evento guarda offset e tamanho.
+    Um registro truncado no fim (queda do processo) é ignorado na leitura.
+    Com ``append=True`` continua um log existente em vez de recriá-lo.
+    """
+
+    def __init__(
+        self, path: str, append: bool = False, inline_limit: int = INLINE_LIMIT, buffer_size: int = BUFFER_SIZE
+    ):
+        self.path = path
+        self.inline_limit = inline_limit
+        new = not append or not os.path.exists(path) or os.path.getsize(path) == 0
+        self._strings = {}
+        if not new:
+            # Continua um log existente: recupera a tabela de strings e descarta um registro incompleto.
+            with EventLogReader(path) as reader:
+                self._strings = {value: i for i, value in enumerate(reader.strings)}
+                end = reader.end
+            os.truncate(path, end)
+        mode = "wb" if new else "ab"
+        self._log = open(path, mode, buffering=buffer_size)
+        self._bodies = open(bodies_path(path), mode, buffering=buffer_size)
+        self._bodies_size = self._bodies.tell()
+        if new:
+            self._log.write(MAGIC)
+        self.events = 0
+
+    def meta(self, key: str, value: str):
+        """Grava um par chave/valor da execução (ex.: a consulta do usuário)."""
+        self._record(META, _pack_str(key) + _pack_str(value))
+
+    def append(self, event: Event):
+        flags = FINAL if event.is_final_response() else 0
+        fields = []
+        texts, calls, responses = [], [], []
+        for part in (event.content.parts or []) if event.content else []:
+            if part.text is not None:
+                texts.append(part.text)
+            if part.function_call:
+                calls.append(part.function_call)
+            if part.function_response:
+                responses.append(part.function_response)
+        if texts:
+            flags |= CONTENT
+            fields.append("\n".join(texts).encode("utf-8"))
+        if event.actions:
+            actions = event.actions.model_dump_json(exclude_defaults=True)
+            if actions != "{}":
+                flags |= ACTIONS
+                fields.append(actions.encode("utf-8"))
+        if calls:
+            flags |= CALLS
+            fields.append(_dumps_models(calls))
+        if responses:
+            flags |= RESPONSES
+            fields.append(_dumps_models(responses))
+
+        event_id = event.id.encode("utf-8")
+        body = [
+            _EVENT.pack(event.timestamp, self._intern(event.author), self._intern(type(event).__name__), flags, len(event_id)),
+            event_id,
+        ]
+        for data in fields:
+            body.append(self._body_ref(data))
+        self._record(EVENT, b"".join(body))
+        self.events += 1
+
+    def flush(self):
+        self._bodies.flush()
+        self._log.flush()
+
+    def close(self):
+        self._bodies.close()
+        self._log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _intern(self, value: str) -> int:
+        index = self._strings.get(value)
+        if index is None:
+            index = self._strings[value] = len(self._strings)
+            self._record(STRING, value.encode("utf-8"))
+        return index
+
+    def _body_ref(self, data: bytes) -> bytes:
+        if len(data) <= self.inline_limit:
+            return _INLINE.pack(0, len(data)) + data
+        offset = self._bodies_size
+        self._bodies.write(data)
+        self._bodies_size += len(data)
+        return _OUTLINE.pack(1, offset, len(data))
+
+    def _record(self, kind: int, body: bytes):
+        self._log.write(_RECORD.pack(len(body), kind))
+        self._log.write(body)
+
+
+class LoggedEvent:
+    """Evento lido do log; os corpos só são decodificados quando acessados."""
+
+    __slots__ = ("_reader", "_offset", "id", "timestamp", "author", "type", "flags")
+
+    def __init__(self, reader: "EventLogReader", offset: int):
+        self._reader = reader
+        timestamp, author, kind, flags, id_size = _EVENT.unpack_from(reader._log, offset)
+        start = offset + _EVENT.size
+        self.id = bytes(reader._log[start:start + id_size]).decode("utf-8")
+        self.timestamp = timestamp
+        self.author = reader.strings[author]
+        self.type = reader.strings[kind]
+        self.flags = flags
+        self._offset = start + id_size
+
+    @property
+    def is_final_response(self) -> bool:
+        return bool(self.flags & FINAL)
+
+    def field(self, name: str) -> Optional[bytes]:
+        """Bytes brutos de ``content``, ``actions``, ``function_calls`` ou ``function_responses``."""
+        offset = self._offset
+        for field, bit in _FIELDS:
+            if not self.flags & bit:
+                continue
+            data, next_offset = self._reader._body(offset)
+            if field == name:
+                return data
+            offset = next_offset
+        return None
+
+    @property
+    def content(self) -> Optional[str]:
+        data = self.field("content")
+        return None if data is None else data.decode("utf-8")
+
+    def to_dict(self) -> dict:
+        """O mesmo dicionário que ``run_and_collect_events`` monta para cada evento."""
+        info = {
+            "id": self.id,
+            "timestamp": datetime.fromtimestamp(self.timestamp, tz=timezone.utc).isoformat(),
+            "author": self.author,
+            "type": self.type,
+            "is_final_response": self.is_final_response,
+        }
+        content = self.content
+        if content:
+            info["content"] = content
+        actions = self.field("actions")
+        info["actions"] = EventActions.model_validate(json.loads(actions) if actions else {}).model_dump()
+        calls = self.field("function_calls")
+        if calls:
+            info["function_calls"] = [types.FunctionCall.model_validate(c).model_dump() for c in json.loads(calls)]
+        responses = self.field("function_responses")
+        if responses:
+            info["function_responses"] = [
+                types.FunctionResponse.model_validate(r).model_dump() for r in json.loads(responses)
+            ]
+        return info
+
+
+class EventLogReader:
+    """
+    Lê um log gravado pelo ``EventLogWriter`` via mmap, sem carregar o arquivo.
+
+    A abertura percorre só os cabeçalhos dos registros para montar a tabela de
+    strings, os metadados e o índice de offsets dos eventos; ``reader[i]`` e a
+    iteração decodificam cada evento sob demanda. Iterar o leitor devolve os
+    dicionários no formato de ``run_and_collect_events``.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.strings = []
+        self.meta = {}
+        self._offsets = []
+        self._files = []
+        self._log = self._map(path)
+        self._bodies = self._map(bodies_path(path))
+        if self._log[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} não é um log de eventos")
+        self._scan()
+
+    def _map(self, path: str):
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return b""
+        f = open(path, "rb")
+        self._files.append(f)
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _scan(self):
+        log = self._log
+        offset = len(MAGIC)
+        end = len(log)
+        while offset + _RECORD.size <= end:
+            size, kind = _RECORD.unpack_from(log, offset)
+            body = offset + _RECORD.size
+            if body + size > end:
+                break  # registro incompleto no fim do arquivo
+            if kind == EVENT:
+                self._offsets.append(body)
+            elif kind == STRING:
+                self.strings.append(bytes(log[body:body + size]).decode("utf-8"))
+            elif kind == META:
+                key, value_offset = _unpack_str(log, body)
+                self.meta[key] = _unpack_str(log, value_offset)[0]
+            offset = body + size
+        self.end = offset
+
+    def _body(self, offset: int) -> tuple:
+        if self._log[offset] == 0:
+            _, size = _INLINE.unpack_from(self._log, offset)
+            start = offset + _INLINE.size
+            return bytes(self._log[start:start + size]), start + size
+        _, position, size = _OUTLINE.unpack_from(self._log, offset)
+        return bytes(self._bodies[position:position + size]), offset + _OUTLINE.size
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, index: int) -> LoggedEvent:
+        return LoggedEvent(self, self._offsets[index])
+
+    def events(self) -> Iterator[LoggedEvent]:
+        for offset in self._offsets:
+            yield LoggedEvent(self, offset)
+
+    def __iter__(self) -> Iterator[dict]:
+        for event in self.events():
+            yield event.to_dict()
+
+    def close(self):
+        for data in (self._log, self._bodies):
+            if isinstance(data, mmap.mmap):
+                data.close()
+        for f in self._files:
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _dumps_models(models: list) -> bytes:
+    """Lista de modelos pydantic em JSON compacto, serializada pelo pydantic-core."""
+    return ("[" + ",".join(model.model_dump_json(exclude_none=True) for model in models) + "]").encode("utf-8")
+
+
+def _pack_str(value: str) -> bytes:
+    data = value.encode("utf-8")
+    return struct.pack("<I", len(data)) + data
+
+
+def _unpack_str(buffer, offset: int) -> tuple:
+    (size,) = struct.unpack_from("<I", buffer, offset)
+    start = offset + 4
+    return bytes(buffer[start:start + size]).decode("utf-8"), start + size
@@ -0,0 +1,212 @@
+import html
+import json
+import os
+import time
+
+BUFFER_SIZE = 64 * 1024
+FLUSH_INTERVAL = 1.0
+
+
+class ReportSink:
+    """
+    Relatório gravado de forma incremental: o cabeçalho na abertura, uma seção
+    por evento assim que ele chega e o rodapé no fechamento. Nada além do
+    buffer do arquivo fica em memória, e o buffer vai para o disco a cada
+    ``flush_interval`` segundos, então uma queda perde no máximo esse trecho.
+
+    Subclasses implementam ``header``, ``event``, ``timings`` e ``footer``
+    devolvendo o texto de cada parte.
+    """
+
+    def __init__(self, filename: str, buffer_size: int = BUFFER_SIZE, flush_interval: float = FLUSH_INTERVAL):
+        self.filename = filename
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.events = 0
+        self._file = None
+        self._last_flush = 0.0
+
+    def open(self, user_query: str):
+        self._file = open(self.filename, "w", encoding="utf-8", buffering=self.buffer_size)
+        self._last_flush = time.monotonic()
+        self._write(self.header(user_query))
+
+    def write_event(self, event: dict):
+        """
+        Acrescenta a seção de um evento
+        :param event: dicionário no formato de ``event_to_info``
+        """
+        self._write(self.event(event))
+        self.events += 1
+        now = time.monotonic()
+        if now - self._last_flush >= self.flush_interval:
+            self._file.flush()
+            self._last_flush = now
+
+    def write_timings(self, rows: list):
+        """
+        Acrescenta a seção de tempos de execução
+        :param rows: linhas de ``RunTrace.summary()`` (adk_extras.tracing)
+        """
+        if rows:
+            self._write(self.timings(rows))
+
+    def close(self):
+        if self._file is None:
+            return
+        self._write(self.footer())
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, text: str):
+        if text:
+            self._file.write(text)
+
+    def header(self, user_query: str) -> str:
+        return ""
+
+    def event(self, event: dict) -> str:
+        raise NotImplementedError
+
+    def timings(self, rows: list) -> str:
+        return ""
+
+    def footer(self) -> str:
+        return ""
+
+
+class MarkdownReportSink(ReportSink):
+    """Relatório em Markdown, no mesmo formato de ``generate_markdown_report``."""
+
+    def header(self, user_query: str) -> str:
+        return _join([
+            f"# Relatório de Execução do Agente de IA\n",
+            f"## Consulta do Usuário\n",
+            f"```\n{user_query}\n```\n",
+            f"## Eventos de Execução\n",
+        ])
+
+    def event(self, event: dict) -> str:
+        lines = [
+            f"### Evento ID: `{event['id']}`\n",
+            f"- **Timestamp**: {event['timestamp']}\n",
+            f"- **Autor**: `{event['author']}`\n",
+            f"- **Tipo**: `{event['type']}`\n",
+            f"- **Resposta Final**: `{event['is_final_response']}`\n",
+        ]
+        if event.get("content"):
+            lines.append(f"- **Conteúdo**:\n")
+            lines.append(f"```\n{event['content']}\n```\n")
+        if event.get("actions"):
+            lines.append(f"- **Ações**: `{event['actions']}`\n")
+        if event.get("function_calls"):
+            lines.append(f"- **Chamadas de Função**: `{event['function_calls']}`\n")
+        if event.get("function_responses"):
+            lines.append(f"- **Respostas de Função**: `{event['function_responses']}`\n")
+        lines.append("---\n") # Separador para clareza entre eventos
+        return "\n" + _join(lines)
+
+    def timings(self, rows: list) -> str:
+        lines = [
+            "## Tempos de Execução\n",
+            "| Tipo | Nome | Chamadas | Total (ms) | Próprio (ms) | Tokens entrada | Tokens saída |",
+            "|---|---|---:|---:|---:|---:|---:|",
+        ]
+        for row in rows:
+            lines.append(
+                f"| {row['kind']} | `{row['name']}` | {row['calls']} | {row['total_ms']:.1f} | {row['self_ms']:.1f} "
+                f"| {row['input_tokens']} | {row['output_tokens']} |"
+            )
+        return "\n" + "\n".join(lines) + "\n"
+
+
+class JsonlReportSink(ReportSink):
+    """Uma linha JSON com a consulta e depois uma linha por evento."""
+
+    def header(self, user_query: str) -> str:
+        return json.dumps({"user_query": user_query}, ensure_ascii=False) + "\n"
+
+    def event(self, event: dict) -> str:
+        return json.dumps(event, ensure_ascii=False, default=str) + "\n"
+
+    def timings(self, rows: list) -> str:
+        return json.dumps({"timings": rows}, ensure_ascii=False) + "\n"
+
+
+class HtmlReportSink(ReportSink):
+    """Relatório em HTML autocontido, com uma seção por evento."""
+
+    def header(self, user_query: str) -> str:
+        return (
+            "<!DOCTYPE html>\n<html lang=\"pt-BR\">\n<head>\n<meta charset=\"utf-8\">\n"
+            "<title>Relatório de Execução do Agente de IA</title>\n"
+            "<style>body{font-family:sans-serif;max-width:960px;margin:auto}"
+            "pre{background:#f4f4f4;padding:8px;white-space:pre-wrap}section{border-bottom:1px solid #ddd}</style>\n"
+            "</head>\n<body>\n<h1>Relatório de Execução do Agente de IA</h1>\n"
+            f"<h2>Consulta do Usuário</h2>\n<pre>{html.escape(user_query)}</pre>\n"
+            "<h2>Eventos de Execução</h2>\n"
+        )
+
+    def event(self, event: dict) -> str:
+        parts = [
+            f"<section>\n<h3>Evento ID: <code>{html.escape(str(event['id']))}</code></h3>\n<ul>\n",
+            f"<li><b>Timestamp</b>: {html.escape(str(event['timestamp']))}</li>\n",
+            f"<li><b>Autor</b>: <code>{html.escape(str(event['author']))}</code></li>\n",
+            f"<li><b>Tipo</b>: <code>{html.escape(str(event['type']))}</code></li>\n",
+            f"<li><b>Resposta Final</b>: <code>{event['is_final_response']}</code></li>\n",
+        ]
+        for key, label in (
+            ("actions", "Ações"),
+            ("function_calls", "Chamadas de Função"),
+            ("function_responses", "Respostas de Função"),
+        ):
+            if event.get(key):
+                parts.append(f"<li><b>{label}</b>: <code>{html.escape(str(event[key]))}</code></li>\n")
+        parts.append("</ul>\n")
+        if event.get("content"):
+            parts.append(f"<pre>{html.escape(event['content'])}</pre>\n")
+        parts.append("</section>\n")
+        return "".join(parts)
+
+    def timings(self, rows: list) -> str:
+        parts = [
+            "<h2>Tempos de Execução</h2>\n<table>\n<tr><th>Tipo</th><th>Nome</th><th>Chamadas</th>"
+            "<th>Total (ms)</th><th>Próprio (ms)</th><th>Tokens entrada</th><th>Tokens saída</th></tr>\n"
+        ]
+        for row in rows:
+            parts.append(
+                f"<tr><td>{row['kind']}</td><td><code>{html.escape(row['name'])}</code></td><td>{row['calls']}</td>"
+                f"<td>{row['total_ms']:.1f}</td><td>{row['self_ms']:.1f}</td>"
+                f"<td>{row['input_tokens']}</td><td>{row['output_tokens']}</td></tr>\n"
+            )
+        parts.append("</table>\n")
+        return "".join(parts)
+
+    def footer(self) -> str:
+        return "</body>\n</html>\n"
+
+
+SINKS = {
+    ".md": MarkdownReportSink,
+    ".jsonl": JsonlReportSink,
+    ".html": HtmlReportSink,
+}
+
+
+def open_report_sink(filename: str, **kwargs) -> ReportSink:
+    """Escolhe o formato do relatório pela extensão do arquivo (.md, .jsonl ou .html)."""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in SINKS:
+        raise ValueError(f"Formato de relatório não suportado: {extension} (use {', '.join(SINKS)})")
+    return SINKS[extension](filename, **kwargs)
+
+
+def _join(lines: list) -> str:
+    # Cada linha seguida de uma em branco, como o "\n".join do relatório original.
+    return "\n".join(lines)
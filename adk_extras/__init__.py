@@ -0,0 +1 @@
+"""Shared building blocks for the agents in this repository."""
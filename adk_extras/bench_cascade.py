@@ -0,0 +1,130 @@
+"""
+Benchmark: cheap-first cascade against always using the biggest model, without network.
+
+The stage is ``pesquisador_financeiro`` (03financial): it must answer a
+comma-separated list of tickers, checked with ``is_ticker_list``. Three
+simulated tiers stand in for flash-lite, flash and the 2.5 model; the cheaper
+ones are faster but now and then answer prose instead of tickers (``--miss``).
+A share of the requests (``--long``) carries a long prompt, above the cheap
+tier's input limit, and starts at the middle tier.
+
+Cost is relative, in units of the cheapest tier's price per call (``--prices``).
+
+    python -m adk_extras.bench_cascade --requests 200
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from google.adk.agents import LlmAgent
+from google.adk.models.llm_request import LlmRequest
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from adk_extras.cascade import CascadeLlm, cascade_stats
+from adk_extras.fake_llm import FakeLlm
+from fii_data import is_ticker_list
+
+APP = "bench"
+USER = "usuario"
+ROUTE = "pesquisador_financeiro"
+TICKERS = ["HGLG11", "KNRI11", "XPML11", "MXRF11", "VISC11", "BTLG11", "HGRU11", "KNCR11"]
+PROSE = "Claro! Os fundos mais conhecidos do mercado são os de logística e de shoppings."
+CONTEXT = "Considere também o histórico de rendimentos, a vacância e a gestão de cada fundo. "
+
+
+def tier_responder(rng: random.Random, miss: float):
+    def responder(llm_request: LlmRequest) -> str:
+        if rng.random() < miss:
+            return PROSE
+        return ", ".join(rng.sample(TICKERS, 3))
+
+    return responder
+
+
+def build_tiers(args, rng: random.Random) -> list:
+    latencies = [float(ms) / 1000 for ms in args.latencies.split(",")]
+    misses = [float(m) for m in args.miss.split(",")]
+    names = ["fake-lite", "fake-flash", "fake-pro"]
+    return [
+        FakeLlm(model=name, latency=latency, responder=tier_responder(rng, miss))
+        for name, latency, miss in zip(names, latencies, misses)
+    ]
+
+
+def build_agent(model) -> LlmAgent:
+    return LlmAgent(
+        name=ROUTE,
+        model=model,
+        instruction="Liste os tickers dos fundos imobiliários pedidos, separados por vírgula.",
+    )
+
+
+async def run(agent: LlmAgent, prompts: list) -> list:
+    service = InMemorySessionService()
+    runner = Runner(agent=agent, app_name=APP, session_service=service)
+    times = []
+    for prompt in prompts:
+        session = await service.create_session(app_name=APP, user_id=USER)
+        message = types.Content(role="user", parts=[types.Part(text=prompt)])
+        start = time.perf_counter()
+        async for _ in runner.run_async(user_id=USER, session_id=session.id, new_message=message):
+            pass
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def report(label: str, times: list, cost: float, requests: int) -> None:
+    ordered = sorted(times)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{label:<12} mean {statistics.mean(times) * 1000:7.1f} ms   p95 {p95 * 1000:7.1f} ms   "
+        f"cost {cost / requests:5.2f} per request"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latencies", default="40,90,250", help="ms per tier, cheapest first")
+    parser.add_argument("--miss", default="0.15,0.05,0", help="share of prose answers per tier")
+    parser.add_argument("--prices", default="1,4,16", help="relative price of a call per tier")
+    parser.add_argument("--long", type=float, default=0.1, help="share of prompts above the cheap tier's limit")
+    parser.add_argument("--limit", type=int, default=400, help="input token limit of the cheap tier")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    prompts = [
+        "Quais FIIs de logística devo analisar?" + (CONTEXT * 40 if rng.random() < args.long else "")
+        for _ in range(args.requests)
+    ]
+    prices = [float(price) for price in args.prices.split(",")]
+
+    tiers = build_tiers(args, random.Random(1))
+    big_times = await run(build_agent(tiers[-1]), prompts)
+    report("always big", big_times, tiers[-1].calls * prices[-1], args.requests)
+
+    tiers = build_tiers(args, random.Random(1))
+    cascade = CascadeLlm(tiers=tiers, route=ROUTE, validator=is_ticker_list, max_input_tokens=[args.limit])
+    cascade_times = await run(build_agent(cascade), prompts)
+    cost = sum(tier.calls * price for tier, price in zip(tiers, prices))
+    report("cascade", cascade_times, cost, args.requests)
+
+    stats = cascade_stats()[ROUTE]
+    print(
+        f"\nescalation rate {stats['escalation_rate']:.1%}, "
+        f"{stats['skipped_by_size']} requests started above the cheap tier by size"
+    )
+    for model, tier in stats["tiers"].items():
+        failures = ", ".join(f"{reason} {count}" for reason, count in tier["failures"].items()) or "-"
+        print(
+            f"  {model:<10} calls {tier['calls']:>4}  accepted {tier['accepted']:>4}  "
+            f"p50 {tier['p50_ms']:6.1f} ms  p95 {tier['p95_ms']:6.1f} ms  failures: {failures}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,185 @@
+"""
+Benchmark: prompt tokens and stage latency with and without state compaction.
+
+Two pipelines, each a stage that writes raw state and a writer that templates
+it into its instruction, run with and without ``CompactionStage`` in between:
+
+* fii: quotes and one year of weekly history for N funds, as ``get_fii_data``
+  and ``get_fii_history`` return them (03financial);
+* pesquisa: K search results that repeat each other's sentences (02multiagentes).
+
+The model is simulated: its latency grows with the prompt, at ``--prefill``
+ms per thousand tokens plus ``--base`` ms, the shape of a real model's
+time to first token.
+
+    python -m adk_extras.bench_compaction
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent, LlmAgent, SequentialAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from adk_extras.compaction import CompactionStage, estimate_tokens
+from adk_extras.fake_llm import FakeLlm
+
+APP = "bench"
+USER = "usuario"
+CAMPOS_COTACAO = ["ticker", "fund_name", "current_price", "daily_high", "daily_low", "dividend_yield", "currency"]
+CAMPOS_HISTORICO = ["ticker", "period_return", "annualized_volatility", "total_dividends"]
+FRASES = [
+    "O fundo tem contratos atípicos de longo prazo com inquilinos de primeira linha.",
+    "A vacância física do portfólio caiu para 3,1% no último trimestre.",
+    "Os rendimentos distribuídos ficaram estáveis nos últimos doze meses.",
+    "A gestora anunciou uma nova emissão de cotas para aquisição de galpões.",
+    "O setor de logística segue com demanda aquecida nas regiões metropolitanas.",
+    "Analistas destacam o desconto sobre o valor patrimonial das cotas.",
+    "A alta dos juros pressiona o valor de mercado dos fundos de tijolo.",
+    "O relatório gerencial detalha a receita por inquilino e por região.",
+]
+
+
+class PrefillLlm(FakeLlm):
+    """FakeLlm whose latency grows with the prompt size; records prompt tokens per call."""
+
+    base: float = 0.2
+    per_1k_tokens: float = 0.05
+    prompt_tokens: list = []
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        text = llm_request.config.system_instruction or ""
+        for content in llm_request.contents:
+            text += "".join(part.text or "" for part in content.parts or ())
+        tokens = estimate_tokens(text)
+        self.prompt_tokens.append(tokens)
+        await asyncio.sleep(self.base + self.per_1k_tokens * tokens / 1000)
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="Relatório pronto.")]))
+
+
+class StateWriter(BaseAgent):
+    """Writes fixed values to state, standing in for the producing stage."""
+
+    values: dict
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        yield Event(
+            invocation_id=ctx.invocation_id, author=self.name, branch=ctx.branch,
+            actions=EventActions(state_delta=dict(self.values)),
+        )
+
+
+def fii_state(funds: int, rng: random.Random) -> dict:
+    quotes, history = {}, {}
+    for i in range(funds):
+        ticker = f"F{i:03d}11"[-6:]
+        price = rng.uniform(8, 180)
+        quotes[ticker] = {
+            "fund_name": f"Fundo Imobiliário {ticker} Logística e Renda",
+            "current_price": price, "daily_high": price * 1.012, "daily_low": price * 0.991,
+            "dividend_yield": rng.uniform(0.006, 0.012), "currency": "BRL", "ticker": ticker,
+        }
+        closes = [[f"2025-{1 + w // 5:02d}-{1 + (w % 5) * 6:02d}", round(price * rng.uniform(0.9, 1.1), 4)] for w in range(52)]
+        history[ticker] = {
+            "ticker": ticker, "frequency": "W", "closes": closes,
+            "period_return": rng.uniform(-0.1, 0.2), "annualized_volatility": rng.uniform(0.05, 0.3),
+            "dividends": [[f"2025-{m:02d}-15", round(rng.uniform(0.05, 1.2), 4)] for m in range(1, 13)],
+            "total_dividends": rng.uniform(1, 12),
+        }
+    return {"dados_fiis": quotes, "historico_fiis": history}
+
+
+def research_state(results: int, rng: random.Random) -> dict:
+    sections = []
+    for i in range(results):
+        sentences = rng.sample(FRASES, 5) + [f"O resultado {i} cita o fundo número {rng.randint(1, 99)}."]
+        sections.append(f"## Entidade {i}\n" + " ".join(sentences))
+    return {"pesquisa": "\n\n".join(sections)}
+
+
+def fii_pipeline(state: dict, compact: bool, llm: PrefillLlm) -> SequentialAgent:
+    stages = [StateWriter(name="analista", values=state)]
+    if compact:
+        stages += [
+            CompactionStage(name="compactador_dados", source_key="dados_fiis", output_key="dados", fields=CAMPOS_COTACAO),
+            CompactionStage(
+                name="compactador_historico", source_key="historico_fiis", output_key="historico", fields=CAMPOS_HISTORICO
+            ),
+        ]
+        instruction = "Crie um relatório com base nos dados:\n{dados}\nHistórico:\n{historico}"
+    else:
+        instruction = "Crie um relatório com base nos dados:\n{dados_fiis}\nHistórico:\n{historico_fiis}"
+    stages.append(LlmAgent(name="redator", model=llm, instruction=instruction))
+    return SequentialAgent(name="fii", sub_agents=stages)
+
+
+def research_pipeline(state: dict, compact: bool, llm: PrefillLlm, max_tokens: int) -> SequentialAgent:
+    stages = [StateWriter(name="pesquisador", values=state)]
+    if compact:
+        stages.append(CompactionStage(name="compactador", source_key="pesquisa", output_key="compacta", max_tokens=max_tokens))
+        instruction = "Resuma a partir de {compacta}."
+    else:
+        instruction = "Resuma a partir de {pesquisa}."
+    stages.append(LlmAgent(name="sumarizador", model=llm, instruction=instruction))
+    return SequentialAgent(name="pesquisa", sub_agents=stages)
+
+
+async def run(agent: BaseAgent) -> float:
+    service = InMemorySessionService()
+    runner = Runner(agent=agent, app_name=APP, session_service=service)
+    session = await service.create_session(app_name=APP, user_id=USER)
+    message = types.Content(role="user", parts=[types.Part(text="Analise os fundos.")])
+    start = time.perf_counter()
+    async for _ in runner.run_async(user_id=USER, session_id=session.id, new_message=message):
+        pass
+    return time.perf_counter() - start
+
+
+async def compare(label: str, build, args) -> None:
+    results = {}
+    for compact in (False, True):
+        llm = PrefillLlm(base=args.base / 1000, per_1k_tokens=args.prefill / 1000, prompt_tokens=[])
+        agent = build(compact, llm)
+        elapsed = await run(agent)
+        compaction_ms = sum(
+            stage.stats.seconds for stage in agent.sub_agents if isinstance(stage, CompactionStage)
+        ) * 1000
+        results[compact] = (llm.prompt_tokens[0], elapsed, compaction_ms)
+    (raw_tokens, raw_s, _), (tokens, s, compaction_ms) = results[False], results[True]
+    print(
+        f"{label:<18} prompt {raw_tokens:>7} -> {tokens:>6} tokens ({tokens / raw_tokens:6.1%})   "
+        f"stage {raw_s * 1000:7.0f} -> {s * 1000:6.0f} ms   compaction {compaction_ms:6.2f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base", type=float, default=200.0, help="model latency in ms before prefill")
+    parser.add_argument("--prefill", type=float, default=50.0, help="model ms per 1k prompt tokens")
+    parser.add_argument("--max-tokens", type=int, default=1500, help="budget of the research compaction")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"simulated model: {args.base:.0f} ms + {args.prefill:.0f} ms per 1k prompt tokens")
+    for funds in (5, 20, 80):
+        state = fii_state(funds, rng)
+        await compare(f"fii {funds} fundos", lambda compact, llm: fii_pipeline(state, compact, llm), args)
+    for results in (2, 4, 8):
+        state = research_state(results, rng)
+        await compare(
+            f"pesquisa {results} res.",
+            lambda compact, llm: research_pipeline(state, compact, llm, args.max_tokens),
+            args,
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+"""
+Benchmark: SemanticCache lookup latency, paraphrase recall and precision at 100k entries.
+
+Runs at the shipped ``DEFAULT_THRESHOLD``. Besides exact repeats, light
+paraphrases and unrelated text, it looks up near-duplicates that must miss:
+the same query with another ticker, year or amount, or with one subject word
+swapped. Any hit there is a wrong answer served from the cache.
+
+    python -m adk_extras.bench_semantic_cache --entries 100000
+"""
+import argparse
+import random
+import time
+
+from adk_extras.semantic_cache import DEFAULT_THRESHOLD, SemanticCache
+
+SILABAS = ["ba", "ce", "di", "fo", "gu", "la", "me", "ni", "po", "ra", "se", "ti", "vu", "xa", "zo", "tra", "pre", "cla"]
+PREFIXOS = ["qual foi", "me fale sobre", "como está", "o que aconteceu com", "resuma"]
+
+
+def vocabulary(rng: random.Random, size: int = 5_000) -> list:
+    return list({"".join(rng.choices(SILABAS, k=rng.randint(2, 4))) for _ in range(size)})
+
+
+def query(rng: random.Random, words: list) -> str:
+    """Consulta com, às vezes, um ticker, um ano e um valor, como nas perguntas de mercado."""
+    text = f"{rng.choice(PREFIXOS)} {' '.join(rng.sample(words, 5))}"
+    if rng.random() < 0.5:
+        text += f" {''.join(rng.choices('ABCDEFGHIJ', k=4))}{rng.choice([3, 4, 11])}"
+    if rng.random() < 0.5:
+        text += f" em {rng.randint(2015, 2024)}"
+    if rng.random() < 0.3:
+        text += f" acima de {rng.randint(1, 99)} reais"
+    return text
+
+
+def near_miss(rng: random.Random, text: str, words: list) -> str:
+    """Mesma consulta com outro ticker, ano ou valor; sem números, com uma palavra do assunto trocada."""
+    tokens = text.split()
+    numeric = [i for i, token in enumerate(tokens) if any(c.isdigit() for c in token)]
+    if numeric:
+        i = rng.choice(numeric)
+        digits = [j for j, c in enumerate(tokens[i]) if c.isdigit()]
+        j = digits[-1]
+        tokens[i] = tokens[i][:j] + str((int(tokens[i][j]) + 1) % 10) + tokens[i][j + 1:]
+    else:
+        i = rng.randrange(len(tokens) - 5, len(tokens))
+        tokens[i] = rng.choice(words)
+    return " ".join(tokens)
+
+
+def paraphrase(text: str) -> str:
+    """Reescrita leve: caixa, pontuação e uma palavra de cortesia."""
+    return f"Por favor, {text.capitalize()}?"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    cache = SemanticCache(maxsize=args.entries, threshold=args.threshold)
+    words = vocabulary(rng)
+    queries = [query(rng, words) for _ in range(args.entries)]
+
+    start = time.perf_counter()
+    for i, text in enumerate(queries):
+        cache.put("pesquisa", text, f"resultado {i}")
+    print(f"insert: {args.entries} entries in {time.perf_counter() - start:.2f}s")
+
+    sample = rng.sample(range(args.entries), args.lookups)
+    for label, texts in (
+        ("exact", [queries[i] for i in sample]),
+        ("paraphrase", [paraphrase(queries[i]) for i in sample]),
+        ("unrelated", [f"receita de bolo de cenoura numero {i}" for i in sample]),
+        ("near-miss", [near_miss(rng, queries[i], words) for i in sample]),
+    ):
+        timings, correct, served = [], 0, 0
+        for i, text in zip(sample, texts):
+            t0 = time.perf_counter()
+            value = cache.get("pesquisa", text)
+            timings.append(time.perf_counter() - t0)
+            correct += value == f"resultado {i}"
+            served += value is not None
+        timings.sort()
+        print(
+            f"{label:>10}: hit rate {correct / len(texts):6.1%}, served {served / len(texts):6.1%}, "
+            f"p50 {timings[len(timings) // 2] * 1e3:.3f} ms, p99 {timings[int(len(timings) * 0.99)] * 1e3:.3f} ms"
+        )
+    print(cache.stats())
+
+
+if __name__ == "__main__":
+    main()
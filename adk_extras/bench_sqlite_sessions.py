@@ -0,0 +1,141 @@
+"""
+Benchmark: SqliteSessionService against InMemorySessionService.
+
+Runs conversation turns through a Runner with FakeLlm (no network) on both
+services, then opens a session with 10k stored events: ``get_session`` is
+lazy on SQLite and deep-copies every event in memory.
+
+    python -m adk_extras.bench_sqlite_sessions --turns 200 --events 10000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+from google.adk.agents import LlmAgent
+from google.adk.events import Event, EventActions
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from adk_extras.fake_llm import FakeLlm
+from adk_extras.sqlite_sessions import SqliteSessionService
+
+APP = "bench"
+USER = "usuario"
+PARAGRAPH = "A análise dos dados de vendas mostra crescimento consistente no trimestre. "
+
+
+def percentile(values: list, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def run_turns(service, turns: int) -> list:
+    agent = LlmAgent(
+        name="assistente",
+        model=FakeLlm(responder=lambda request: PARAGRAPH * 4),
+        instruction="Responda a pergunta do usuário.",
+        output_key="ultima_resposta",
+    )
+    runner = Runner(agent=agent, app_name=APP, session_service=service)
+    session = await service.create_session(app_name=APP, user_id=USER)
+    timings = []
+    for i in range(turns):
+        message = types.Content(role="user", parts=[types.Part(text=f"pergunta {i}")])
+        start = time.perf_counter()
+        async for _ in runner.run_async(user_id=USER, session_id=session.id, new_message=message):
+            pass
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def fill(service, session_id: str, count: int):
+    session = await service.create_session(app_name=APP, user_id=USER, session_id=session_id)
+    for i in range(count):
+        author = "user" if i % 2 == 0 else "assistente"
+        event = Event(
+            invocation_id=f"inv{i // 2}",
+            author=author,
+            content=types.Content(
+                role="user" if author == "user" else "model", parts=[types.Part(text=PARAGRAPH * (1 if i % 2 == 0 else 4))]
+            ),
+            actions=EventActions(state_delta={"ultima_resposta": i} if author != "user" else {}),
+        )
+        await service.append_event(session, event)
+
+
+async def timed(coro) -> tuple:
+    start = time.perf_counter()
+    result = await coro
+    return result, time.perf_counter() - start
+
+
+async def traced_peak(coro) -> float:
+    """Peak MB allocated by ``coro``; timed separately, since tracemalloc slows it down."""
+    tracemalloc.start()
+    await coro
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--events", type=int, default=10_000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    print(f"turns: {args.turns} per service")
+    for label, make in (
+        ("in-memory", InMemorySessionService),
+        ("sqlite", lambda: SqliteSessionService(os.path.join(directory, "turns.db"))),
+    ):
+        service = make()
+        timings = await run_turns(service, args.turns)
+        print(
+            f"{label:>10}: turn p50 {percentile(timings, 0.5) * 1e3:.2f} ms, "
+            f"p99 {percentile(timings, 0.99) * 1e3:.2f} ms"
+            + (f", {service.flushes} transactions" if isinstance(service, SqliteSessionService) else "")
+        )
+
+    print(f"session with {args.events} events")
+    memory = InMemorySessionService()
+    await fill(memory, "longa", args.events)
+    path = os.path.join(directory, "long.db")
+    writer = SqliteSessionService(path)
+    await fill(writer, "longa", args.events)
+    writer.close()
+
+    _, elapsed = await timed(memory.get_session(app_name=APP, user_id=USER, session_id="longa"))
+    peak = await traced_peak(memory.get_session(app_name=APP, user_id=USER, session_id="longa"))
+    print(f"{'in-memory':>10}: get_session {elapsed * 1e3:8.2f} ms, peak {peak:6.1f} MB (deep copy)")
+
+    # Fresh services, as after a restart: nothing cached.
+    peak = await traced_peak(SqliteSessionService(path).get_session(app_name=APP, user_id=USER, session_id="longa"))
+    service = SqliteSessionService(path)
+    session, elapsed = await timed(service.get_session(app_name=APP, user_id=USER, session_id="longa"))
+    print(f"{'sqlite':>10}: get_session {elapsed * 1e3:8.2f} ms, peak {peak:6.1f} MB (lazy)")
+    start = time.perf_counter()
+    count = len(session.events)
+    print(f"{'':>10}  full load {(time.perf_counter() - start) * 1e3:8.2f} ms ({count} events)")
+    _, elapsed = await timed(service.get_session(app_name=APP, user_id=USER, session_id="longa"))
+    print(f"{'':>10}  cached get_session {elapsed * 1e3:8.2f} ms")
+
+    start = time.perf_counter()
+    pages = sum(len(page) for page in service.iter_events(APP, USER, "longa"))
+    print(f"{'':>10}  iter_events {(time.perf_counter() - start) * 1e3:8.2f} ms ({pages} events, paged)")
+
+    for label, svc in (("in-memory", memory), ("sqlite", service)):
+        session = await svc.get_session(app_name=APP, user_id=USER, session_id="longa")
+        event = Event(invocation_id="nova", author="assistente", content=types.Content(role="model", parts=[types.Part(text=PARAGRAPH)]))
+        _, elapsed = await timed(svc.append_event(session, event))
+        print(f"{label:>10}: append to the long session {elapsed * 1e3:8.2f} ms")
+    service.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
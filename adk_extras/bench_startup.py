@@ -0,0 +1,198 @@
+"""
+Benchmark: startup cost of the agent modules, with a regression threshold per module.
+
+Every module is imported in a fresh interpreter under ``python -X importtime``,
+twice:
+
+* cold: nothing loaded; the wall time of ``import`` plus the first
+  ``root_agent``, what ``adk web`` or a new worker pays.
+* own: ADK, google-genai, dotenv and pydantic preloaded first; only the
+  imports that happen after them are counted, plus the build of
+  ``root_agent``. This is the part our code controls, and the one checked
+  against ``THRESHOLDS`` (ms, times ``--scale`` on slower machines).
+
+The 05copywriter workers are scripts that import their sibling modules, so
+they are imported from that directory (``SCRIPT_DIRS``), with the repository
+root on ``PYTHONPATH``; they build their agents only when they start serving,
+so only the import is measured. A module whose dependencies are not installed
+is reported and skipped.
+
+The heaviest imports of the own part are listed, and the run exits with 1 when
+a module goes over its threshold. With ``--workers`` it also compares starting
+N cold workers against a ``WarmPool`` that imports once and forks them.
+
+    python -m adk_extras.bench_startup --workers 4
+    python -m adk_extras.bench_startup --module 02multiagentes --top 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from adk_extras.prefork import WarmPool
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRELOAD = (
+    "google.adk.agents", "google.adk.runners", "google.adk.tools", "google.adk.models.registry",
+    "google.genai.types", "dotenv", "pydantic",
+)
+MARKER = "__hello__"
+# Module -> limit in ms for import + root_agent, with ADK already loaded
+THRESHOLDS = {
+    "01agente": 25,
+    "02multiagentes": 60,
+    "03financial": 80,
+    "04frameworks": 60,
+    "06events": 30,
+    "adk_extras.semantic_cache": 15,
+    "adk_extras.cascade": 30,
+    "adk_extras.structured": 20,
+    "adk_extras.tracing": 15,
+    "adk_extras.compaction": 25,
+    "adk_extras.sqlite_sessions": 20,
+    "fii_data": 30,
+    "research_agent": 120,
+    "content_agent": 100,
+    "host_agent": 80,
+}
+# Module -> directory it is imported from, as ``python <script>.py`` there
+SCRIPT_DIRS = {
+    "research_agent": "05copywriter",
+    "content_agent": "05copywriter",
+    "host_agent": "05copywriter",
+}
+SCRIPT = """
+import importlib, json, sys, time
+{preload}
+start = time.perf_counter()
+module = importlib.import_module({module!r})
+imported = time.perf_counter()
+agent = getattr(module, "root_agent", None)
+done = time.perf_counter()
+print(json.dumps({{"import_ms": (imported - start) * 1000, "build_ms": (done - imported) * 1000}}))
+"""
+
+
+def parse_importtime(stderr: str, after_marker: bool) -> list:
+    """``(self_us, cumulative_us, name)`` rows; with ``after_marker`` only the ones after the preload."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line.split(":", 1)[1].split("|")
+        rows.append((int(own), int(cumulative), name.rstrip()))
+    if after_marker:
+        cut = max(i for i, row in enumerate(rows) if row[2].strip() == MARKER)
+        rows = rows[cut + 1:]
+    return rows
+
+
+def run_options(module: str) -> dict:
+    """``cwd`` and ``env`` of the interpreter that imports ``module``."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.getenv("PYTHONPATH")]))}
+    return {"cwd": os.path.join(ROOT, SCRIPT_DIRS.get(module, "")), "env": env}
+
+
+def measure(module: str, warm: bool) -> dict:
+    preload = f"import {', '.join(PRELOAD)}, {MARKER}" if warm else ""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT.format(preload=preload, module=module)],
+        capture_output=True, text=True, **run_options(module),
+    )
+    wall = (time.perf_counter() - start) * 1000
+    if result.returncode:
+        raise RuntimeError(f"{module}: {result.stderr.strip().splitlines()[-1]}")
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    rows = parse_importtime(result.stderr, after_marker=warm)
+    return {
+        "wall_ms": wall,
+        "import_ms": timings["import_ms"],
+        "build_ms": timings["build_ms"],
+        "own_ms": timings["import_ms"] + timings["build_ms"],
+        "modules": len(rows),
+        "top": sorted(rows, key=lambda row: -row[0]),
+    }
+
+
+def cold_workers(module: str, workers: int) -> float:
+    """Wall ms until ``workers`` fresh interpreters have imported ``module`` and built its agent."""
+    script = SCRIPT.format(preload="", module=module)
+    start = time.perf_counter()
+    procs = [
+        subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.DEVNULL, **run_options(module))
+        for _ in range(workers)
+    ]
+    for proc in procs:
+        proc.wait()
+    return (time.perf_counter() - start) * 1000
+
+
+def prefork_workers(module: str, workers: int) -> tuple:
+    """(parent warm-up ms, ms to fork ``workers`` ready children) with ``WarmPool``."""
+    pool = WarmPool(lambda: None, workers, preload=(f"{module}:root_agent",))
+    start = time.perf_counter()
+    pool.warm()
+    warmed = time.perf_counter()
+    pool.run()
+    return (warmed - start) * 1000, (time.perf_counter() - warmed) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", action="append", help="module to measure (default: all in THRESHOLDS)")
+    parser.add_argument("--top", type=int, default=5, help="heaviest own imports listed per module")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies every threshold")
+    parser.add_argument("--runs", type=int, default=3, help="runs per module; the median is checked")
+    parser.add_argument("--workers", type=int, default=0, help="also compare N cold workers against a warm pool")
+    parser.add_argument("--pool-module", default="02multiagentes", help="module the workers comparison loads")
+    parser.add_argument("--output", help="writes the results as JSON")
+    args = parser.parse_args()
+
+    modules = args.module or list(THRESHOLDS)
+    results, failed = {}, []
+    print(f"{'module':<28}{'cold ms':>9}{'own ms':>9}{'build ms':>10}{'limit':>8}  imports")
+    for module in modules:
+        try:
+            cold = measure(module, warm=False)
+        except RuntimeError as e:
+            print(f"skipped {e}")
+            continue
+        runs = [measure(module, warm=True) for _ in range(args.runs)]
+        own = statistics.median(run["own_ms"] for run in runs)
+        build = statistics.median(run["build_ms"] for run in runs)
+        limit = THRESHOLDS.get(module, float("inf")) * args.scale
+        status = "" if own <= limit else "  REGRESSION"
+        if status:
+            failed.append(module)
+        print(f"{module:<28}{cold['wall_ms']:9.0f}{own:9.1f}{build:10.1f}{limit:8.0f}  {runs[0]['modules']}{status}")
+        for own_us, cumulative_us, name in runs[0]["top"][:args.top]:
+            print(f"    {own_us / 1000:7.1f} ms self {cumulative_us / 1000:8.1f} ms cumulative  {name.strip()}")
+        results[module] = {
+            "cold_ms": cold["wall_ms"], "own_ms": own, "build_ms": build, "limit_ms": limit,
+            "imports": runs[0]["modules"],
+        }
+
+    if args.workers:
+        module = args.pool_module
+        cold = cold_workers(module, args.workers)
+        warm, forked = prefork_workers(module, args.workers)
+        print(
+            f"\n{args.workers} workers of {module} ready (import + root_agent): cold {cold:.0f} ms, "
+            f"warm pool {warm + forked:.0f} ms (parent {warm:.0f} + forks {forked:.1f})"
+        )
+        results["workers"] = {"module": module, "cold_ms": cold, "pool_warm_ms": warm, "pool_fork_ms": forked}
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if failed:
+        print(f"\nover the threshold: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
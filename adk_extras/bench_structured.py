@@ -0,0 +1,234 @@
+"""
+Benchmark: retries and latency on malformed JSON answers, with and without StructuredLlm.
+
+A fuzz corpus is built from valid copy objects (the content_agent's shape,
+05copywriter) by applying the slips models make: a ```json fence and chatter
+after the object, trailing or missing commas, single quotes, Python literals,
+unquoted keys, raw newlines in strings, a field of the wrong type and a
+truncated end. The simulated model streams each answer at ``--ttft`` ms plus
+``--chunk`` ms per 16 characters.
+
+* retry: what the agents did before: wait for the whole answer, parse it
+  strictly (fences stripped) and ask again, in full, when it does not parse
+  or validate; the second answer is clean.
+* structured: ``StructuredLlm`` validates while streaming, stops at the end
+  of the object, repairs locally and asks again only for broken fields.
+
+    python -m adk_extras.bench_structured --samples 200
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import statistics
+import time
+from typing import AsyncGenerator
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import BaseModel, ValidationError
+
+from adk_extras.fake_llm import FakeLlm, last_user_text
+from adk_extras.structured import REPAIR_PROMPT, StructuredLlm
+
+CHUNK_CHARS = 16
+CHATTER = "\n\nEspero que este copy ajude! Se quiser, posso criar variações da headline, ajustar o tom para " \
+          "um público mais jovem ou sugerir testes A/B para o CTA. É só pedir."
+WORDS = (
+    "investimento renda passiva fundos imobiliários dividendos mensais segurança patrimônio liberdade "
+    "financeira aposentadoria diversificação carteira rendimento isento imposto gestão profissional"
+).split()
+MUTATIONS = [
+    "clean", "chatter", "trailing_comma", "single_quotes", "python_literal", "unquoted_keys",
+    "raw_newline", "missing_comma", "wrong_type", "truncated",
+]
+_REPAIR_MARKER = REPAIR_PROMPT.split("{")[0][:30]
+
+
+class Copy(BaseModel):
+    headline: str
+    subheadline: str = ""
+    body_copy: str = ""
+    bullet_points: list[str] = []
+    cta: str = ""
+    urgent: bool = False
+
+
+class StreamingFakeLlm(FakeLlm):
+    """Streams ``answer`` in chunks at a fixed rate; repair requests get the seed's fields."""
+
+    ttft: float = 0.03
+    per_chunk: float = 0.002
+    answer: str = ""
+    seed: dict = {}
+    chars: int = 0
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        prompt = last_user_text(llm_request)
+        if prompt.startswith(_REPAIR_MARKER):
+            fields = re.findall(r'"(\w+)":', prompt.split("\n", 1)[1])
+            text = json.dumps({key: self.seed[key] for key in fields}, ensure_ascii=False)
+        else:
+            text = self.answer
+        await asyncio.sleep(self.ttft)
+        emitted = ""
+        for start in range(0, len(text), CHUNK_CHARS):
+            await asyncio.sleep(self.per_chunk)
+            chunk = text[start:start + CHUNK_CHARS]
+            emitted += chunk
+            self.chars += len(chunk)
+            if stream:
+                yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=chunk)]), partial=True)
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=emitted)]))
+
+
+def seed_object(rng: random.Random) -> dict:
+    def sentence(n):
+        return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize()
+
+    return {
+        "headline": sentence(6),
+        "subheadline": sentence(10),
+        "body_copy": ". ".join(sentence(14) for _ in range(4)) + ".",
+        "bullet_points": [sentence(7) for _ in range(4)],
+        "cta": sentence(4),
+        "urgent": rng.random() < 0.5,
+    }
+
+
+def mutate(seed: dict, mutation: str, rng: random.Random) -> str:
+    text = json.dumps(seed, ensure_ascii=False, indent=2)
+    if mutation == "chatter":
+        return "```json\n" + text + "\n```" + CHATTER
+    if mutation == "trailing_comma":
+        return text.replace('"\n  ]', '",\n  ]').replace("\n}", ",\n}")
+    if mutation == "single_quotes":
+        return "{" + ", ".join(f"'{key}': {json.dumps(value, ensure_ascii=False)}" for key, value in seed.items()) + "}"
+    if mutation == "python_literal":
+        return text.replace(": true", ": True").replace(": false", ": False")
+    if mutation == "unquoted_keys":
+        return re.sub(r'^(\s*)"(\w+)":', r"\1\2:", text, flags=re.MULTILINE)
+    if mutation == "raw_newline":
+        return text.replace(". ", ".\n", 2)
+    if mutation == "missing_comma":
+        return text.replace('],\n  "cta"', ']\n  "cta"')
+    if mutation == "wrong_type":
+        broken = dict(seed, bullet_points={"itens": seed["bullet_points"]})
+        return json.dumps(broken, ensure_ascii=False, indent=2)
+    if mutation == "truncated":
+        return text[: int(len(text) * rng.uniform(0.55, 0.95))]
+    return text
+
+
+def strict_parse(text: str):
+    """Fences stripped, first ``{`` to last ``}``, strict JSON and schema: the agents' old parsing."""
+    text = re.sub(r"^```\w*|```$", "", text.strip(), flags=re.MULTILINE)
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        return None
+    try:
+        return Copy.model_validate(json.loads(text[start:end + 1]))
+    except (ValueError, ValidationError):
+        return None
+
+
+def request() -> LlmRequest:
+    return LlmRequest(
+        model="fake-llm",
+        contents=[types.Content(role="user", parts=[types.Part(text="Crie o copy do briefing.")])],
+        config=types.GenerateContentConfig(system_instruction="Responda em JSON."),
+    )
+
+
+async def retry_strategy(llm: StreamingFakeLlm, max_retries: int) -> bool:
+    for attempt in range(max_retries + 1):
+        text = ""
+        async for response in llm.generate_content_async(request()):
+            text = response.content.parts[0].text
+        if strict_parse(text) is not None:
+            return True
+        llm.answer = json.dumps(llm.seed, ensure_ascii=False, indent=2)  # the retry comes back clean
+    return False
+
+
+async def structured_strategy(llm: StructuredLlm) -> bool:
+    text = ""
+    async for response in llm.generate_content_async(request()):
+        text = response.content.parts[0].text
+    try:
+        return Copy.model_validate_json(text) is not None
+    except ValidationError:
+        return False
+
+
+async def run(name: str, corpus: list, args) -> dict:
+    fake = StreamingFakeLlm(ttft=args.ttft / 1000, per_chunk=args.chunk / 1000)
+    structured = StructuredLlm(inner=fake, output_schema=Copy)
+    times, ok, by_mutation = [], 0, {}
+    for mutation, seed, answer in corpus:
+        fake.answer, fake.seed = answer, seed
+        calls = fake.calls
+        start = time.perf_counter()
+        if name == "retry":
+            success = await retry_strategy(fake, args.retries)
+        else:
+            success = await structured_strategy(structured)
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        ok += success
+        extra, total = by_mutation.get(mutation, (0, 0.0))
+        by_mutation[mutation] = (extra + fake.calls - calls - 1, total + elapsed)
+    ordered = sorted(times)
+    return {
+        "ok": ok,
+        "calls": fake.calls,
+        "chars": fake.chars,
+        "mean": statistics.mean(times),
+        "p95": ordered[int(len(ordered) * 0.95)],
+        "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        "by_mutation": by_mutation,
+        "stats": structured.stats.as_dict() if name == "structured" else None,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--ttft", type=float, default=30.0, help="ms before the first chunk")
+    parser.add_argument("--chunk", type=float, default=2.0, help=f"ms per {CHUNK_CHARS}-character chunk")
+    parser.add_argument("--retries", type=int, default=2)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    corpus = []
+    for i in range(args.samples):
+        seed = seed_object(rng)
+        mutation = MUTATIONS[i % len(MUTATIONS)]
+        corpus.append((mutation, seed, mutate(seed, mutation, rng)))
+    rng.shuffle(corpus)
+
+    results = {name: await run(name, corpus, args) for name in ("retry", "structured")}
+    print(f"{args.samples} answers, {len(MUTATIONS)} kinds; model {args.ttft:.0f} ms + {args.chunk:.0f} ms per chunk")
+    for name, result in results.items():
+        print(
+            f"{name:<11} valid {result['ok'] / args.samples:6.1%}   model calls {result['calls'] / args.samples:4.2f}/answer   "
+            f"chars {result['chars'] / args.samples:6.0f}/answer   mean {result['mean'] * 1000:6.1f} ms   "
+            f"p95 {result['p95'] * 1000:6.1f} ms   p99 {result['p99'] * 1000:6.1f} ms"
+        )
+    print("\nper kind: extra model calls and mean ms (retry -> structured)")
+    retry, structured = results["retry"]["by_mutation"], results["structured"]["by_mutation"]
+    for mutation in MUTATIONS:
+        count = sum(1 for item in corpus if item[0] == mutation)
+        (r_extra, r_total), (s_extra, s_total) = retry[mutation], structured[mutation]
+        print(
+            f"  {mutation:<15} calls {r_extra:>3} -> {s_extra:<3}   "
+            f"{r_total / count * 1000:6.1f} -> {s_total / count * 1000:6.1f} ms"
+        )
+    print(f"\nstructured: {results['structured']['stats']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
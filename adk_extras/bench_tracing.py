@@ -0,0 +1,142 @@
+"""
+Benchmark: overhead of tracing on agent runs, without network.
+
+Runs the same pipeline (a researcher that calls a tool, then a writer)
+with FakeLlm, alternating runs without and with the tracer, and prints
+the median turn time of each, the overhead and one run's breakdown.
+``--latency 0`` is the worst case: the turn is then only framework code, and
+the ADK's own cost of running callbacks (a CallbackContext per call) weighs
+as much as the tracer:
+
+    python -m adk_extras.bench_tracing --turns 300 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from google.adk.agents import LlmAgent, SequentialAgent
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from adk_extras.fake_llm import FakeLlm, last_user_text
+from adk_extras.tracing import Tracer, instrument, trace_session_service
+
+APP = "bench"
+USER = "usuario"
+PARAGRAPH = "O fundo distribuiu rendimentos estáveis e a vacância caiu no trimestre. "
+
+
+def consultar_fundo(ticker: str) -> dict:
+    """Dados de um fundo imobiliário (fictícios)."""
+    return {"ticker": ticker, "dividend_yield": 0.0091, "p_vp": 0.97, "resumo": PARAGRAPH * 3}
+
+
+def usage(prompt: int, output: int) -> types.GenerateContentResponseUsageMetadata:
+    return types.GenerateContentResponseUsageMetadata(prompt_token_count=prompt, candidates_token_count=output)
+
+
+def researcher(llm_request: LlmRequest) -> LlmResponse:
+    last = llm_request.contents[-1]
+    if any(part.function_response for part in last.parts or ()):
+        text = PARAGRAPH * 2
+    else:
+        call = types.FunctionCall(name="consultar_fundo", args={"ticker": last_user_text(llm_request)[-6:]})
+        return LlmResponse(content=types.Content(role="model", parts=[types.Part(function_call=call)]), usage_metadata=usage(120, 12))
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]), usage_metadata=usage(300, 60))
+
+
+def writer(llm_request: LlmRequest) -> LlmResponse:
+    return LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text=PARAGRAPH * 4)]), usage_metadata=usage(400, 110)
+    )
+
+
+def build_pipeline(latency: float) -> SequentialAgent:
+    return SequentialAgent(
+        name="pipeline",
+        sub_agents=[
+            LlmAgent(
+                name="pesquisador",
+                model=FakeLlm(latency=latency, responder=researcher),
+                instruction="Consulte o fundo pedido.",
+                tools=[consultar_fundo],
+                output_key="pesquisa",
+            ),
+            LlmAgent(
+                name="redator",
+                model=FakeLlm(latency=latency, responder=writer),
+                instruction="Escreva a análise a partir de {pesquisa}.",
+            ),
+        ],
+    )
+
+
+async def turn(runner: Runner, service, text: str) -> tuple:
+    session = await service.create_session(app_name=APP, user_id=USER)
+    message = types.Content(role="user", parts=[types.Part(text=text)])
+    invocation_id = None
+    start = time.perf_counter()
+    async for event in runner.run_async(user_id=USER, session_id=session.id, new_message=message):
+        invocation_id = event.invocation_id
+    return time.perf_counter() - start, invocation_id
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.05, help="model latency in seconds (0 = worst case)")
+    args = parser.parse_args()
+
+    plain_service = InMemorySessionService()
+    plain = Runner(agent=build_pipeline(args.latency), app_name=APP, session_service=plain_service)
+    tracer = Tracer(otlp_path=os.path.join(tempfile.mkdtemp(), "trace.jsonl"))
+    traced_service = trace_session_service(InMemorySessionService(), tracer)
+    traced = Runner(
+        agent=instrument(build_pipeline(args.latency), tracer), app_name=APP, session_service=traced_service
+    )
+
+    for _ in range(20):  # aquecimento
+        await turn(plain, plain_service, "Analise HGLG11")
+        await turn(traced, traced_service, "Analise HGLG11")
+    plain_times, traced_times = [], []
+    invocation_id = None
+    for i in range(args.turns):
+        # Alternating the order cancels drift (GC, CPU frequency) between the two.
+        first, second = ((plain, plain_service, plain_times), (traced, traced_service, traced_times))[:: 1 if i % 2 else -1]
+        for runner, service, times in (first, second):
+            elapsed, run_id = await turn(runner, service, "Analise HGLG11")
+            times.append(elapsed)
+            if runner is traced:
+                invocation_id = run_id
+
+    tracer.flush()
+    disabled, enabled = statistics.median(plain_times), statistics.median(traced_times)
+    # Median of the paired differences is steadier than the difference of medians.
+    overhead = statistics.median(t - p for p, t in zip(plain_times, traced_times)) / disabled
+    print(f"turns: {args.turns}, model latency {args.latency * 1e3:.0f} ms")
+    print(f"  disabled: median {disabled * 1e3:.3f} ms, mean {statistics.mean(plain_times) * 1e3:.3f} ms (callbacks not installed)")
+    print(f"   enabled: median {enabled * 1e3:.3f} ms, mean {statistics.mean(traced_times) * 1e3:.3f} ms")
+    print(f"  overhead: {overhead:+.2%} (median of paired differences)")
+
+    trace = tracer.run(invocation_id)
+    print(f"\nbreakdown of one run ({len(trace.spans)} spans, {trace.wall_ms():.2f} ms):")
+    for row in trace.summary():
+        print(
+            f"  {row['kind']:<8} {row['name']:<16} {row['calls']:>3}x  total {row['total_ms']:7.3f} ms  "
+            f"self {row['self_ms']:7.3f} ms  tokens {row['input_tokens']:>4}/{row['output_tokens']:<4}"
+            f"  chars {row['request_chars']:>5}/{row['response_chars']:<5}"
+        )
+    print("\nfolded stacks (µs):")
+    print(trace.folded(), end="")
+    print(f"\nprometheus: {len(tracer.prometheus().splitlines())} lines")
+    print(f"otlp: {os.path.getsize(tracer.otlp_path) / 1024:.0f} KB in {tracer.otlp_path}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
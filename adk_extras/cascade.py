@@ -0,0 +1,265 @@
+"""
+Cheap-first model cascade for ``LlmAgent`` stages.
+
+``CascadeLlm`` is a ``BaseLlm`` that holds an ordered list of tiers, cheapest
+first, and plugs into ``LlmAgent(model=...)`` like a model name. Each request
+goes to the first tier whose input limit fits the prompt, and moves one tier
+up when that tier's answer is not usable:
+
+* the call raised, or the response carries an ``error_code``;
+* the answer is empty;
+* a function call names a tool the agent does not have;
+* a text answer fails the stage's ``validator`` (e.g. a ticker-list regex)
+  and the stage's ``repair`` cannot rewrite it into one that passes.
+
+The last tier's answer is returned as is. Every attempt is timed per route
+(the stage name) and tier, and escalations are counted by reason.
+
+Non-final tiers are buffered so they can be validated, so only the last tier
+streams partial responses.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from typing import AsyncGenerator, Callable, Optional, Union
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+from pydantic import Field, PrivateAttr
+
+from adk_extras.compaction import estimate_tokens
+
+LATENCY_WINDOW = 1024
+
+# Tiers per stage type, cheapest first; ``CASCADE_<STAGE>`` overrides them (comma-separated).
+STAGE_TIERS = {
+    "extract": ["gemini-2.0-flash-lite", "gemini-2.0-flash", "gemini-2.5-flash"],
+    "search": ["gemini-2.0-flash", "gemini-2.5-flash"],
+    "tools": ["gemini-2.0-flash", "gemini-2.5-flash"],
+    "write": ["gemini-2.0-flash", "gemini-2.5-flash"],
+}
+
+_ROUTES = {}
+
+
+class TierStats:
+    """Attempts of one tier in one route."""
+
+    def __init__(self):
+        self.calls = 0
+        self.accepted = 0
+        self.repaired = 0
+        self.failures = {}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def as_dict(self) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "calls": self.calls,
+            "accepted": self.accepted,
+            "repaired": self.repaired,
+            "failures": dict(self.failures),
+            "p50_ms": round(_percentile(latencies, 0.5) * 1000, 1),
+            "p95_ms": round(_percentile(latencies, 0.95) * 1000, 1),
+        }
+
+
+class RouteStats:
+    """Requests of one route (stage), with the tier that answered them."""
+
+    def __init__(self):
+        self.requests = 0
+        self.escalated = 0
+        self.skipped = 0
+        self.tiers = {}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def tier(self, model: str) -> TierStats:
+        stats = self.tiers.get(model)
+        if stats is None:
+            stats = self.tiers[model] = TierStats()
+        return stats
+
+    @property
+    def escalation_rate(self) -> float:
+        return self.escalated / self.requests if self.requests else 0.0
+
+    def as_dict(self) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "requests": self.requests,
+            "escalation_rate": round(self.escalation_rate, 4),
+            "skipped_by_size": self.skipped,
+            "p50_ms": round(_percentile(latencies, 0.5) * 1000, 1),
+            "p95_ms": round(_percentile(latencies, 0.95) * 1000, 1),
+            "tiers": {model: stats.as_dict() for model, stats in self.tiers.items()},
+        }
+
+
+class CascadeLlm(BaseLlm):
+    """Tries ``tiers`` cheapest first and escalates when an answer is not usable.
+
+    Attributes:
+        tiers: Models as names (resolved through the ADK registry) or ``BaseLlm`` instances.
+        route: Name the statistics are kept under, usually the stage; cascades
+            sharing a route share its statistics.
+        validator: Accepts or rejects a text answer; ``None`` accepts any non-empty text.
+        repair: Rewrites a rejected text answer locally (e.g. picks the tickers
+            out of prose), or returns ``None``; a rewrite that passes the
+            validator is used instead of escalating.
+        max_input_tokens: Per tier, the largest prompt (estimated tokens) it is
+            tried with; larger prompts start at a later tier. ``None`` entries, or
+            a shorter list, mean no limit.
+    """
+
+    model: str = ""
+    tiers: list[Union[str, BaseLlm]]
+    route: str = "default"
+    validator: Optional[Callable[[str], bool]] = None
+    repair: Optional[Callable[[str], Optional[str]]] = None
+    max_input_tokens: list[Optional[int]] = Field(default_factory=list)
+
+    _models: list = PrivateAttr(default_factory=list)
+
+    def model_post_init(self, __context) -> None:
+        if not self.tiers:
+            raise ValueError("CascadeLlm needs at least one tier")
+        self._models = [LLMRegistry.new_llm(tier) if isinstance(tier, str) else tier for tier in self.tiers]
+        if not self.model:
+            # Built-in tools set the request up by model name (google_search checks for
+            # "gemini-2"), so the cascade presents itself as its first tier.
+            self.model = self._models[0].model
+
+    @property
+    def stats(self) -> RouteStats:
+        return route_stats(self.route)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        stats = self.stats
+        stats.requests += 1
+        start = time.perf_counter()
+        first = self._first_tier(llm_request)
+        stats.skipped += first > 0
+        last = len(self._models) - 1
+        for index in range(first, last + 1):
+            llm = self._models[index]
+            tier = stats.tier(llm.model)
+            tier.calls += 1
+            request = llm_request.model_copy(update={"model": llm.model})
+            attempt = time.perf_counter()
+            if index == last:
+                # Nothing to fall back to: pass the answer (and any streaming) through.
+                async for response in llm.generate_content_async(request, stream=stream):
+                    yield response
+                tier.accepted += 1
+                tier.latencies.append(time.perf_counter() - attempt)
+                break
+            try:
+                responses = [response async for response in llm.generate_content_async(request, stream=stream)]
+                reason = self._rejection(responses, llm_request)
+            except (asyncio.CancelledError, KeyboardInterrupt):
+                raise
+            except Exception as e:
+                responses, reason = [], type(e).__name__
+            tier.latencies.append(time.perf_counter() - attempt)
+            if reason == "invalid" and self.repair is not None:
+                repaired = self._repaired(responses)
+                if repaired is not None:
+                    tier.repaired += 1
+                    responses, reason = [repaired], None
+            if reason is None:
+                tier.accepted += 1
+                for response in responses:
+                    yield response
+                break
+            tier.failures[reason] = tier.failures.get(reason, 0) + 1
+            if index == first:
+                stats.escalated += 1
+        stats.latencies.append(time.perf_counter() - start)
+
+    def _first_tier(self, llm_request: LlmRequest) -> int:
+        if not any(self.max_input_tokens):
+            return 0
+        tokens = _estimate_request_tokens(llm_request)
+        for index, limit in enumerate(self.max_input_tokens[: len(self._models)]):
+            if limit is None or tokens <= limit:
+                return index
+        return min(len(self.max_input_tokens), len(self._models) - 1)
+
+    def _rejection(self, responses: list, llm_request: LlmRequest) -> Optional[str]:
+        """Why the tier's answer cannot be used, or ``None`` if it can."""
+        final = [response for response in responses if not response.partial] or responses
+        if not final:
+            return "empty"
+        response = final[-1]
+        if response.error_code:
+            return f"error:{response.error_code}"
+        parts = response.content.parts if response.content and response.content.parts else []
+        calls = [part.function_call for part in parts if part.function_call]
+        if calls:
+            unknown = [call.name for call in calls if call.name not in llm_request.tools_dict]
+            return "unknown_tool" if unknown else None
+        text = "".join(part.text or "" for part in parts if not part.thought).strip()
+        if not text:
+            return "empty"
+        if self.validator is not None and not self.validator(text):
+            return "invalid"
+        return None
+
+    def _repaired(self, responses: list) -> Optional[LlmResponse]:
+        response = ([response for response in responses if not response.partial] or responses)[-1]
+        text = "".join(part.text or "" for part in response.content.parts if not part.thought)
+        fixed = self.repair(text)
+        if not fixed or (self.validator is not None and not self.validator(fixed)):
+            return None
+        return response.model_copy(update={"content": types.Content(role="model", parts=[types.Part(text=fixed)])})
+
+
+def route_stats(route: str) -> RouteStats:
+    stats = _ROUTES.get(route)
+    if stats is None:
+        stats = _ROUTES[route] = RouteStats()
+    return stats
+
+
+def cascade_stats() -> dict:
+    """Statistics of every route, e.g. to log at shutdown or serve on a status endpoint."""
+    return {route: stats.as_dict() for route, stats in _ROUTES.items()}
+
+
+def stage_cascade(
+    stage: str, route: str, validator: Optional[Callable[[str], bool]] = None, **kwargs
+) -> Union[CascadeLlm, str]:
+    """The cascade of a stage type (``extract``, ``search``, ``tools`` or ``write``).
+
+    ``CASCADE_<STAGE>`` (e.g. ``CASCADE_EXTRACT=gemini-2.0-flash,gemini-2.5-flash``)
+    replaces the tiers; a single tier returns the plain model name, and
+    ``CASCADE=off`` returns the stage's most capable tier for every stage.
+    """
+    tiers = os.getenv(f"CASCADE_{stage.upper()}")
+    tiers = [tier.strip() for tier in tiers.split(",") if tier.strip()] if tiers else list(STAGE_TIERS[stage])
+    if os.getenv("CASCADE", "").lower() == "off" or len(tiers) == 1:
+        return tiers[-1]
+    return CascadeLlm(tiers=tiers, route=route, validator=validator, **kwargs)
+
+
+def _estimate_request_tokens(llm_request: LlmRequest) -> int:
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    count = estimate_tokens(instruction) if isinstance(instruction, str) else 0
+    for content in llm_request.contents:
+        for part in content.parts or ():
+            if part.text:
+                count += estimate_tokens(part.text)
+    return count
+
+
+def _percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * p))]
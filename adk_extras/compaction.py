@@ -0,0 +1,244 @@
+"""
+State compaction between sequential stages.
+
+A stage's ``output_key`` value is templated whole into the next stage's
+instruction (``{placeholder}``), so the prompt grows with every fund or search
+result. ``CompactionStage`` sits between the two: it reads the raw value from
+state and writes a compact rendering under another key, which the next
+instruction reads instead.
+
+Records (a dict of dicts keyed by ticker, or a list of dicts) are projected to
+the fields the next stage needs and encoded as a pipe-separated table, with
+columns that hold the same value in every row hoisted above it. Free text
+loses repeated sentences. Either way the result is cut, line by line, to a
+per-stage token budget measured with ``estimate_tokens``, a local estimator
+that needs no tokenizer.
+"""
+import json
+import re
+import time
+from typing import AsyncGenerator, Iterable, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from pydantic import PrivateAttr
+
+SIGNIFICANT_DIGITS = 6
+MIN_DEDUPE_CHARS = 24
+OMITTED = "[... {count} linhas omitidas]"
+
+# Subword-sized pieces: runs of up to 4 word characters, or one symbol. Tracks
+# SentencePiece/BPE counts on Portuguese text and JSON within about 15%.
+_TOKEN = re.compile(r"\w{1,4}|[^\w\s]")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+_FENCE = re.compile(r"^```\w*|```$", flags=re.MULTILINE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate model tokens in ``text``."""
+    return len(_TOKEN.findall(text)) if text else 0
+
+
+def as_records(value) -> Optional[list]:
+    """The value as a list of flat dicts, or ``None`` if it is not record-shaped.
+
+    Accepts a list of dicts, a dict of dicts (keys become a ``ticker``-style
+    first column only when the records lack them) or the JSON text of either.
+    """
+    if isinstance(value, str):
+        text = _FENCE.sub("", value.strip()).strip()
+        if not text.startswith(("{", "[")):
+            return None
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return None
+    if isinstance(value, dict) and value and all(isinstance(v, dict) for v in value.values()):
+        records = []
+        for key, record in value.items():
+            if "ticker" not in record:
+                record = {"ticker": key, **record}
+            records.append(record)
+        return records
+    if isinstance(value, list) and value and all(isinstance(v, dict) for v in value):
+        return value
+    return None
+
+
+def project(records: Iterable[dict], fields: Optional[list]) -> list:
+    """Keeps only ``fields`` of each record, plus ``error`` where present; ``None`` keeps all."""
+    if not fields:
+        return list(records)
+    keep = list(fields) + ([] if "error" in fields else ["error"])
+    return [{name: record[name] for name in keep if name in record} for record in records]
+
+
+def to_table(records: list, digits: int = SIGNIFICANT_DIGITS) -> str:
+    """Pipe-separated table; columns equal in every row become ``name: value`` lines above it."""
+    columns = {}
+    for record in records:
+        for name in record:
+            columns.setdefault(name, None)
+    constant, varying = [], []
+    for name in columns:
+        values = {_cell(record.get(name), digits) for record in records}
+        if len(records) > 1 and len(values) == 1 and all(name in record for record in records):
+            constant.append(f"{name}: {values.pop()}")
+        else:
+            varying.append(name)
+    lines = constant + ["|".join(varying)]
+    for record in records:
+        lines.append("|".join(_cell(record.get(name), digits) for name in varying))
+    return "\n".join(lines)
+
+
+def dedupe_text(text: str, min_chars: int = MIN_DEDUPE_CHARS) -> str:
+    """Drops sentences already seen earlier in the text (case- and spacing-insensitive)."""
+    seen = set()
+    lines = []
+    for line in text.splitlines():
+        if not line.strip():
+            if lines and lines[-1]:
+                lines.append("")
+            continue
+        kept = []
+        for sentence in _SENTENCE.split(line):
+            key = " ".join(sentence.lower().split()).rstrip(".!?;: ")
+            if len(key) >= min_chars:
+                if key in seen:
+                    continue
+                seen.add(key)
+            kept.append(sentence)
+        if kept:
+            lines.append(" ".join(kept))
+    return "\n".join(lines).strip()
+
+
+def fit_budget(text: str, max_tokens: Optional[int]) -> str:
+    """Keeps whole lines from the top while they fit in ``max_tokens``, noting how many were cut."""
+    if not max_tokens or estimate_tokens(text) <= max_tokens:
+        return text
+    lines = text.splitlines()
+    budget = max_tokens - estimate_tokens(OMITTED.format(count=len(lines)))
+    kept = []
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if cost > budget:
+            break
+        budget -= cost
+        kept.append(line)
+    kept.append(OMITTED.format(count=len(lines) - len(kept)))
+    return "\n".join(kept)
+
+
+def compact(value, fields: Optional[list] = None, max_tokens: Optional[int] = None) -> str:
+    """Compact rendering of a state value: a table for records, deduplicated text otherwise."""
+    if value is None:
+        return ""
+    records = as_records(value)
+    if records is not None:
+        text = to_table(project(records, fields))
+    elif isinstance(value, str):
+        text = dedupe_text(value)
+    else:
+        text = json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+    return fit_budget(text, max_tokens)
+
+
+class CompactionStats:
+    """Estimated tokens before and after compaction, summed over runs."""
+
+    def __init__(self):
+        self.runs = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.seconds = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "runs": self.runs,
+            "tokens_in": self.tokens_in,
+            "tokens_out": self.tokens_out,
+            "ratio": round(self.tokens_out / self.tokens_in, 3) if self.tokens_in else None,
+            "ms": round(self.seconds * 1000, 3),
+        }
+
+
+class CompactionStage(BaseAgent):
+    """Writes ``compact(state[source_key])`` to ``state[output_key]``, without a model call.
+
+    The output key is always written (empty when the source is missing), so
+    the next instruction can reference it unconditionally.
+    """
+
+    source_key: str
+    output_key: str
+    fields: Optional[list[str]] = None
+    """Record fields the next stage needs; ``None`` keeps them all."""
+    max_tokens: Optional[int] = None
+    """Token budget of the compacted value; ``None`` for no limit."""
+
+    _stats: CompactionStats = PrivateAttr(default_factory=CompactionStats)
+
+    @property
+    def stats(self) -> CompactionStats:
+        return self._stats
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        value = ctx.session.state.get(self.source_key)
+        start = time.perf_counter()
+        text = compact(value, self.fields, self.max_tokens)
+        self._stats.seconds += time.perf_counter() - start
+        self._stats.runs += 1
+        # The placeholder would have rendered str(value); that is what the compacted text replaces.
+        self._stats.tokens_in += estimate_tokens(value if isinstance(value, str) else str(value or ""))
+        self._stats.tokens_out += estimate_tokens(text)
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={self.output_key: text}),
+        )
+
+
+def keep_tool_response(key: str, *tool_names: str):
+    """``after_tool_callback`` that stores the raw response of ``tool_names`` (all tools if none) in ``state[key]``.
+
+    Dict responses from repeated calls are merged, so several ``get_fii_data``
+    calls leave one dict keyed by ticker; pair it with ``reset_state`` so one
+    run does not merge into the previous run's data.
+    """
+
+    def after_tool_callback(tool, args: dict, tool_context, tool_response):
+        if tool_names and tool.name not in tool_names:
+            return None
+        previous = tool_context.state.get(key)
+        if isinstance(previous, dict) and isinstance(tool_response, dict):
+            tool_response = {**previous, **tool_response}
+        tool_context.state[key] = tool_response
+        return None
+
+    return after_tool_callback
+
+
+def reset_state(*keys: str):
+    """``before_agent_callback`` that clears ``keys`` at the start of the agent's run."""
+
+    def before_agent_callback(callback_context):
+        for key in keys:
+            if callback_context.state.get(key) is not None:
+                callback_context.state[key] = None
+        return None
+
+    return before_agent_callback
+
+
+def _cell(value, digits: int) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.{digits}g}"
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+    return str(value).replace("|", "/").replace("\n", " ")
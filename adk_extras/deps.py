@@ -0,0 +1,13 @@
+"""
+Heavy third-party imports of adk_extras, loaded once on first use.
+
+Every agent module imports adk_extras at startup; numpy is only paid for by the
+first semantic-cache lookup, not by ``adk web`` reloads or worker cold starts.
+"""
+from functools import cache
+
+
+@cache
+def numpy():
+    import numpy
+    return numpy
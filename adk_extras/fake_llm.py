@@ -0,0 +1,47 @@
+"""
+Deterministic stand-in for Gemini, used by the benchmarks.
+
+``FakeLlm`` plugs into any ``LlmAgent(model=...)`` and answers after a fixed
+latency, so pipelines can be timed without network access or API keys.
+"""
+import asyncio
+from typing import AsyncGenerator, Callable, Optional, Union
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+
+def last_user_text(llm_request: LlmRequest) -> str:
+    """Text of the latest user turn in the request, or an empty string."""
+    for content in reversed(llm_request.contents):
+        if content.role == "user" and content.parts:
+            return "".join(part.text or "" for part in content.parts)
+    return ""
+
+
+class FakeLlm(BaseLlm):
+    """Answers every request with ``responder(llm_request)`` after ``latency`` seconds.
+
+    The responder returns the answer text, or a whole ``LlmResponse`` (e.g. a function call).
+    """
+
+    model: str = "fake-llm"
+    latency: float = 0.0
+    responder: Optional[Callable[[LlmRequest], Union[str, LlmResponse]]] = None
+    calls: int = 0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.responder is not None:
+            text = self.responder(llm_request)
+        else:
+            text = f"Resposta para: {last_user_text(llm_request)}"
+        if isinstance(text, LlmResponse):
+            yield text
+            return
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
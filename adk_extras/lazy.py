@@ -0,0 +1,59 @@
+"""
+Lazy module attributes for agent packages.
+
+Everything an agent package imports and builds at module level is paid by
+every script that only wants a helper, a schema or a constant from it. With
+these, ``root_agent`` becomes a module ``__getattr__`` (PEP 562): the package
+import is cheap and the agent tree is built by its factory on first access,
+once. Keep the ADK imports inside the factory, or the import still pays for
+them. ``adk web`` and ``adk api_server`` read ``root_agent`` as soon as they
+load the package, so they build the agent right away either way.
+
+    # agent.py
+    def build_root_agent() -> "BaseAgent":
+        from google.adk.agents import ...
+    __getattr__ = lazy_factory(__name__, "root_agent", build_root_agent)
+
+    # __init__.py
+    __getattr__ = lazy_exports(__name__, {"root_agent": ".agent"})
+"""
+import importlib
+import sys
+import threading
+from typing import Callable
+
+
+def lazy_factory(module: str, name: str, factory: Callable[[], object]):
+    """Module ``__getattr__`` that builds ``name`` with ``factory`` on first access and caches it.
+
+    Args:
+        module: ``__name__`` of the module the attribute belongs to.
+        name: Attribute name, e.g. ``root_agent``.
+        factory: Builds the value; called at most once, even from several threads.
+    """
+    lock = threading.Lock()
+
+    def __getattr__(attr: str):
+        if attr != name:
+            raise AttributeError(f"module {module!r} has no attribute {attr!r}")
+        with lock:
+            namespace = vars(sys.modules[module])
+            if name not in namespace:
+                namespace[name] = factory()
+            return namespace[name]
+
+    return __getattr__
+
+
+def lazy_exports(package: str, exports: dict):
+    """Package ``__getattr__`` that imports ``exports[name]`` (a relative module) on first access of ``name``."""
+
+    def __getattr__(attr: str):
+        target = exports.get(attr)
+        if target is None:
+            raise AttributeError(f"module {package!r} has no attribute {attr!r}")
+        value = getattr(importlib.import_module(target, package), attr)
+        setattr(sys.modules[package], attr, value)
+        return value
+
+    return __getattr__
@@ -0,0 +1,177 @@
+"""
+Pre-fork warm pool: import the agent stack once, then fork the workers.
+
+A cold worker pays the whole import of ADK, google-genai and the agent
+modules (seconds, most of it ``vertexai`` pulled in by ADK itself) before it
+can serve. The pool imports the target and the ``--preload`` modules in the
+parent, freezes the heap (``gc.freeze``, so the children's collections do not
+touch, and copy, the shared pages) and forks: each worker starts with
+everything already imported and shares the parent's memory copy-on-write.
+
+Workers that die with an error are forked again from the warm parent; on
+SIGTERM/SIGINT the parent forwards the signal and waits for every worker.
+
+    python -m adk_extras.prefork --workers 4 --target research_agent:run_research_agent \\
+        --port-env AGENT_PORT --port-base 11000 --port-step 2
+
+Fork only before any thread or event loop exists: the parent does nothing
+but import and wait, the workers create their own loop.
+"""
+import argparse
+import asyncio
+import gc
+import importlib
+import inspect
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+RESPAWN_DELAY = 1.0
+
+
+def resolve(spec: str):
+    """Imports ``module`` or ``module:attr`` (dotted) and returns the module or the attribute."""
+    module_name, _, attr = spec.partition(":")
+    value = importlib.import_module(module_name)
+    for part in filter(None, attr.split(".")):
+        value = getattr(value, part)
+    return value
+
+
+class WarmPool:
+    """Forks ``workers`` children from a parent that already imported ``target``.
+
+    Args:
+        target: Worker entry point; called without arguments in each child. A
+            coroutine result is run with ``asyncio.run``.
+        workers: Number of children kept alive.
+        preload: ``module`` or ``module:attr`` specs imported, or read, in the
+            parent before forking, e.g. ``02multiagentes.agent:root_agent`` to
+            build a lazy agent once for every worker.
+        port_env: Environment variable that receives each worker's port.
+        port_base: Port of worker 0.
+        port_step: Distance between the ports of consecutive workers.
+    """
+
+    def __init__(
+        self,
+        target: Callable,
+        workers: int,
+        preload: tuple = (),
+        port_env: Optional[str] = None,
+        port_base: int = 0,
+        port_step: int = 1,
+    ):
+        self.target = target
+        self.workers = workers
+        self.preload = preload
+        self.port_env = port_env
+        self.port_base = port_base
+        self.port_step = port_step
+        self.children = {}  # pid -> worker index
+        self.spawned = 0
+        self._stopping = False
+
+    def warm(self) -> None:
+        for spec in self.preload:
+            resolve(spec)
+        if threading.active_count() > 1:
+            logger.warning("%d threads alive before fork; only the main one survives in the workers",
+                           threading.active_count())
+        gc.collect()
+        gc.freeze()
+
+    def spawn(self, index: int) -> int:
+        pid = os.fork()
+        if pid:
+            self.children[pid] = index
+            self.spawned += 1
+            return pid
+        code = 1
+        try:
+            code = self._child(index)
+        except SystemExit as exc:
+            code = exc.code if isinstance(exc.code, int) else 1
+        except BaseException:
+            logger.exception("Worker %d failed", index)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    def _child(self, index: int) -> int:
+        # Its own process group: Ctrl-C reaches only the parent, which forwards it once.
+        os.setpgid(0, 0)
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, signal.SIG_DFL)
+        # The heap frozen in warm() stays frozen: unfreezing it would let the first
+        # collection touch, and copy, every page shared with the parent.
+        os.environ["WORKER_INDEX"] = str(index)
+        if self.port_env:
+            os.environ[self.port_env] = str(self.port_base + self.port_step * index)
+        result = self.target()
+        if inspect.iscoroutine(result):
+            asyncio.run(result)
+        return 0
+
+    def stop(self, sig: int = signal.SIGTERM, *_) -> None:
+        self._stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        """Warms up, forks the workers and supervises them until all have exited after a stop."""
+        self.warm()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self.stop)
+        for index in range(self.workers):
+            self.spawn(index)
+        while self.children:
+            pid, status = os.wait()
+            index = self.children.pop(pid, None)
+            if index is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if self._stopping or code == 0:
+                continue
+            logger.warning("Worker %d (pid %d) exited with %s, forking again", index, pid, code)
+            time.sleep(RESPAWN_DELAY)
+            if not self._stopping:
+                self.spawn(index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target", required=True, help="module:function run by each worker")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WORKERS", 1)))
+    parser.add_argument("--preload", action="append", default=[], help="module[:attr] to load before forking")
+    parser.add_argument("--port-env", help="variable that receives each worker's port, e.g. AGENT_PORT")
+    parser.add_argument("--port-base", type=int, default=0)
+    parser.add_argument("--port-step", type=int, default=1)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    # Current directory first, as with ``python script.py`` (05copywriter imports sibling modules).
+    sys.path.insert(0, os.getcwd())
+    pool = WarmPool(
+        resolve(args.target),
+        args.workers,
+        preload=tuple(args.preload),
+        port_env=args.port_env,
+        port_base=args.port_base,
+        port_step=args.port_step,
+    )
+    pool.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""
+Offline semantic cache for LLM stage outputs.
+
+Queries are embedded locally with a signed, hashed n-gram vectorizer, so no
+embedding API is needed. Each stage (e.g. ``entidade``, ``pesquisa``, ``sumario``)
+keeps its own vector index with TTL and LRU eviction; candidates come from
+random-hyperplane LSH buckets and are confirmed by exact cosine similarity,
+which keeps lookups well under a millisecond at 100k entries.
+
+Cosine over n-grams cannot tell ``PETR4`` from ``PETR3`` or 2023 from 2024,
+so tokens with digits (tickers, years, amounts) and upper-case acronyms are
+anchors: a similar entry is only served when its anchors are exactly the
+query's.
+
+A hit is served from ``before_model_callback``, which skips the model call and,
+with it, any built-in ``google_search`` the model would have run. Entries are
+namespaced per agent, and follow-up turns ("e o segundo?") are neither served
+nor stored when the key is the user's message alone.
+"""
+import os
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from . import deps
+
+if TYPE_CHECKING:
+    import numpy as np
+
+DEFAULT_DIM = 256
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_TTL = 6 * 60 * 60
+DEFAULT_MAXSIZE = 10_000
+BANDS = 32
+BITS_PER_BAND = 16
+
+_NON_WORD = re.compile(r"[^\w]+")
+_ACRONYM = re.compile(r"\b[A-Z][A-Z0-9]+\b")
+
+
+def normalize(text: str) -> str:
+    """Lower-case, accent-free, punctuation-free text with single spaces."""
+    decomposed = unicodedata.normalize("NFD", text)
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+    return _NON_WORD.sub(" ", folded).strip()
+
+
+def anchors(text: str) -> frozenset:
+    """Tokens that must match exactly: words with digits and upper-case acronyms (``PETR4``, ``2024``, ``AAPL``)."""
+    tokens = {token for token in normalize(text).split() if any(c.isdigit() for c in token)}
+    tokens.update(acronym.lower() for acronym in _ACRONYM.findall(text))
+    return frozenset(tokens)
+
+
+class HashedNgramVectorizer:
+    """Embeds text as signed feature hashes of character trigrams and words."""
+
+    def __init__(self, dim: int = DEFAULT_DIM):
+        self.dim = dim
+
+    def __call__(self, text: str) -> "np.ndarray":
+        np = deps.numpy()
+        normalized = normalize(text)
+        vector = np.zeros(self.dim, dtype=np.float32)
+        padded = f" {normalized} "
+        features = [padded[i:i + 3] for i in range(len(padded) - 2)]
+        features += normalized.split()
+        for feature in features:
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class _StageIndex:
+    """Vectors, values and LSH buckets of one stage."""
+
+    def __init__(self, dim: int, planes: "np.ndarray"):
+        np = deps.numpy()
+        self.planes = planes
+        self.vectors = np.zeros((64, dim), dtype=np.float32)
+        self.values = []
+        self.keys = []
+        self.anchors = []
+        self.stored_at = []
+        self.bands = []
+        self.exact = {}
+        self.buckets = [{} for _ in range(BANDS)]
+        self.lru = OrderedDict()
+        self.free = []
+
+    def __len__(self):
+        return len(self.lru)
+
+    def signature(self, vector: "np.ndarray") -> tuple:
+        np = deps.numpy()
+        bits = (self.planes @ vector > 0).reshape(BANDS, BITS_PER_BAND)
+        return tuple((bits * (1 << np.arange(BITS_PER_BAND))).sum(axis=1).tolist())
+
+    def search(self, key: str, vector: "np.ndarray", anchors: frozenset, threshold: float):
+        """Returns ``(slot, similarity)`` of the best match above threshold with the same anchors, or ``None``."""
+        slot = self.exact.get(key)
+        if slot is not None:
+            return slot, 1.0
+        candidates = set()
+        for band, bucket_key in enumerate(self.signature(vector)):
+            bucket = self.buckets[band].get(bucket_key)
+            if bucket:
+                candidates |= bucket
+        candidates = [slot for slot in candidates if self.anchors[slot] == anchors]
+        if not candidates:
+            return None
+        np = deps.numpy()
+        slots = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarities = self.vectors[slots] @ vector
+        best = int(similarities.argmax())
+        if similarities[best] < threshold:
+            return None
+        return int(slots[best]), float(similarities[best])
+
+    def insert(self, key: str, vector: "np.ndarray", anchors: frozenset, value: str, now: float) -> int:
+        slot = self.exact.get(key)
+        if slot is not None:
+            self.values[slot] = value
+            self.stored_at[slot] = now
+            self.lru.move_to_end(slot)
+            return slot
+
+        if self.free:
+            slot = self.free.pop()
+        else:
+            slot = len(self.values)
+            if slot == len(self.vectors):
+                np = deps.numpy()
+                self.vectors = np.concatenate([self.vectors, np.zeros_like(self.vectors)])
+            self.values.append(None)
+            self.keys.append(None)
+            self.anchors.append(None)
+            self.stored_at.append(0.0)
+            self.bands.append(None)
+
+        signature = self.signature(vector)
+        self.vectors[slot] = vector
+        self.values[slot] = value
+        self.keys[slot] = key
+        self.anchors[slot] = anchors
+        self.stored_at[slot] = now
+        self.bands[slot] = signature
+        self.exact[key] = slot
+        for band, bucket_key in enumerate(signature):
+            self.buckets[band].setdefault(bucket_key, set()).add(slot)
+        self.lru[slot] = None
+        return slot
+
+    def remove(self, slot: int):
+        for band, bucket_key in enumerate(self.bands[slot]):
+            bucket = self.buckets[band][bucket_key]
+            bucket.discard(slot)
+            if not bucket:
+                del self.buckets[band][bucket_key]
+        del self.exact[self.keys[slot]]
+        del self.lru[slot]
+        self.values[slot] = None
+        self.keys[slot] = None
+        self.anchors[slot] = None
+        self.free.append(slot)
+
+
+class SemanticCache:
+    """Per-stage similarity cache with TTL and size-bounded LRU eviction."""
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        ttl: float = DEFAULT_TTL,
+        maxsize: int = DEFAULT_MAXSIZE,
+        dim: int = DEFAULT_DIM,
+        clock=time.time,
+        seed: int = 0,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self.vectorize = HashedNgramVectorizer(dim)
+        self.seed = seed
+        # Created with the first stage, so building agents does not import numpy
+        self._planes = None
+        self._stages = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, stage: str, text: str) -> Optional[str]:
+        key = normalize(text)
+        if not key:
+            return None
+        vector = self.vectorize(text)
+        with self._lock:
+            index = self._stage(stage)
+            counters = self._counters[stage]
+            match = index.search(key, vector, anchors(text), self.threshold)
+            if match is not None:
+                slot, _ = match
+                if self.clock() - index.stored_at[slot] <= self.ttl:
+                    index.lru.move_to_end(slot)
+                    counters["hits"] += 1
+                    return index.values[slot]
+                index.remove(slot)
+                counters["expired"] += 1
+            counters["misses"] += 1
+            return None
+
+    def put(self, stage: str, text: str, value: str):
+        key = normalize(text)
+        if not key or not value:
+            return
+        vector = self.vectorize(text)
+        with self._lock:
+            index = self._stage(stage)
+            if key not in index.exact and len(index) >= self.maxsize:
+                oldest = next(iter(index.lru))
+                index.remove(oldest)
+                self._counters[stage]["evictions"] += 1
+            index.insert(key, vector, anchors(text), value, self.clock())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                stage: {"size": len(self._stages[stage]), **counters}
+                for stage, counters in self._counters.items()
+            }
+
+    def callbacks(
+        self,
+        stage: str,
+        key: Callable[[CallbackContext], str] = None,
+        namespace: Optional[str] = None,
+    ) -> dict:
+        """
+        Model callbacks that serve and fill this cache for one agent.
+
+        Args:
+            stage: Cache partition, usually the agent's ``output_key``.
+            key: Builds the lookup text from the callback context. Defaults to
+                the user's message; then follow-up turns of a session, whose
+                answer depends on the history, skip the cache.
+            namespace: Prefix of the partition; defaults to the agent's name, so
+                agents with different prompts never share answers. Agents built
+                per item (``pesquisador_0``, ``pesquisador_1``) pass one name.
+
+        Returns:
+            ``before_model_callback`` and ``after_model_callback`` keyword
+            arguments for ``LlmAgent``.
+        """
+        single_turn = key is None
+        key = key or user_query
+
+        def partition(callback_context: CallbackContext) -> Optional[str]:
+            if single_turn and is_follow_up(callback_context):
+                return None
+            return f"{namespace or callback_context.agent_name}/{stage}"
+
+        def before_model_callback(callback_context: CallbackContext, llm_request: LlmRequest):
+            # No meio de um ciclo de ferramentas a resposta depende do resultado delas.
+            last = llm_request.contents[-1] if llm_request.contents else None
+            if last and any(part.function_response for part in last.parts or []):
+                return None
+            name = partition(callback_context)
+            if name is None:
+                return None
+            cached = self.get(name, key(callback_context) or "")
+            if cached is None:
+                return None
+            return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=cached)]))
+
+        def after_model_callback(callback_context: CallbackContext, llm_response: LlmResponse):
+            content = llm_response.content
+            if llm_response.partial or not content or not content.parts:
+                return None
+            if any(part.function_call for part in content.parts):
+                return None
+            name = partition(callback_context)
+            if name is None:
+                return None
+            text = "".join(part.text or "" for part in content.parts if not part.thought)
+            self.put(name, key(callback_context) or "", text)
+            return None
+
+        return {
+            "before_model_callback": before_model_callback,
+            "after_model_callback": after_model_callback,
+        }
+
+    def _stage(self, stage: str) -> _StageIndex:
+        index = self._stages.get(stage)
+        if index is None:
+            if self._planes is None:
+                np = deps.numpy()
+                shape = (BANDS * BITS_PER_BAND, self.vectorize.dim)
+                self._planes = np.random.default_rng(self.seed).standard_normal(shape).astype(np.float32)
+            index = self._stages[stage] = _StageIndex(self.vectorize.dim, self._planes)
+            self._counters[stage] = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+        return index
+
+
+def user_query(callback_context: CallbackContext) -> str:
+    """Text of the user message that started the current invocation."""
+    content = callback_context.user_content
+    if not content or not content.parts:
+        return ""
+    return "".join(part.text or "" for part in content.parts)
+
+
+def is_follow_up(callback_context: CallbackContext) -> bool:
+    """Whether the session already had user messages before the current invocation."""
+    session = callback_context._invocation_context.session
+    current = callback_context.invocation_id
+    return any(event.author == "user" and event.invocation_id != current for event in session.events)
+
+
+def state_value(name: str) -> Callable[[CallbackContext], str]:
+    """Key function reading ``state[name]``, e.g. the entity found by an earlier stage."""
+    def key(callback_context: CallbackContext) -> str:
+        return str(callback_context.state.get(name) or "")
+    return key
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_semantic_cache() -> SemanticCache:
+    """Process-wide cache, tunable with SEMANTIC_CACHE_THRESHOLD/TTL/MAXSIZE."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = SemanticCache(
+                threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", DEFAULT_THRESHOLD)),
+                ttl=float(os.getenv("SEMANTIC_CACHE_TTL", DEFAULT_TTL)),
+                maxsize=int(os.getenv("SEMANTIC_CACHE_MAXSIZE", DEFAULT_MAXSIZE)),
+            )
+        return _default_cache
@@ -0,0 +1,425 @@
+"""
+Durable session service on SQLite, a drop-in for ``InMemorySessionService``.
+
+Sessions survive restarts and can be shared by worker processes on the same
+host: the database runs in WAL mode, so readers never block the writer.
+Events are append-only rows indexed by ``(app, user, session, timestamp)``.
+``append_event`` buffers them and writes one transaction per turn (when the
+final response arrives, or every ``batch_size`` events). Hot sessions stay
+in an LRU cache. A session's events are loaded from the database in pages
+the first time they are accessed, not in ``get_session``, and
+``iter_events`` pages through them without keeping them in memory.
+"""
+import json
+import os
+import sqlite3
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Iterator, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import Session
+from google.adk.sessions.base_session_service import BaseSessionService, GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_CACHE_SIZE = 128
+DEFAULT_PAGE_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_session ON events (app_name, user_id, session_id, timestamp);
+CREATE TABLE IF NOT EXISTS app_states (app_name TEXT PRIMARY KEY, state TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+"""
+
+
+class LazyEvents(list):
+    """A session's event list that reads its rows from the database on first access.
+
+    ``loader`` returns an iterator of event pages; ``None`` means already loaded.
+    """
+
+    def __init__(self, loader=None):
+        super().__init__()
+        self._loader = loader
+
+    @property
+    def loaded(self) -> bool:
+        return self._loader is None
+
+    def _load(self):
+        if self._loader is not None:
+            loader, self._loader = self._loader, None
+            for page in loader():
+                list.extend(self, page)
+
+    def __reduce_ex__(self, protocol):
+        self._load()
+        return list, (list(self),)
+
+
+def _lazy(name):
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        self._load()
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in (
+    "__len__", "__iter__", "__reversed__", "__getitem__", "__setitem__", "__delitem__", "__contains__",
+    "__eq__", "__ne__", "__add__", "__iadd__", "__repr__", "append", "extend", "insert", "pop", "remove",
+    "index", "count", "copy", "clear", "sort", "reverse",
+):
+    setattr(LazyEvents, _name, _lazy(_name))
+
+
+class _CachedSession:
+    """A session held in the LRU cache, with the update time last written to the database."""
+
+    __slots__ = ("session", "stored_update_time")
+
+    def __init__(self, session: Session, stored_update_time: float):
+        self.session = session
+        self.stored_update_time = stored_update_time
+
+
+class SqliteSessionService(BaseSessionService):
+    """Session service backed by a SQLite database in WAL mode.
+
+    Args:
+        path: Database file; created if missing.
+        batch_size: Buffered events that force a write before the turn ends.
+        cache_size: Sessions kept in the in-memory LRU cache.
+        page_size: Rows fetched per query when loading or paging events.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.page_size = page_size
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._cache = OrderedDict()
+        self._pending_events = []
+        self._pending_sessions = {}
+        self._pending_app = {}
+        self._pending_user = {}
+        self.flushes = 0
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        app_delta, user_delta, session_state = _split_state(state or {})
+        now = time.time()
+        self._flush()
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "INSERT INTO sessions (app_name, user_id, id, state, update_time) VALUES (?, ?, ?, ?, ?)",
+                    (app_name, user_id, session_id, json.dumps(session_state), now),
+                )
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Session {session_id} already exists") from None
+            if app_delta:
+                self._merge_app_state(app_name, app_delta)
+            if user_delta:
+                self._merge_user_state(app_name, user_id, user_delta)
+        session = Session(app_name=app_name, user_id=user_id, id=session_id, state=session_state, last_update_time=now)
+        session.events = LazyEvents(None)
+        self._remember((app_name, user_id, session_id), session, now)
+        return self._view(session)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        self._flush()
+        row = self._db.execute(
+            "SELECT state, update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", key
+        ).fetchone()
+        if row is None:
+            self._cache.pop(key, None)
+            return None
+
+        cached = self._cache.get(key)
+        if cached is None or cached.stored_update_time != row[1]:
+            # Not cached, or another process wrote to the session since.
+            session = Session(
+                app_name=app_name, user_id=user_id, id=session_id, state=json.loads(row[0]), last_update_time=row[1]
+            )
+            session.events = LazyEvents(lambda: self.iter_events(*key))
+            cached = self._remember(key, session, row[1])
+        else:
+            self._cache.move_to_end(key)
+
+        if config and (config.num_recent_events or config.after_timestamp):
+            view = self._view(cached.session, events=[])
+            view.events = [event for page in self._pages(key, config) for event in page]
+            return view
+        return self._view(cached.session)
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        self._flush()
+        rows = self._db.execute(
+            "SELECT id, update_time FROM sessions WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+        ).fetchall()
+        return ListSessionsResponse(
+            sessions=[
+                Session(app_name=app_name, user_id=user_id, id=session_id, state={}, last_update_time=update_time)
+                for session_id, update_time in rows
+            ]
+        )
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        self._flush()
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.execute("DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?", key)
+            self._db.execute("DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", key)
+        self._cache.pop(key, None)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        key = (session.app_name, session.user_id, session.id)
+        if key not in self._pending_sessions:
+            self._check_fresh(key, session.last_update_time)
+        await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+
+        app_delta, user_delta, session_delta = _split_state(
+            event.actions.state_delta if event.actions and event.actions.state_delta else {}
+        )
+        cached = self._cache.get(key)
+        if cached is not None and cached.session is not session:
+            if cached.session.events.loaded:
+                list.append(cached.session.events, event)
+            cached.session.state.update(session_delta)
+            cached.session.last_update_time = event.timestamp
+
+        self._pending_events.append((*key, event.timestamp, event.model_dump_json(exclude_none=True)))
+        state = self._pending_sessions.get(key)
+        if state is None:
+            state = {k: v for k, v in session.state.items() if not k.startswith((State.APP_PREFIX, State.USER_PREFIX))}
+        state.update(session_delta)
+        self._pending_sessions[key] = state
+        if app_delta:
+            self._pending_app.setdefault(session.app_name, {}).update(app_delta)
+        if user_delta:
+            self._pending_user.setdefault((session.app_name, session.user_id), {}).update(user_delta)
+
+        # One write per turn: the agent's final response closes it.
+        if (event.author != "user" and event.is_final_response()) or len(self._pending_events) >= self.batch_size:
+            self._flush()
+        return event
+
+    def iter_events(
+        self, app_name: str, user_id: str, session_id: str, page_size: int = None
+    ) -> Iterator[list]:
+        """Yields a session's events in pages, oldest first, without caching them.
+
+        Args:
+            app_name: The app of the session.
+            user_id: The user of the session.
+            session_id: The session id.
+            page_size: Events per page; defaults to the service's ``page_size``.
+        """
+        self._flush()
+        yield from self._pages((app_name, user_id, session_id), page_size=page_size)
+
+    def flush(self):
+        """Writes buffered events and state now."""
+        self._flush()
+
+    def close(self):
+        self._flush()
+        self._db.close()
+
+    def _pages(self, key: tuple, config: GetSessionConfig = None, page_size: int = None) -> Iterator[list]:
+        page_size = page_size or self.page_size
+        if config and config.num_recent_events:
+            rows = self._db.execute(
+                "SELECT seq, data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?"
+                " AND timestamp >= ? ORDER BY timestamp DESC, seq DESC LIMIT ?",
+                (*key, config.after_timestamp or 0.0, config.num_recent_events),
+            ).fetchall()
+            yield [Event.model_validate_json(data) for _, data in reversed(rows)]
+            return
+        last = (config.after_timestamp if config and config.after_timestamp else float("-inf"), -1)
+        while True:
+            # Keyset pagination over the (app, user, session, timestamp) index.
+            rows = self._db.execute(
+                "SELECT seq, timestamp, data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?"
+                " AND (timestamp, seq) > (?, ?) ORDER BY timestamp, seq LIMIT ?",
+                (*key, *last, page_size),
+            ).fetchall()
+            if not rows:
+                return
+            yield [Event.model_validate_json(data) for _, _, data in rows]
+            seq, timestamp, _ = rows[-1]
+            last = (timestamp, seq)
+
+    def _flush(self):
+        if not self._pending_events and not self._pending_sessions:
+            return
+        events, self._pending_events = self._pending_events, []
+        sessions, self._pending_sessions = self._pending_sessions, {}
+        app_states, self._pending_app = self._pending_app, {}
+        user_states, self._pending_user = self._pending_user, {}
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.executemany(
+                "INSERT INTO events (app_name, user_id, session_id, timestamp, data) VALUES (?, ?, ?, ?, ?)", events
+            )
+            update_times = {}
+            for event in events:
+                update_times[event[:3]] = event[3]
+            for key, state in sessions.items():
+                update_time = update_times[key]
+                self._db.execute(
+                    "UPDATE sessions SET state = ?, update_time = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+                    (json.dumps(state), update_time, *key),
+                )
+                cached = self._cache.get(key)
+                if cached is not None:
+                    cached.stored_update_time = update_time
+            for app_name, delta in app_states.items():
+                self._merge_app_state(app_name, delta)
+            for (app_name, user_id), delta in user_states.items():
+                self._merge_user_state(app_name, user_id, delta)
+        self.flushes += 1
+
+    def _check_fresh(self, key: tuple, last_update_time: float):
+        """Rejects appends to a session that another writer changed or deleted since it was read."""
+        row = self._db.execute(
+            "SELECT update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", key
+        ).fetchone()
+        if row is None:
+            self._cache.pop(key, None)
+            raise ValueError(f"Session {key[2]} not found")
+        if row[0] > last_update_time:
+            self._cache.pop(key, None)
+            raise ValueError(
+                f"Session {key[2]} was updated at {row[0]}, after it was read at {last_update_time};"
+                " reload it with get_session"
+            )
+
+    def _merge_app_state(self, app_name: str, delta: dict):
+        row = self._db.execute("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).fetchone()
+        state = {**(json.loads(row[0]) if row else {}), **delta}
+        self._db.execute("INSERT OR REPLACE INTO app_states (app_name, state) VALUES (?, ?)", (app_name, json.dumps(state)))
+
+    def _merge_user_state(self, app_name: str, user_id: str, delta: dict):
+        row = self._db.execute(
+            "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+        ).fetchone()
+        state = {**(json.loads(row[0]) if row else {}), **delta}
+        self._db.execute(
+            "INSERT OR REPLACE INTO user_states (app_name, user_id, state) VALUES (?, ?, ?)",
+            (app_name, user_id, json.dumps(state)),
+        )
+
+    def _remember(self, key: tuple, session: Session, stored_update_time: float) -> _CachedSession:
+        cached = self._cache[key] = _CachedSession(session, stored_update_time)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return cached
+
+    def _view(self, session: Session, events: list = None) -> Session:
+        """Copy handed to the caller: its own state and event list, sharing the event objects."""
+        app_name, user_id = session.app_name, session.user_id
+        state = dict(session.state)
+        row = self._db.execute("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).fetchone()
+        for name, value in (json.loads(row[0]) if row else {}).items():
+            state[State.APP_PREFIX + name] = value
+        row = self._db.execute(
+            "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+        ).fetchone()
+        for name, value in (json.loads(row[0]) if row else {}).items():
+            state[State.USER_PREFIX + name] = value
+        view = Session(
+            app_name=app_name, user_id=user_id, id=session.id, state=state, last_update_time=session.last_update_time
+        )
+        if events is not None:
+            view.events = events
+        elif session.events.loaded:
+            view.events = list(session.events)
+        else:
+            # Still lazy: the view loads on first access and then shares the rows with the cache.
+            view.events = LazyEvents(lambda: self._share(session))
+        return view
+
+    @staticmethod
+    def _share(session: Session) -> Iterator[list]:
+        session.events._load()
+        yield list.copy(session.events)
+
+
+def _split_state(state: dict) -> tuple:
+    """Splits a state (or state delta) into app, user and session parts, dropping ``temp:`` keys."""
+    app, user, session = {}, {}, {}
+    for key, value in state.items():
+        if key.startswith(State.APP_PREFIX):
+            app[key.removeprefix(State.APP_PREFIX)] = value
+        elif key.startswith(State.USER_PREFIX):
+            user[key.removeprefix(State.USER_PREFIX)] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session[key] = value
+    return app, user, session
+
+
+def default_session_service() -> SqliteSessionService:
+    """Service at ``SESSIONS_DB``, or ``~/.cache/adk/sessions.db``."""
+    path = os.getenv("SESSIONS_DB") or os.path.join(os.path.expanduser("~"), ".cache", "adk", "sessions.db")
+    return SqliteSessionService(path)
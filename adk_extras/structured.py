@@ -0,0 +1,592 @@
+"""
+Structured output for agents whose instruction asks for a JSON object.
+
+``StructuredLlm`` wraps the agent's model and checks its answer against a
+declared pydantic schema (``output_schema``), without the restrictions of the
+ADK's own ``output_schema`` (which rules out tools):
+
+* the answer is read as a stream and scanned by ``JsonStreamParser``; each
+  top-level field is validated as soon as its value is complete, and the
+  stream is closed as soon as the object is, so trailing chatter is never
+  generated;
+* slips that do not need the model (fences and prose around the object,
+  trailing or missing commas, single quotes, Python literals, unquoted keys,
+  raw newlines in strings, a truncated end) are fixed locally by ``repair_json``;
+* fields that are still broken (wrong type, cut off, missing when required)
+  are asked again, alone, in one short repair call; a field found broken while
+  the answer still streams is repaired concurrently with the rest of it.
+
+The agent sees one final response with the validated object as compact JSON.
+Function calls and error responses pass through untouched.
+"""
+import asyncio
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Optional, Union, get_origin
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+from pydantic import BaseModel, PrivateAttr, TypeAdapter, ValidationError, create_model
+
+REPAIR_PROMPT = (
+    "Os campos {fields} da sua resposta JSON anterior estão incompletos ou inválidos. "
+    "Responda apenas com um objeto JSON contendo somente esses campos, neste formato:\n{template}"
+)
+
+_FENCE = re.compile(r"^```\w*|```$", flags=re.MULTILINE)
+_STRUCTURE = re.compile(r'["{}\[\],:]')
+_STRING_END = re.compile(r'["\\]')
+_BARE = re.compile(r"[^\s,:{}\[\]\"']+")
+_NUMBER = re.compile(r"-?\d+(\.\d+)?([eE][+-]?\d+)?")
+_LITERALS = {"true": "true", "false": "false", "null": "null", "True": "true", "False": "false", "None": "null"}
+_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+class JsonStreamParser:
+    """Incremental scanner for the first JSON object in a model's text.
+
+    ``feed`` takes the text as it streams. The scanner only tracks strings and
+    nesting, without decoding values; ``feed`` returns the top-level fields
+    whose value completed in that chunk, as ``(key, raw JSON text)`` pairs.
+    ``done`` turns true when the object closes. Text before the object (prose,
+    a ```json fence) is skipped.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.start = -1
+        self.end = -1
+        self.error = None
+        self.fields = {}
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._expect = "key"
+        self._key = None
+        self._key_start = -1
+        self._value_start = -1
+
+    @property
+    def done(self) -> bool:
+        return self.end >= 0
+
+    @property
+    def object_text(self) -> Optional[str]:
+        return self.text[self.start:self.end] if self.done else None
+
+    @property
+    def open_key(self) -> Optional[str]:
+        """The top-level field whose value was cut off where the text stopped."""
+        if self.done or self._expect != "value":
+            return None
+        try:
+            json.loads(self.text[self._value_start:])
+            return None
+        except ValueError:
+            return self._key
+
+    def feed(self, chunk: str) -> list:
+        self.text += chunk
+        completed = []
+        text = self.text
+        pos = self._pos
+        if self.start < 0:
+            pos = text.find("{", pos)
+            if pos < 0:
+                self._pos = len(text)
+                return completed
+            self.start = pos
+            self._stack.append("{")
+            pos += 1
+        while pos < len(text) and not self.done and self.error is None:
+            if self._in_string:
+                match = _STRING_END.search(text, pos)
+                if match is None:
+                    pos = len(text)
+                    break
+                if match.group() == "\\":
+                    if match.end() >= len(text):
+                        # The escaped character is in the next chunk: resume from the backslash.
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                self._in_string = False
+                pos = match.end()
+                if len(self._stack) == 1 and self._expect == "key" and self._key_start >= 0:
+                    try:
+                        self._key = json.loads(text[self._key_start:pos])
+                    except ValueError:
+                        self._key = text[self._key_start + 1:pos - 1]
+                    self._expect = "colon"
+                continue
+            match = _STRUCTURE.search(text, pos)
+            if match is None:
+                pos = len(text)
+                break
+            char, index, pos = match.group(), match.start(), match.end()
+            depth = len(self._stack)
+            if char == '"':
+                self._in_string = True
+                if depth == 1 and self._expect == "key":
+                    self._key_start = index
+            elif char in "{[":
+                self._stack.append(char)
+            elif char in "}]":
+                if (self._stack[-1] == "{") != (char == "}"):
+                    self.error = f"unexpected {char!r} at {index}"
+                elif depth == 1:
+                    self._finish_field(index, completed)
+                    self._stack.pop()
+                    self.end = index + 1
+                else:
+                    self._stack.pop()
+            elif depth == 1:
+                if char == ":" and self._expect == "colon":
+                    self._expect = "value"
+                    self._value_start = index + 1
+                elif char == ",":
+                    self._finish_field(index, completed)
+        self._pos = pos
+        return completed
+
+    def _finish_field(self, index: int, completed: list) -> None:
+        if self._expect == "value" and self._key is not None:
+            raw = self.text[self._value_start:index].strip()
+            if raw:
+                self.fields[self._key] = raw
+                completed.append((self._key, raw))
+        self._expect = "key"
+        self._key = None
+        self._key_start = -1
+
+
+@dataclass
+class ParsedOutput:
+    """Result of ``repair_json``: the recovered fields and what it took."""
+
+    value: Optional[dict]
+    fixes: list = field(default_factory=list)
+    broken: list = field(default_factory=list)
+    """Top-level fields that could not be recovered and were left out of ``value``."""
+
+
+def repair_json(text: str) -> ParsedOutput:
+    """Parses the first JSON object in ``text``, fixing common model slips.
+
+    Tries, in order: the object as is; the object after one normalizing pass
+    (see the module docstring), closing anything left open by a truncated
+    answer; and field by field, keeping the fields that decode and listing the
+    others in ``broken``.
+    """
+    text = _FENCE.sub("", text)
+    start = text.find("{")
+    if start < 0:
+        return ParsedOutput(None, ["no_object"])
+    end = text.rfind("}")
+    if end > start:
+        try:
+            value = json.loads(text[start:end + 1])
+            if isinstance(value, dict):
+                return ParsedOutput(value)
+        except ValueError:
+            pass
+    normalized, fixes = _normalize(text[start:])
+    try:
+        value = json.loads(normalized)
+        if isinstance(value, dict):
+            return ParsedOutput(value, fixes)
+    except ValueError:
+        pass
+    parser = JsonStreamParser()
+    parser.feed(normalized)
+    value, broken = {}, []
+    for key, raw in parser.fields.items():
+        try:
+            value[key] = json.loads(raw)
+        except ValueError:
+            broken.append(key)
+    if parser.open_key is not None:
+        broken.append(parser.open_key)
+    if not value and not broken:
+        return ParsedOutput(None, fixes + ["unparseable"])
+    return ParsedOutput(value, fixes + ["field_salvage"], broken)
+
+
+def _normalize(text: str) -> tuple:
+    """One pass over an object's text that rewrites it as strict JSON where it can."""
+    out, stack, fixes = [], [], []
+    quote = None
+    last = "open"  # open, value, comma, colon
+
+    def fix(name):
+        if name not in fixes:
+            fixes.append(name)
+
+    def separate():
+        if last == "value":
+            out.append(",")
+            fix("missing_comma")
+
+    i, n = 0, len(text)
+    while i < n:
+        char = text[i]
+        if quote:
+            if char == "\\" and i + 1 < n:
+                out.append(text[i:i + 2])
+                i += 2
+                continue
+            if char == quote:
+                out.append('"')
+                quote = None
+                last = "value"
+            elif char == '"':
+                out.append('\\"')
+            elif char in _ESCAPES:
+                out.append(_ESCAPES[char])
+                fix("control_char")
+            else:
+                out.append(char)
+            i += 1
+            continue
+        if char.isspace():
+            out.append(char)
+            i += 1
+            continue
+        if char in "\"'":
+            separate()
+            if char == "'":
+                fix("single_quotes")
+            quote = char
+            out.append('"')
+            i += 1
+            continue
+        if char in "{[":
+            separate()
+            stack.append("}" if char == "{" else "]")
+            out.append(char)
+            last = "open"
+            i += 1
+            continue
+        if char in "}]":
+            if last == "comma":
+                _drop_last(out, ",")
+                fix("trailing_comma")
+            elif last == "colon":
+                out.append("null")
+                fix("missing_value")
+            closer = stack.pop()
+            if closer != char:
+                fix("bracket")
+            out.append(closer)
+            last = "value"
+            i += 1
+            if not stack:
+                return "".join(out), fixes
+            continue
+        if char == ",":
+            if last in ("comma", "open"):
+                fix("extra_comma")
+            else:
+                out.append(char)
+                last = "comma"
+            i += 1
+            continue
+        if char == ":":
+            out.append(char)
+            last = "colon"
+            i += 1
+            continue
+        word = _BARE.match(text, i).group()
+        separate()
+        rest = text[i + len(word):].lstrip()
+        if stack[-1] == "}" and last in ("open", "comma") and rest.startswith(":"):
+            out.append(json.dumps(word))
+            fix("unquoted_key")
+        elif word in _LITERALS:
+            out.append(_LITERALS[word])
+            if _LITERALS[word] != word:
+                fix("python_literal")
+        elif _NUMBER.fullmatch(word):
+            out.append(word)
+        else:
+            out.append(json.dumps(word))
+            fix("bare_string")
+        last = "value"
+        i += len(word)
+    # Truncated: close what is still open.
+    fix("truncated")
+    if quote:
+        out.append('"')
+        last = "value"
+    if last == "comma":
+        _drop_last(out, ",")
+    elif last == "colon":
+        out.append("null")
+    out.extend(reversed(stack))
+    return "".join(out), fixes
+
+
+def _drop_last(out: list, token: str) -> None:
+    for index in range(len(out) - 1, -1, -1):
+        if out[index] == token:
+            del out[index]
+            return
+
+
+class StructuredStats:
+    """Outcomes of the answers of one ``StructuredLlm``."""
+
+    def __init__(self):
+        self.requests = 0
+        self.clean = 0
+        self.repaired_locally = 0
+        self.repaired_by_model = 0
+        self.failed = 0
+        self.cut_off = 0
+        self.repair_calls = 0
+        self.fixes = {}
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "clean": self.clean,
+            "repaired_locally": self.repaired_locally,
+            "repaired_by_model": self.repaired_by_model,
+            "failed": self.failed,
+            "cut_off": self.cut_off,
+            "repair_calls": self.repair_calls,
+            "fixes": dict(self.fixes),
+        }
+
+
+class StructuredLlm(BaseLlm):
+    """Wraps ``inner`` so its text answers are validated, and repaired, against ``output_schema``.
+
+    Attributes:
+        inner: The model, as a name (resolved through the ADK registry) or a ``BaseLlm``.
+        output_schema: Pydantic model of the expected object. Fields with a
+            default may be left out by the model; extra fields are kept as is.
+        cut_off: Stream from the model even when the agent does not, and stop
+            reading once the object is complete.
+        max_repair_calls: Model calls allowed to regenerate broken fields per answer.
+    """
+
+    model: str = ""
+    inner: Union[str, BaseLlm]
+    output_schema: type[BaseModel]
+    cut_off: bool = True
+    max_repair_calls: int = 1
+
+    _llm: BaseLlm = PrivateAttr(default=None)
+    _adapters: dict = PrivateAttr(default_factory=dict)
+    _stats: StructuredStats = PrivateAttr(default_factory=StructuredStats)
+
+    def model_post_init(self, __context) -> None:
+        self._llm = LLMRegistry.new_llm(self.inner) if isinstance(self.inner, str) else self.inner
+        self._adapters = {
+            name: TypeAdapter(info.annotation) for name, info in self.output_schema.model_fields.items()
+        }
+        if not self.model:
+            # Built-in tools set the request up by model name, so present the wrapped model's.
+            self.model = self._llm.model
+
+    @property
+    def stats(self) -> StructuredStats:
+        return self._stats
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        stats = self._stats
+        stats.requests += 1
+        request = llm_request.model_copy(update={"model": self._llm.model})
+        if not request.config.tools and not request.config.response_mime_type:
+            # Without tools Gemini can be held to JSON; with them it cannot.
+            request.config = request.config.model_copy(update={"response_mime_type": "application/json"})
+        parser = JsonStreamParser()
+        template = None
+        early_task = None
+        try:
+            responses = self._llm.generate_content_async(request, stream=stream or self.cut_off)
+            try:
+                async for response in responses:
+                    if response.error_code or _has_function_call(response):
+                        yield response
+                        return
+                    text = _text(response)
+                    template = response
+                    if not response.partial:
+                        # The final response repeats the streamed text when there was any.
+                        if text.startswith(parser.text):
+                            text = text[len(parser.text):]
+                        else:
+                            parser = JsonStreamParser()
+                    for key, raw in parser.feed(text):
+                        if early_task is None and self.max_repair_calls and self._check_field(key, raw) is None:
+                            # Broken while the rest still streams: repair it alongside.
+                            early_task = asyncio.create_task(self._repair_call(llm_request, parser.text, [key]))
+                    if response.partial and stream:
+                        yield response
+                    if parser.done and self.cut_off:
+                        stats.cut_off += response.partial is True
+                        break
+            finally:
+                await responses.aclose()
+            if template is None:
+                return
+            async for response in self._finish(llm_request, parser, template, early_task):
+                yield response
+        finally:
+            if early_task is not None and not early_task.done():
+                early_task.cancel()
+
+    async def _finish(self, llm_request, parser, template, early_task) -> AsyncGenerator[LlmResponse, None]:
+        stats = self._stats
+        parsed = ParsedOutput(None)
+        if parser.done:
+            try:
+                parsed = ParsedOutput(json.loads(parser.object_text))
+            except ValueError:
+                pass
+        if parsed.value is None:
+            parsed = repair_json(parser.text)
+            open_key = parser.open_key
+            if parsed.value is not None and open_key is not None and open_key not in parsed.broken:
+                # Closed by the repair, but its value was cut by the end of the stream.
+                parsed.broken.append(open_key)
+                parsed.value.pop(open_key, None)
+        for name in parsed.fixes:
+            stats.fixes[name] = stats.fixes.get(name, 0) + 1
+        if parsed.value is None:
+            stats.failed += 1
+            yield template.model_copy(update={"partial": False})
+            return
+
+        value, broken = self._validate(parsed.value, parsed.broken)
+        calls = 0
+        if early_task is not None:
+            calls += 1
+            value.update(await early_task)
+            broken = [key for key in broken if key not in value]
+        if broken and calls < self.max_repair_calls:
+            calls += 1
+            value.update(await self._repair_call(llm_request, parser.text, broken))
+        stats.repair_calls += calls
+        missing = [name for name, info in self.output_schema.model_fields.items() if info.is_required() and name not in value]
+        if missing:
+            stats.failed += 1
+        elif calls:
+            stats.repaired_by_model += 1
+        elif parsed.fixes or parsed.broken or parsed.value != value:
+            stats.repaired_locally += 1
+        else:
+            stats.clean += 1
+        text = json.dumps(value, ensure_ascii=False)
+        yield template.model_copy(
+            update={"content": types.Content(role="model", parts=[types.Part(text=text)]), "partial": False}
+        )
+
+    def _check_field(self, key: str, raw: str):
+        """The field's value decoded and validated, or ``None`` if it is broken (unknown keys pass)."""
+        try:
+            item = json.loads(raw)
+        except ValueError:
+            return _KEEP  # A syntax slip: left to ``repair_json``, which needs no model.
+        return item if key not in self._adapters else self._coerce(key, item)
+
+    def _coerce(self, key: str, item):
+        adapter = self._adapters[key]
+        candidates = [item]
+        if isinstance(item, str):
+            candidates.append([item])
+        elif isinstance(item, list):
+            candidates.append("\n".join(str(element) for element in item))
+        for candidate in candidates:
+            try:
+                return adapter.dump_python(adapter.validate_python(candidate), mode="json")
+            except ValidationError:
+                continue
+        return None
+
+    def _validate(self, value: dict, broken: list) -> tuple:
+        result, broken = {}, list(broken)
+        for key, item in value.items():
+            if key not in self._adapters:
+                result[key] = item
+                continue
+            coerced = self._coerce(key, item)
+            if coerced is None:
+                broken.append(key)
+            else:
+                result[key] = coerced
+        for name, info in self.output_schema.model_fields.items():
+            if info.is_required() and name not in result and name not in broken:
+                broken.append(name)
+        return result, [key for key in broken if key in self._adapters]
+
+    async def _repair_call(self, llm_request: LlmRequest, answer: str, fields: list) -> dict:
+        """Asks the model again for ``fields`` only; returns those that came back valid."""
+        fields = [key for key in fields if key in self._adapters]
+        if not fields:
+            return {}
+        schema_fields = self.output_schema.model_fields
+        subset = create_model(
+            f"{self.output_schema.__name__}Repair", **{key: (schema_fields[key].annotation, ...) for key in fields}
+        )
+        template = json.dumps({key: _example(schema_fields[key].annotation) for key in fields}, ensure_ascii=False)
+        prompt = REPAIR_PROMPT.format(fields=", ".join(fields), template=template)
+        request = LlmRequest(
+            model=self._llm.model,
+            contents=list(llm_request.contents)
+            + [
+                types.Content(role="model", parts=[types.Part(text=answer)]),
+                types.Content(role="user", parts=[types.Part(text=prompt)]),
+            ],
+            config=types.GenerateContentConfig(
+                system_instruction=llm_request.config.system_instruction,
+                response_mime_type="application/json",
+                response_schema=subset,
+            ),
+        )
+        text = ""
+        async for response in self._llm.generate_content_async(request):
+            if not response.partial:
+                text = _text(response)
+        parsed = repair_json(text)
+        fixed = {}
+        for key in fields:
+            if parsed.value and key in parsed.value:
+                coerced = self._coerce(key, parsed.value[key])
+                if coerced is not None:
+                    fixed[key] = coerced
+        return fixed
+
+
+def structured_model(model: Union[str, BaseLlm], output_schema: type[BaseModel], **kwargs) -> Union[StructuredLlm, str, BaseLlm]:
+    """``model`` wrapped in a ``StructuredLlm``, or as is when ``STRUCTURED_OUTPUT=off``."""
+    if os.getenv("STRUCTURED_OUTPUT", "").lower() == "off":
+        return model
+    return StructuredLlm(inner=model, output_schema=output_schema, **kwargs)
+
+
+_KEEP = object()
+
+
+def _example(annotation):
+    return ["..."] if get_origin(annotation) is list or annotation is list else "..."
+
+
+def _has_function_call(response: LlmResponse) -> bool:
+    parts = response.content.parts if response.content and response.content.parts else []
+    return any(part.function_call for part in parts)
+
+
+def _text(response: LlmResponse) -> str:
+    parts = response.content.parts if response.content and response.content.parts else []
+    return "".join(part.text or "" for part in parts if not part.thought)
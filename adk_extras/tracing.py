@@ -0,0 +1,481 @@
+"""
+Low-overhead tracing of agent runs through the ADK callbacks.
+
+``instrument(agent, tracer)`` adds before/after agent, model and tool
+callbacks to an agent tree. Each callback pair records a span with
+monotonic timings, the agent it ran under, token counts from the model's
+usage metadata and payload sizes (characters of text, arguments and
+responses). Spans are grouped by run (the invocation id). Open agent and
+model spans are keyed by run, branch and agent name, and agent spans nest
+under their parent agent's span: ``ParallelAgent`` steps each sub-agent in a
+new task with a copied context, so a context variable set in one step is
+gone in the next.
+
+A run aggregates into a per-span-name summary with self and total time, or
+folded stacks for flame graphs (``flamegraph.pl``, speedscope). The tracer
+also keeps running totals for a Prometheus text export and can append the
+spans to a file in OTLP/JSON.
+
+Tracing is off unless ``ADK_TRACE`` is set: ``default_tracer()`` then
+returns ``None`` and ``instrument`` leaves the agents untouched, so disabled
+tracing costs nothing.
+"""
+import contextvars
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, Optional
+
+# Only for annotations: agent modules create their tracer at import time, before ADK is loaded
+if TYPE_CHECKING:
+    from google.adk.agents.callback_context import CallbackContext
+    from google.adk.models.llm_request import LlmRequest
+    from google.adk.models.llm_response import LlmResponse
+
+DEFAULT_MAX_RUNS = 256
+DEFAULT_OTLP_BATCH = 64
+NO_RUN = "-"
+
+AGENT = "agent"
+MODEL = "model"
+TOOL = "tool"
+SESSION = "session"
+
+_current = contextvars.ContextVar("adk_trace_span", default=None)
+
+
+class Span:
+    """One timed operation: an agent run, a model call, a tool call or session I/O."""
+
+    __slots__ = (
+        "kind", "name", "agent", "run_id", "parent", "start_ns", "end_ns", "first_ns", "child_ns",
+        "input_tokens", "output_tokens", "request_chars", "response_chars", "error",
+    )
+
+    def __init__(self, kind: str, name: str, agent: str, run_id: str, parent: Optional["Span"], start_ns: int):
+        self.kind = kind
+        self.name = name
+        self.agent = agent
+        self.run_id = run_id
+        self.parent = parent
+        self.start_ns = start_ns
+        self.end_ns = None
+        self.first_ns = None
+        self.child_ns = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.request_chars = 0
+        self.response_chars = 0
+        self.error = False
+
+    @property
+    def duration_ns(self) -> int:
+        return (self.end_ns or self.start_ns) - self.start_ns
+
+    @property
+    def self_ns(self) -> int:
+        """Time outside nested spans; parallel children overlap, so it is floored at zero."""
+        return max(self.duration_ns - self.child_ns, 0)
+
+    @property
+    def label(self) -> str:
+        return self.name if self.kind == AGENT else f"{self.kind}:{self.name}"
+
+    def path(self) -> list:
+        """Labels from the outermost span down to this one."""
+        labels = []
+        span = self
+        while span is not None:
+            labels.append(span.label)
+            span = span.parent
+        labels.reverse()
+        return labels
+
+
+class _Totals:
+    __slots__ = ("count", "errors", "duration_ns", "input_tokens", "output_tokens", "request_chars", "response_chars")
+
+    def __init__(self):
+        self.count = self.errors = self.duration_ns = 0
+        self.input_tokens = self.output_tokens = self.request_chars = self.response_chars = 0
+
+
+class RunTrace:
+    """The finished spans of one run, in the order they ended."""
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.spans = []
+
+    def summary(self) -> list:
+        """Rows per (kind, name) with calls, total and self milliseconds, tokens and sizes, slowest first.
+
+        Self time excludes nested spans, so it adds up across rows without double counting.
+        """
+        rows = {}
+        for span in self.spans:
+            row = rows.get((span.kind, span.name))
+            if row is None:
+                row = rows[(span.kind, span.name)] = {
+                    "kind": span.kind, "name": span.name, "calls": 0, "errors": 0, "total_ms": 0.0, "self_ms": 0.0,
+                    "input_tokens": 0, "output_tokens": 0, "request_chars": 0, "response_chars": 0,
+                }
+            row["calls"] += 1
+            row["errors"] += span.error
+            row["total_ms"] += span.duration_ns / 1e6
+            row["self_ms"] += span.self_ns / 1e6
+            row["input_tokens"] += span.input_tokens
+            row["output_tokens"] += span.output_tokens
+            row["request_chars"] += span.request_chars
+            row["response_chars"] += span.response_chars
+        return sorted(rows.values(), key=lambda row: row["self_ms"], reverse=True)
+
+    def folded(self) -> str:
+        """Folded stacks (``a;b;c <microseconds>``) of self time, the input format of flame graph tools."""
+        stacks = {}
+        for span in self.spans:
+            key = ";".join(span.path())
+            stacks[key] = stacks.get(key, 0) + span.self_ns // 1000
+        return "".join(f"{stack} {micros}\n" for stack, micros in stacks.items())
+
+    def wall_ms(self) -> float:
+        """Duration of the outermost spans together."""
+        return sum(span.duration_ns for span in self.spans if span.parent is None) / 1e6
+
+
+class Tracer:
+    """Collects spans from instrumented agents.
+
+    Args:
+        max_runs: Finished runs kept in memory; the oldest are dropped.
+        otlp_path: If set, finished runs are appended to this file in OTLP/JSON,
+            one ``ExportTraceServiceRequest`` per line.
+        otlp_batch: Runs per write to ``otlp_path``; ``flush()`` writes the rest.
+        service_name: ``service.name`` resource attribute of the OTLP export.
+    """
+
+    def __init__(
+        self,
+        max_runs: int = DEFAULT_MAX_RUNS,
+        otlp_path: str = None,
+        otlp_batch: int = DEFAULT_OTLP_BATCH,
+        service_name: str = "adk-agents",
+    ):
+        self.max_runs = max_runs
+        self.otlp_path = otlp_path
+        self.otlp_batch = otlp_batch
+        self.service_name = service_name
+        self.runs = OrderedDict()
+        self.totals = {}
+        self._agents = {}  # (run, branch, agent) -> open agent span
+        self._models = {}  # (run, branch, agent) -> open model span
+        self._tools = {}  # function call id -> open tool span
+        self._unexported = []
+        # Monotonic clock for durations, anchored to the wall clock for exports.
+        self._epoch_ns = time.time_ns() - time.perf_counter_ns()
+
+    def run(self, run_id: str) -> Optional[RunTrace]:
+        return self.runs.get(run_id)
+
+    def start(self, kind: str, name: str, agent: str = "", run_id: str = None, parent: Span = None) -> Span:
+        """Opens a span under ``parent`` or else the current one; ``run_id`` defaults to the parent's run."""
+        if parent is None:
+            parent = _current.get()
+        if run_id is None:
+            run_id = parent.run_id if parent is not None else NO_RUN
+        return Span(kind, name, agent or (parent.agent if parent is not None else ""), run_id, parent, time.perf_counter_ns())
+
+    def end(self, span: Span, error: bool = False):
+        span.end_ns = time.perf_counter_ns()
+        span.error = error
+        duration = span.end_ns - span.start_ns
+        if span.parent is not None:
+            span.parent.child_ns += duration
+        trace = self.runs.get(span.run_id)
+        if trace is None:
+            trace = self.runs[span.run_id] = RunTrace(span.run_id)
+            while len(self.runs) > self.max_runs:
+                self.runs.popitem(last=False)
+        trace.spans.append(span)
+        totals = self.totals.get((span.kind, span.name, span.agent))
+        if totals is None:
+            totals = self.totals[(span.kind, span.name, span.agent)] = _Totals()
+        totals.count += 1
+        totals.errors += error
+        totals.duration_ns += duration
+        totals.input_tokens += span.input_tokens
+        totals.output_tokens += span.output_tokens
+        totals.request_chars += span.request_chars
+        totals.response_chars += span.response_chars
+        if span.kind == AGENT and span.parent is None and self.otlp_path:
+            # Serializing is the costly part of tracing; batching keeps it off most turns.
+            self._unexported.append(span.run_id)
+            if len(self._unexported) >= self.otlp_batch:
+                self.flush()
+
+    def flush(self):
+        """Writes the runs not yet exported to ``otlp_path``."""
+        if self._unexported and self.otlp_path:
+            run_ids, self._unexported = self._unexported, []
+            self.export_otlp(self.otlp_path, run_ids)
+
+    @contextmanager
+    def span(self, kind: str, name: str, run_id: str = None) -> Iterator[Span]:
+        """Times a block of code as a span, e.g. session I/O outside the callbacks."""
+        span = self.start(kind, name, run_id=run_id)
+        try:
+            yield span
+        except BaseException:
+            self.end(span, error=True)
+            raise
+        self.end(span)
+
+    # Callbacks
+
+    def before_agent_callback(self, callback_context: "CallbackContext"):
+        span = self.start(
+            AGENT, callback_context.agent_name, callback_context.agent_name, callback_context.invocation_id,
+            parent=self._parent_agent(callback_context),
+        )
+        self._agents[_key(callback_context)] = span
+        _current.set(span)
+
+    def after_agent_callback(self, callback_context: "CallbackContext"):
+        span = self._agents.pop(_key(callback_context), None)
+        if span is None:
+            return
+        if _current.get() is span:
+            _current.set(span.parent)
+        self.end(span)
+        if span.parent is None:
+            # End of the run: drops spans of sub-agents that never reached their after-callback (e.g. cancelled).
+            run_id = span.run_id
+            for spans in (self._agents, self._models):
+                for key in [key for key in spans if key[0] == run_id]:
+                    del spans[key]
+
+    def before_model_callback(self, callback_context: "CallbackContext", llm_request: "LlmRequest"):
+        key = _key(callback_context)
+        span = self.start(
+            MODEL, llm_request.model or "", callback_context.agent_name, callback_context.invocation_id,
+            parent=self._agents.get(key),
+        )
+        instruction = llm_request.config.system_instruction if llm_request.config else None
+        chars = len(instruction) if isinstance(instruction, str) else 0
+        for content in llm_request.contents:
+            for part in content.parts or ():
+                if part.text:
+                    chars += len(part.text)
+        span.request_chars = chars
+        self._models[key] = span
+
+    def after_model_callback(self, callback_context: "CallbackContext", llm_response: "LlmResponse"):
+        key = _key(callback_context)
+        span = self._models.get(key)
+        if span is None:
+            return
+        if span.first_ns is None:
+            span.first_ns = time.perf_counter_ns()
+        if llm_response.content and llm_response.content.parts:
+            for part in llm_response.content.parts:
+                if part.text:
+                    span.response_chars += len(part.text)
+        if llm_response.partial:
+            return
+        usage = llm_response.usage_metadata
+        if usage is not None:
+            span.input_tokens = usage.prompt_token_count or 0
+            span.output_tokens = usage.candidates_token_count or 0
+        del self._models[key]
+        self.end(span, error=bool(llm_response.error_code))
+
+    def before_tool_callback(self, tool, args: dict, tool_context):
+        span = self.start(
+            TOOL, tool.name, tool_context.agent_name, tool_context.invocation_id, parent=self._agents.get(_key(tool_context))
+        )
+        span.request_chars = len(str(args)) if args else 0
+        self._tools[tool_context.function_call_id] = span
+
+    def after_tool_callback(self, tool, args: dict, tool_context, tool_response):
+        span = self._tools.pop(tool_context.function_call_id, None)
+        if span is None:
+            return
+        span.response_chars = len(str(tool_response)) if tool_response is not None else 0
+        self.end(span, error=isinstance(tool_response, dict) and "error" in tool_response)
+
+    def _parent_agent(self, callback_context: "CallbackContext") -> Optional[Span]:
+        """Open span of the agent's parent, or ``None`` to nest under the current span.
+
+        Sequential, loop and LLM sub-agents keep their parent's branch; a
+        ``ParallelAgent`` appends ``.<parallel>.<sub-agent>`` to it.
+        """
+        parent = callback_context._invocation_context.agent.parent_agent
+        if parent is None:
+            return None
+        run_id, branch, name = _key(callback_context)
+        span = self._agents.get((run_id, branch, parent.name))
+        suffix = f"{parent.name}.{name}"
+        if span is None and branch and (branch == suffix or branch.endswith("." + suffix)):
+            span = self._agents.get((run_id, branch[:-len(suffix)].rstrip(".") or None, parent.name))
+        return span
+
+    # Exports
+
+    def prometheus(self, prefix: str = "adk") -> str:
+        """Running totals in the Prometheus text exposition format."""
+        metrics = (
+            ("span_seconds_total", "counter", "Time spent in spans.", lambda t: t.duration_ns / 1e9),
+            ("span_calls_total", "counter", "Finished spans.", lambda t: t.count),
+            ("span_errors_total", "counter", "Spans that ended with an error.", lambda t: t.errors),
+            ("input_tokens_total", "counter", "Prompt tokens reported by the model.", lambda t: t.input_tokens),
+            ("output_tokens_total", "counter", "Output tokens reported by the model.", lambda t: t.output_tokens),
+            ("request_chars_total", "counter", "Characters sent to models and tools.", lambda t: t.request_chars),
+            ("response_chars_total", "counter", "Characters received from models and tools.", lambda t: t.response_chars),
+        )
+        lines = []
+        for name, kind, help_text, value in metrics:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for (span_kind, span_name, agent), totals in self.totals.items():
+                labels = f'kind="{span_kind}",name="{_escape(span_name)}",agent="{_escape(agent)}"'
+                lines.append(f"{prefix}_{name}{{{labels}}} {value(totals)}")
+        return "\n".join(lines) + "\n"
+
+    def export_otlp(self, path: str, run_ids: list = None):
+        """Appends runs (all kept runs by default) to ``path`` as one OTLP/JSON ``ExportTraceServiceRequest`` line."""
+        spans = []
+        for run_id in self.runs if run_ids is None else run_ids:
+            trace = self.runs.get(run_id)
+            if trace is not None:
+                spans.extend(self._otlp_spans(trace))
+        if not spans:
+            return
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{"scope": {"name": "adk_extras.tracing"}, "spans": spans}],
+            }]
+        }
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(request, separators=(",", ":")) + "\n")
+
+    def _otlp_spans(self, trace: RunTrace) -> list:
+        trace_id = hashlib.md5(trace.run_id.encode("utf-8")).hexdigest()
+        ids = {id(span): f"{index + 1:016x}" for index, span in enumerate(trace.spans)}
+        spans = []
+        for span in trace.spans:
+            attributes = [
+                _attribute("adk.kind", span.kind),
+                _attribute("adk.agent", span.agent),
+                _attribute("adk.request_chars", span.request_chars),
+                _attribute("adk.response_chars", span.response_chars),
+            ]
+            if span.kind == MODEL:
+                attributes.append(_attribute("gen_ai.usage.input_tokens", span.input_tokens))
+                attributes.append(_attribute("gen_ai.usage.output_tokens", span.output_tokens))
+            record = {
+                "traceId": trace_id,
+                "spanId": ids[id(span)],
+                "name": span.label,
+                "kind": 1,
+                "startTimeUnixNano": str(self._epoch_ns + span.start_ns),
+                "endTimeUnixNano": str(self._epoch_ns + span.end_ns),
+                "attributes": attributes,
+                "status": {"code": 2 if span.error else 1},
+            }
+            if span.parent is not None and id(span.parent) in ids:
+                record["parentSpanId"] = ids[id(span.parent)]
+            spans.append(record)
+        return spans
+
+
+def instrument(agent, tracer: Optional[Tracer]):
+    """Adds the tracer's callbacks to ``agent`` and all its sub-agents; a ``None`` tracer is a no-op.
+
+    Before-callbacks run last and after-callbacks first, so a callback that
+    short-circuits the model (like the semantic cache) is not counted as a
+    model call, and the timings exclude the other callbacks.
+    """
+    if tracer is None:
+        return agent
+    _add(agent, "before_agent_callback", tracer.before_agent_callback, first=True)
+    _add(agent, "after_agent_callback", tracer.after_agent_callback, first=False)
+    if hasattr(agent, "before_model_callback"):
+        _add(agent, "before_model_callback", tracer.before_model_callback, first=False)
+        _add(agent, "after_model_callback", tracer.after_model_callback, first=True)
+        _add(agent, "before_tool_callback", tracer.before_tool_callback, first=False)
+        _add(agent, "after_tool_callback", tracer.after_tool_callback, first=True)
+    for sub_agent in agent.sub_agents:
+        instrument(sub_agent, tracer)
+    return agent
+
+
+def trace_session_service(service, tracer: Optional[Tracer]):
+    """Times ``append_event`` (in the event's run) and ``get_session`` / ``create_session`` of a session service."""
+    if tracer is None:
+        return service
+    append_event = service.append_event
+
+    async def traced_append_event(session, event):
+        span = tracer.start(SESSION, "append_event", run_id=event.invocation_id or NO_RUN)
+        try:
+            result = await append_event(session=session, event=event)
+        except BaseException:
+            tracer.end(span, error=True)
+            raise
+        tracer.end(span)
+        return result
+
+    service.append_event = traced_append_event
+    for name in ("get_session", "create_session"):
+        setattr(service, name, _traced_call(tracer, name, getattr(service, name)))
+    return service
+
+
+def default_tracer() -> Optional[Tracer]:
+    """A tracer when ``ADK_TRACE`` is set, else ``None`` (tracing disabled).
+
+    ``ADK_TRACE_OTLP`` names a file that receives each run in OTLP/JSON.
+    """
+    if not os.getenv("ADK_TRACE"):
+        return None
+    return Tracer(otlp_path=os.getenv("ADK_TRACE_OTLP") or None)
+
+
+def _traced_call(tracer: Tracer, name: str, method):
+    async def traced(**kwargs):
+        span = tracer.start(SESSION, name)
+        try:
+            result = await method(**kwargs)
+        except BaseException:
+            tracer.end(span, error=True)
+            raise
+        tracer.end(span)
+        return result
+
+    return traced
+
+
+def _key(callback_context: "CallbackContext") -> tuple:
+    return callback_context.invocation_id, callback_context._invocation_context.branch, callback_context.agent_name
+
+
+def _add(agent, field: str, callback, first: bool):
+    existing = getattr(agent, field)
+    callbacks = [] if existing is None else list(existing) if isinstance(existing, list) else [existing]
+    if callback in callbacks:
+        return
+    setattr(agent, field, [callback, *callbacks] if first else [*callbacks, callback])
+
+
+def _attribute(key: str, value) -> dict:
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
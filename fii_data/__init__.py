@@ -0,0 +1,5 @@
+from .cache import QuoteCache, default_cache
+from .market_data import MarketDataEngine, YFinanceBackend, shared_engine
+from .records import FiiQuote
+from .tickers import extract_tickers, is_ticker_list, normalize_tickers
+from .tools import compare_fiis, get_fii_data, get_fii_history, quotes_to_response
@@ -0,0 +1,171 @@
+"""
+Vectorized comparison metrics across many FIIs.
+
+Every metric is computed for all funds at once from column arrays, so the report
+agent can narrate deterministic numbers instead of deriving them from raw data.
+"""
+import warnings
+
+import numpy as np
+
+DEFAULT_WINDOW = 60
+SHORT_MA = 20
+LONG_MA = 50
+# Fundos com menos retornos válidos que isso ficam fora das correlações.
+MIN_RETURNS = 3
+
+COLUMNS = (
+    "ticker",
+    "yield_rank",
+    "dividend_yield",
+    "yield_zscore",
+    "intraday_range_pct",
+    "vs_ma20_pct",
+    "vs_ma50_pct",
+    "price_zscore",
+    "mean_correlation",
+    "closest_peer",
+)
+
+
+def closes_matrix(series: list, window: int = DEFAULT_WINDOW) -> np.ndarray:
+    """
+    Stacks the last ``window`` closes of each fund into an ``(n_funds, window)`` matrix.
+
+    Shorter series are left-padded with NaN so every row ends on the latest bar.
+    """
+    matrix = np.full((len(series), window), np.nan)
+    for row, closes in enumerate(series):
+        tail = np.asarray(closes, dtype="f8")[-window:]
+        if len(tail):
+            matrix[row, window - len(tail):] = tail
+    return matrix
+
+
+def compare(tickers: list, price, high, low, dividend_yield, closes: np.ndarray) -> dict:
+    """
+    Computes the comparison table in a single pass over column arrays.
+
+    Args:
+        tickers: Fund tickers, one per row.
+        price, high, low, dividend_yield: Latest quote columns, aligned with ``tickers``.
+        closes: ``(n_funds, window)`` matrix of recent closes from :func:`closes_matrix`.
+
+    Returns:
+        Dictionary with ``columns`` and ``rows`` (one list per fund, ordered by
+        yield rank) plus the number of funds compared.
+    """
+    price = np.asarray(price, dtype="f8")
+    high = np.asarray(high, dtype="f8")
+    low = np.asarray(low, dtype="f8")
+    dividend_yield = np.nan_to_num(np.asarray(dividend_yield, dtype="f8"))
+    n = len(tickers)
+    if not n:
+        return {"columns": list(COLUMNS), "rows": [], "funds": 0}
+
+    order = np.argsort(-dividend_yield, kind="stable")
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(1, n + 1)
+    yield_z = _zscore(dividend_yield)
+
+    # Fundos sem histórico geram NaN nas métricas de janela em vez de erro.
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        intraday_range = (high - low) / price * 100
+        ma_short = np.nanmean(closes[:, -SHORT_MA:], axis=1)
+        ma_long = np.nanmean(closes[:, -LONG_MA:], axis=1)
+        vs_short = (price / ma_short - 1) * 100
+        vs_long = (price / ma_long - 1) * 100
+        price_z = (price - np.nanmean(closes, axis=1)) / np.nanstd(closes, axis=1)
+        mean_corr, peer = _correlations(closes)
+
+    rows = [
+        [
+            tickers[i],
+            int(rank[i]),
+            _round(dividend_yield[i]),
+            _round(yield_z[i]),
+            _round(intraday_range[i]),
+            _round(vs_short[i]),
+            _round(vs_long[i]),
+            _round(price_z[i]),
+            _round(mean_corr[i]),
+            tickers[peer[i]] if peer[i] >= 0 else None,
+        ]
+        for i in order
+    ]
+    return {"columns": list(COLUMNS), "rows": rows, "funds": n}
+
+
+def _zscore(values: np.ndarray) -> np.ndarray:
+    if not len(values):
+        return values
+    std = values.std()
+    return (values - values.mean()) / std if std > 0 else np.zeros_like(values)
+
+
+def _correlations(closes: np.ndarray):
+    """
+    Mean pairwise correlation of daily returns and the most correlated peer of each fund.
+
+    Each pair is correlated over the days both funds have returns (pairwise-complete
+    observations); funds or pairs with fewer than ``MIN_RETURNS`` such days get NaN
+    and take no part in the other funds' means.
+    """
+    n = closes.shape[0]
+    if n < 2 or closes.shape[1] < MIN_RETURNS + 1:
+        return np.full(n, np.nan), np.full(n, -1)
+
+    returns = np.diff(np.log(closes), axis=1)
+    valid = ~np.isnan(returns)
+    valid[valid.sum(axis=1) < MIN_RETURNS] = False
+    rows = np.flatnonzero(valid.any(axis=1))
+    mean_corr, peer = np.full(n, np.nan), np.full(n, -1)
+    if len(rows) < 2:
+        return mean_corr, peer
+    if valid[rows].all():
+        corr = _complete_corr(returns[rows])
+    else:
+        corr = _pairwise_corr(returns[rows], valid[rows])
+    np.fill_diagonal(corr, np.nan)
+
+    paired = ~np.isnan(corr)
+    pairs = paired.sum(axis=1)
+    corr[~paired] = 0.0
+    mean_corr[rows] = np.where(pairs > 0, corr.sum(axis=1) / np.maximum(pairs, 1), np.nan)
+    corr[~paired] = -np.inf
+    peer[rows] = np.where(pairs > 0, rows[corr.argmax(axis=1)], -1)
+    return mean_corr, peer
+
+
+def _complete_corr(returns: np.ndarray) -> np.ndarray:
+    """Correlation matrix of rows without gaps: a single product of normalized rows."""
+    returns = returns - returns.mean(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        normalized = returns / np.linalg.norm(returns, axis=1)[:, None]
+    return normalized @ normalized.T
+
+
+def _pairwise_corr(returns: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Correlation matrix over the days each pair of rows has in common."""
+    mask = valid.astype("f8")
+    returns = np.where(valid, returns, 0.0)
+    # Centrar cada linha não muda a correlação e deixa as somas abaixo estáveis.
+    means = returns.sum(axis=1, keepdims=True) / np.maximum(mask.sum(axis=1, keepdims=True), 1)
+    returns = (returns - means) * mask
+
+    # Somas sobre os dias em comum de cada par (i, j), todas como produtos de matrizes.
+    count = mask @ mask.T
+    paired_days = np.maximum(count, 1)  # pares sem dias em comum são descartados abaixo
+    sums = returns @ mask.T  # soma de r_i nos dias em que j também tem retorno
+    squares = (returns * returns) @ mask.T
+    covariance = returns @ returns.T - sums * sums.T / paired_days
+    variance = squares - sums * sums / paired_days
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = covariance / np.sqrt(variance * variance.T)
+    corr[count < MIN_RETURNS] = np.nan
+    return corr
+
+
+def _round(value, digits: int = 4):
+    return None if np.isnan(value) else round(float(value), digits)
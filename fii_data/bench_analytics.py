@@ -0,0 +1,50 @@
+"""
+Benchmark: comparison metrics for thousands of funds in one vectorized pass.
+
+    python -m fii_data.bench_analytics --funds 1000,5000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from fii_data.analytics import DEFAULT_WINDOW, closes_matrix, compare
+
+
+def synthetic(funds: int, days: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.006, days)
+    returns = market + rng.normal(0, 0.01, (funds, days))
+    closes = 100 * np.exp(np.cumsum(returns, axis=1))
+    price = closes[:, -1]
+    high = price * (1 + rng.uniform(0, 0.02, funds))
+    low = price * (1 - rng.uniform(0, 0.02, funds))
+    dividend_yield = rng.uniform(0.05, 0.15, funds)
+    tickers = [f"FII{i:05d}11" for i in range(funds)]
+    return tickers, price, high, low, dividend_yield, list(closes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--funds", default="10,100,1000,2000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'funds':>6} {'matrix (ms)':>12} {'compare (ms)':>13}")
+    for funds in (int(f) for f in args.funds.split(",")):
+        tickers, price, high, low, dividend_yield, series = synthetic(funds, 252)
+        best_matrix = best_compare = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            closes = closes_matrix(series, DEFAULT_WINDOW)
+            t1 = time.perf_counter()
+            table = compare(tickers, price, high, low, dividend_yield, closes)
+            t2 = time.perf_counter()
+            best_matrix = min(best_matrix, t1 - t0)
+            best_compare = min(best_compare, t2 - t1)
+        assert table["funds"] == funds
+        print(f"{funds:>6} {best_matrix * 1e3:>12.2f} {best_compare * 1e3:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: reading a year of daily bars for many funds from a warm HistoryStore.
+
+Fills a temporary store through a fake backend, then measures range reads and
+weekly resampling with the backend disabled, so any network access would fail:
+
+    python -m fii_data.bench_history --funds 100
+"""
+import argparse
+import datetime as dt
+import tempfile
+import time
+
+import numpy as np
+
+from fii_data.history import BAR_DTYPE, DIVIDEND_DTYPE, HistoryStore, from_day, resample, to_day
+
+
+class FakeHistoryBackend:
+    """Generates a deterministic random walk per symbol, counting every call."""
+
+    def __init__(self, until: str):
+        self.until = to_day(until)
+        self.calls = 0
+
+    def history(self, symbols: list, start: str) -> dict:
+        self.calls += 1
+        days = np.arange(to_day(start), self.until + 1, dtype="<i4")
+        days = days[(days + 3) % 7 < 5]  # dias úteis
+        result = {}
+        for i, symbol in enumerate(symbols):
+            rng = np.random.default_rng(i)
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(days))))
+            bars = np.empty(len(days), dtype=BAR_DTYPE)
+            bars["day"] = days
+            bars["open"] = close * 0.999
+            bars["high"] = close * 1.01
+            bars["low"] = close * 0.99
+            bars["close"] = close
+            bars["volume"] = 1e5
+            dividends = np.empty(len(days[::21]), dtype=DIVIDEND_DTYPE)
+            dividends["day"] = days[::21]
+            dividends["amount"] = 0.8
+            result[symbol] = (bars, dividends)
+        return result
+
+
+class OfflineBackend:
+    def history(self, symbols: list, start: str) -> dict:
+        raise RuntimeError("network access on a warm store")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--funds", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tickers = [f"FII{i:03d}11" for i in range(args.funds)]
+    end = dt.date.today().isoformat()
+    start = from_day(to_day(end) - 365)
+
+    with tempfile.TemporaryDirectory() as root:
+        backend = FakeHistoryBackend(until=from_day(to_day(end) - 90))
+        store = HistoryStore(root, backend=backend)
+        store.refresh(tickers, max_age=0)
+        backend.until = to_day(end)
+        t0 = time.perf_counter()
+        store.refresh(tickers, max_age=0)
+        tail = time.perf_counter() - t0
+        print(f"incremental tail refresh: {tail * 1e3:.1f} ms, backend calls: {backend.calls}")
+
+        store.backend = OfflineBackend()
+        store.refresh(tickers)
+
+        timings = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            bars = store.read_many(tickers, start, end)
+            weekly = [resample(b, "W") for b in bars.values()]
+            timings.append(time.perf_counter() - t0)
+
+        total_bars = sum(len(b) for b in bars.values())
+        print(f"funds: {args.funds}, bars read: {total_bars}, weekly bars: {sum(len(w) for w in weekly)}")
+        print(f"read + resample: min {min(timings) * 1e3:.2f} ms, median {sorted(timings)[len(timings) // 2] * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: wall time vs. ticker count for the old per-ticker loop and the batched engine.
+
+Runs against a local fake yfinance backend, so no network is used:
+
+    python -m fii_data.bench_market_data --latency 0.05
+
+The "cached" column repeats the engine call with a warm QuoteCache.
+"""
+import argparse
+import asyncio
+import time
+
+from fii_data.cache import QuoteCache
+from fii_data.market_data import SYMBOL_SUFFIX, MarketDataEngine
+
+
+class FakeYFinanceBackend:
+    """Simulates Yahoo round trips with a fixed latency per HTTP call."""
+
+    def __init__(self, latency: float, per_symbol: float = 0.0005):
+        self.latency = latency
+        self.per_symbol = per_symbol
+
+    def bars(self, symbols: list) -> dict:
+        time.sleep(self.latency + self.per_symbol * len(symbols))
+        return {symbol: (100.0, 101.0, 99.0) for symbol in symbols}
+
+    def info(self, symbol: str) -> dict:
+        time.sleep(self.latency)
+        return {"longName": f"Fundo {symbol}", "dividendYield": 0.09}
+
+
+def legacy_loop(backend, tickers: list) -> dict:
+    """Mirrors the previous get_fii_data: two blocking round trips per fund, in sequence."""
+    result = {}
+    for ticker in tickers:
+        symbol = f"{ticker}{SYMBOL_SUFFIX}"
+        info = backend.info(symbol)
+        close, high, low = backend.bars([symbol])[symbol]
+        result[ticker] = {
+            "fund_name": info.get('longName', 'Unknown'),
+            "current_price": close,
+            "daily_high": high,
+            "daily_low": low,
+            "dividend_yield": info.get('dividendYield', 0.0),
+            "currency": "BRL",
+            "ticker": ticker
+        }
+    return result
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake HTTP call")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--counts", default="1,5,10,30,60")
+    args = parser.parse_args()
+
+    backend = FakeYFinanceBackend(args.latency)
+    engine = MarketDataEngine(backend=backend, max_workers=args.workers)
+    cached_engine = MarketDataEngine(backend=backend, max_workers=args.workers, cache=QuoteCache())
+
+    print(f"{'tickers':>8} {'loop (s)':>10} {'engine (s)':>11} {'speedup':>8} {'cached (s)':>11}")
+    for count in (int(c) for c in args.counts.split(",")):
+        tickers = [f"FII{i:03d}11" for i in range(count)]
+        loop_time = timed(lambda: legacy_loop(backend, tickers))
+        engine_time = timed(lambda: asyncio.run(engine.afetch(tickers)))
+        asyncio.run(cached_engine.afetch(tickers))
+        cached_time = timed(lambda: asyncio.run(cached_engine.afetch(tickers)))
+        print(
+            f"{count:>8} {loop_time:>10.3f} {engine_time:>11.3f} "
+            f"{loop_time / engine_time:>7.1f}x {cached_time:>11.5f}"
+        )
+
+    print("cache:", cached_engine.cache.stats())
+    engine.close()
+    cached_engine.close()
+
+
+if __name__ == "__main__":
+    main()
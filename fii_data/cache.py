@@ -0,0 +1,219 @@
+"""
+In-process quote cache shared by the FII tools.
+
+Entries are kept per ticker in two tiers with separate TTLs: slow-changing
+metadata (``longName``, ``dividendYield``) and fast-changing OHLC bars. Each tier
+is an LRU-bounded map with a stale-while-revalidate window. An optional SQLite
+file lets a restarted process warm up without refetching.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+META = "meta"
+BARS = "bars"
+
+DEFAULT_META_TTL = 6 * 60 * 60
+DEFAULT_BARS_TTL = 60
+DEFAULT_MAXSIZE = 2048
+
+
+class TTLCache:
+    """
+    LRU-bounded map whose entries are fresh for ``ttl`` seconds and may still be
+    served as stale for another ``stale_ttl`` seconds while they are refreshed.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float = 0.0, maxsize: int = DEFAULT_MAXSIZE, clock=time.time):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, count_miss: bool = True):
+        """Returns a ``(value, status)`` pair where status is FRESH, STALE or MISS.
+
+        With ``count_miss=False`` a miss is left for the caller to ``record``,
+        e.g. after looking further down in another tier.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                age = self.clock() - stored_at
+                if age <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value, FRESH
+                if age <= self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    return value, STALE
+                del self._entries[key]
+            if count_miss:
+                self.misses += 1
+            return None, MISS
+
+    def record(self, status: str):
+        """Counts one lookup answered outside this map."""
+        with self._lock:
+            if status == FRESH:
+                self.hits += 1
+            elif status == STALE:
+                self.stale_hits += 1
+            else:
+                self.misses += 1
+
+    def put(self, key, value, stored_at: float = None):
+        with self._lock:
+            self._entries[key] = (value, self.clock() if stored_at is None else stored_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SqliteTier:
+    """Write-through on-disk copy of the cache, read back on in-memory misses."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.hits = 0  # lookups served from disk, counted by QuoteCache
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS quotes ("
+            " kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, stored_at REAL NOT NULL,"
+            " PRIMARY KEY (kind, key))"
+        )
+        self._conn.commit()
+
+    def get(self, kind: str, key: str):
+        """Returns ``(value, stored_at)`` or ``None``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM quotes WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, kind: str, key: str, value, stored_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO quotes (kind, key, value, stored_at) VALUES (?, ?, ?, ?)",
+                (kind, key, json.dumps(value), stored_at),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class QuoteCache:
+    """Per-ticker cache with a metadata tier and a bars tier."""
+
+    def __init__(
+        self,
+        meta_ttl: float = DEFAULT_META_TTL,
+        bars_ttl: float = DEFAULT_BARS_TTL,
+        stale_ttl: float = None,
+        maxsize: int = DEFAULT_MAXSIZE,
+        path: str = None,
+        clock=time.time,
+    ):
+        self.clock = clock
+        self.tiers = {
+            META: TTLCache(meta_ttl, meta_ttl if stale_ttl is None else stale_ttl, maxsize, clock),
+            BARS: TTLCache(bars_ttl, bars_ttl * 4 if stale_ttl is None else stale_ttl, maxsize, clock),
+        }
+        self.disk = SqliteTier(path) if path else None
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, key: str):
+        """Returns ``(value, status)``; in-memory misses fall back to the disk tier.
+
+        Each call counts once in the tier's stats: a hit (from memory or disk,
+        the latter also in ``disk_hits``) or a single miss.
+        """
+        tier = self.tiers[kind]
+        value, status = tier.get(key, count_miss=self.disk is None)
+        if status != MISS or self.disk is None:
+            return value, status
+        stored = self.disk.get(kind, key)
+        if stored is None or self.clock() - stored[1] > tier.ttl + tier.stale_ttl:
+            tier.record(MISS)
+            return None, MISS
+        value, stored_at = stored
+        self.disk.hits += 1
+        tier.put(key, value, stored_at)
+        status = FRESH if self.clock() - stored_at <= tier.ttl else STALE
+        tier.record(status)
+        return value, status
+
+    def put(self, kind: str, key: str, value):
+        stored_at = self.clock()
+        self.tiers[kind].put(key, value, stored_at)
+        if self.disk is not None:
+            self.disk.put(kind, key, value, stored_at)
+
+    def begin_refresh(self, kind: str, key: str) -> bool:
+        """Claims a background refresh; False if one is already in flight for this key."""
+        with self._lock:
+            if (kind, key) in self._refreshing:
+                return False
+            self._refreshing.add((kind, key))
+            return True
+
+    def end_refresh(self, kind: str, key: str):
+        with self._lock:
+            self._refreshing.discard((kind, key))
+
+    def stats(self) -> dict:
+        stats = {kind: tier.stats() for kind, tier in self.tiers.items()}
+        if self.disk is not None:
+            stats["disk_hits"] = self.disk.hits
+        return stats
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> QuoteCache:
+    """Process-wide cache. Set ``FII_CACHE_DB`` to a file path to enable the disk tier."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = QuoteCache(path=os.getenv("FII_CACHE_DB"))
+        return _default_cache
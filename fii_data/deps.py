@@ -0,0 +1,25 @@
+"""
+Heavy third-party imports used by the FII tools, loaded once on first use.
+
+Importing ``fii_data`` stays cheap; yfinance and pandas are only paid for by the
+first call that actually needs market data.
+"""
+from functools import cache
+
+
+@cache
+def yfinance():
+    import yfinance
+    return yfinance
+
+
+@cache
+def pandas():
+    import pandas
+    return pandas
+
+
+@cache
+def numpy():
+    import numpy
+    return numpy
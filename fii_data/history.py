@@ -0,0 +1,254 @@
+"""
+Local time-series store for FII daily bars and dividend events.
+
+Each ticker owns a directory with two files of fixed-size NumPy records
+(``bars.bin`` and ``dividends.bin``). Bars hold the traded (unadjusted) prices
+and dividends are kept apart, so stored bars never change when a new dividend
+is paid; :func:`adjust` applies the dividends when reading. Refreshing only
+downloads the last ``REFRESH_OVERLAP_DAYS`` before the last stored bar onwards
+and replaces that window, which also rewrites a partial intraday bar. Reads
+are memory-mapped, so a warm store answers range queries without any network
+access.
+"""
+import datetime as dt
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+
+BAR_DTYPE = np.dtype([
+    ("day", "<i4"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+DIVIDEND_DTYPE = np.dtype([("day", "<i4"), ("amount", "<f8")])
+
+BARS_FILE = "bars.bin"
+DIVIDENDS_FILE = "dividends.bin"
+DEFAULT_LOOKBACK_DAYS = 366
+DEFAULT_MAX_AGE = 60 * 60
+# Days before the last stored bar fetched again on each refresh and overwritten
+REFRESH_OVERLAP_DAYS = 7
+FREQUENCIES = ("D", "W", "M")
+# Version 1 stored dividend-adjusted prices; those files are dropped on open.
+STORE_VERSION = 2
+VERSION_FILE = "version"
+
+_EPOCH = dt.date(1970, 1, 1)
+
+
+def to_day(value) -> int:
+    """Converts a date, datetime or ISO string into days since the Unix epoch."""
+    if isinstance(value, str):
+        value = dt.date.fromisoformat(value[:10])
+    if isinstance(value, dt.datetime):
+        value = value.date()
+    return (value - _EPOCH).days
+
+
+def from_day(day: int) -> str:
+    return (_EPOCH + dt.timedelta(days=int(day))).isoformat()
+
+
+class HistoryStore:
+    """Per-ticker columnar store with incremental refresh."""
+
+    def __init__(self, root: str, backend=None):
+        self.root = root
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._maps = {}
+        os.makedirs(root, exist_ok=True)
+        self._check_version()
+
+    def refresh(self, tickers: list, max_age: float = DEFAULT_MAX_AGE) -> list:
+        """
+        Downloads the bars since shortly before the last stored one for each ticker
+        and replaces the stored ones from that day on.
+
+        Args:
+            tickers: Normalized FII tickers (e.g., ["HGLG11", "KNRI11"])
+            max_age: Tickers refreshed less than this many seconds ago are skipped.
+
+        Returns:
+            List of the tickers that were actually fetched.
+        """
+        now = time.time()
+        by_start = {}
+        for ticker in tickers:
+            path = self._path(ticker, BARS_FILE)
+            if os.path.exists(path) and now - os.path.getmtime(path) < max_age:
+                continue
+            last = self.last_day(ticker)
+            start = to_day(dt.date.today()) - DEFAULT_LOOKBACK_DAYS if last is None else last - REFRESH_OVERLAP_DAYS
+            by_start.setdefault(start, []).append(ticker)
+
+        fetched = []
+        for start, group in by_start.items():
+            history = self.backend.history([f"{ticker}.SA" for ticker in group], from_day(start))
+            with self._lock:
+                for ticker in group:
+                    bars, dividends = history.get(f"{ticker}.SA", (None, None))
+                    self._replace(ticker, BARS_FILE, bars, BAR_DTYPE, start)
+                    self._replace(ticker, DIVIDENDS_FILE, dividends, DIVIDEND_DTYPE, start)
+                    if os.path.exists(self._path(ticker, BARS_FILE)):
+                        os.utime(self._path(ticker, BARS_FILE))
+            fetched.extend(group)
+        return fetched
+
+    def read(self, ticker: str, start=None, end=None) -> np.ndarray:
+        """Returns the stored bars of ``ticker`` within ``[start, end]`` as a read-only view."""
+        return _slice(self._map(ticker, BARS_FILE, BAR_DTYPE), start, end)
+
+    def read_adjusted(self, ticker: str, start=None, end=None) -> np.ndarray:
+        """Like :meth:`read`, with prices adjusted for the dividends paid within the range."""
+        return adjust(self.read(ticker, start, end), self.dividends(ticker, start, end))
+
+    def read_many(self, tickers: list, start=None, end=None) -> dict:
+        return {ticker: self.read(ticker, start, end) for ticker in tickers}
+
+    def dividends(self, ticker: str, start=None, end=None) -> np.ndarray:
+        return _slice(self._map(ticker, DIVIDENDS_FILE, DIVIDEND_DTYPE), start, end)
+
+    def last_day(self, ticker: str):
+        path = self._path(ticker, BARS_FILE)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size < BAR_DTYPE.itemsize:
+            return None
+        with open(path, "rb") as f:
+            f.seek(size - size % BAR_DTYPE.itemsize - BAR_DTYPE.itemsize)
+            return int(np.frombuffer(f.read(BAR_DTYPE.itemsize), dtype=BAR_DTYPE)["day"][0])
+
+    def _replace(self, ticker: str, name: str, records, dtype: np.dtype, since: int):
+        """Replaces the stored records from day ``since`` on; an empty download keeps them."""
+        if records is None or len(records) == 0:
+            return
+        records = np.asarray(records, dtype=dtype)
+        records = records[records["day"] >= since]
+        existing = self._map(ticker, name, dtype)
+        kept = existing[:int(np.searchsorted(existing["day"], since, side="left"))]
+        path = self._path(ticker, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A new file swapped in: readers keep the old mapping, and an interrupted write leaves no partial file.
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(kept.tobytes())
+            f.write(records.tobytes())
+        os.replace(tmp, path)
+
+    def _map(self, ticker: str, name: str, dtype: np.dtype) -> np.ndarray:
+        path = self._path(ticker, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return np.empty(0, dtype=dtype)
+        count = stat.st_size // dtype.itemsize
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        # Files are replaced, never modified in place, so a mapping stays valid for its inode and size.
+        key = (stat.st_ino, stat.st_size)
+        cached = self._maps.get(path)
+        if cached is None or cached[0] != key:
+            mapped = np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+            cached = self._maps[path] = (key, mapped.view(np.ndarray))
+        return cached[1]
+
+    def _check_version(self):
+        path = os.path.join(self.root, VERSION_FILE)
+        try:
+            with open(path) as f:
+                version = int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            version = 0
+        if version == STORE_VERSION:
+            return
+        for entry in os.scandir(self.root):
+            if entry.is_dir():
+                shutil.rmtree(entry.path, ignore_errors=True)
+        with open(path, "w") as f:
+            f.write(str(STORE_VERSION))
+
+    def _path(self, ticker: str, name: str) -> str:
+        return os.path.join(self.root, ticker, name)
+
+
+def adjust(bars: np.ndarray, dividends: np.ndarray) -> np.ndarray:
+    """
+    Copy of ``bars`` with prices adjusted for ``dividends``, as Yahoo's adjusted close.
+
+    Every bar before an ex-dividend day is scaled by ``1 - amount / previous close``,
+    so returns across the ex-day include the payout. Dividends on or before the
+    first bar, or after the last one, do not change the range.
+    """
+    out = np.array(bars, dtype=BAR_DTYPE)
+    if len(out) == 0 or len(dividends) == 0:
+        return out
+    index = np.searchsorted(out["day"], dividends["day"], side="left")
+    inside = (index > 0) & (index < len(out))
+    index = index[inside]
+    factors = np.ones(len(out))
+    np.multiply.at(factors, index - 1, 1 - dividends["amount"][inside] / out["close"][index - 1])
+    scale = np.cumprod(factors[::-1])[::-1]
+    for column in ("open", "high", "low", "close"):
+        out[column] *= scale
+    return out
+
+
+def resample(bars: np.ndarray, frequency: str = "D") -> np.ndarray:
+    """
+    Aggregates daily bars into weekly ("W") or monthly ("M") OHLCV bars.
+
+    Each output bar is stamped with the day of the last input bar in its period.
+    """
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"frequency must be one of {FREQUENCIES}, got {frequency!r}")
+    if frequency == "D" or len(bars) == 0:
+        return np.array(bars, dtype=BAR_DTYPE)
+
+    days = bars["day"]
+    if frequency == "W":
+        # 1970-01-01 was a Thursday; shifting by 3 makes weeks start on Monday.
+        keys = (days + 3) // 7
+    else:
+        keys = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(bars)] - 1
+
+    out = np.empty(len(starts), dtype=BAR_DTYPE)
+    out["day"] = days[ends]
+    out["open"] = bars["open"][starts]
+    out["high"] = np.maximum.reduceat(bars["high"], starts)
+    out["low"] = np.minimum.reduceat(bars["low"], starts)
+    out["close"] = bars["close"][ends]
+    out["volume"] = np.add.reduceat(bars["volume"], starts)
+    return out
+
+
+def _slice(records: np.ndarray, start, end) -> np.ndarray:
+    days = records["day"]
+    lo = 0 if start is None else int(np.searchsorted(days, to_day(start), side="left"))
+    hi = len(records) if end is None else int(np.searchsorted(days, to_day(end), side="right"))
+    return records[lo:hi]
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def default_history_store() -> HistoryStore:
+    """Process-wide store under ``FII_HISTORY_DIR`` (defaults to ~/.cache/fii_data/history)."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            from .market_data import YFinanceBackend
+
+            root = os.getenv("FII_HISTORY_DIR") or os.path.join(
+                os.path.expanduser("~"), ".cache", "fii_data", "history"
+            )
+            _default_store = HistoryStore(root, backend=YFinanceBackend())
+        return _default_store
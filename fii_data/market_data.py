@@ -0,0 +1,282 @@
+"""
+Batched market-data engine used by the FII tools.
+
+Price bars for every requested fund come from a single bulk download, while the
+per-fund metadata lookups (``Ticker.info``) run concurrently on a bounded thread
+pool. The backend is injectable so the engine can run against a fake yfinance.
+
+When a :class:`~fii_data.cache.QuoteCache` is attached, fresh entries are served
+without any network call and stale ones are served immediately while a
+background refresh runs on the same pool.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from . import deps
+from .cache import BARS, FRESH, META, MISS, default_cache
+from .records import FiiQuote
+
+DEFAULT_MAX_WORKERS = 8
+SYMBOL_SUFFIX = ".SA"
+META_FIELDS = ("longName", "dividendYield")
+
+
+class YFinanceBackend:
+    """Adapter over yfinance. The library is imported on first use only."""
+
+    def __init__(self, period: str = "1d"):
+        self.period = period
+
+    def bars(self, symbols: list) -> dict:
+        """
+        Downloads the latest bar of every symbol in one request.
+
+        Args:
+            symbols: Yahoo symbols (e.g., ["HGLG11.SA", "KNRI11.SA"])
+
+        Returns:
+            Dictionary mapping each symbol to a (close, high, low) tuple.
+            Symbols without price data are left out.
+        """
+        data = deps.yfinance().download(
+            symbols,
+            period=self.period,
+            group_by="ticker",
+            auto_adjust=True,
+            threads=True,
+            progress=False,
+        )
+        multi = isinstance(data.columns, deps.pandas().MultiIndex)
+        result = {}
+        for symbol in symbols:
+            if multi:
+                if symbol not in data.columns.get_level_values(0):
+                    continue
+                frame = data[symbol]
+            else:
+                frame = data
+            frame = frame.dropna(subset=["Close"])
+            if frame.empty:
+                continue
+            last = frame.iloc[-1]
+            result[symbol] = (float(last["Close"]), float(last["High"]), float(last["Low"]))
+        return result
+
+    def info(self, symbol: str) -> dict:
+        return deps.yfinance().Ticker(symbol).info
+
+    def history(self, symbols: list, start: str) -> dict:
+        """
+        Downloads daily bars and dividend events since ``start`` in one request.
+
+        Args:
+            symbols: Yahoo symbols (e.g., ["HGLG11.SA", "KNRI11.SA"])
+            start: First day to download, as an ISO date.
+
+        Returns:
+            Dictionary mapping each symbol to a ``(bars, dividends)`` pair of
+            record arrays in the layout of :mod:`fii_data.history`, with
+            unadjusted prices.
+        """
+        from .history import BAR_DTYPE, DIVIDEND_DTYPE
+
+        np = deps.numpy()
+        data = deps.yfinance().download(
+            symbols,
+            start=start,
+            interval="1d",
+            group_by="ticker",
+            # Traded prices: the store applies the dividends when reading (history.adjust)
+            auto_adjust=False,
+            actions=True,
+            threads=True,
+            progress=False,
+        )
+        multi = isinstance(data.columns, deps.pandas().MultiIndex)
+        result = {}
+        for symbol in symbols:
+            if multi:
+                if symbol not in data.columns.get_level_values(0):
+                    continue
+                frame = data[symbol]
+            else:
+                frame = data
+            frame = frame.dropna(subset=["Close"])
+            days = (frame.index.values.astype("datetime64[D]").astype(np.int64)).astype("<i4")
+
+            bars = np.empty(len(frame), dtype=BAR_DTYPE)
+            bars["day"] = days
+            for column in ("Open", "High", "Low", "Close", "Volume"):
+                bars[column.lower()] = frame[column].to_numpy(dtype="f8")
+
+            paid = frame["Dividends"].to_numpy(dtype="f8") if "Dividends" in frame else np.zeros(len(frame))
+            dividends = np.empty(int((paid > 0).sum()), dtype=DIVIDEND_DTYPE)
+            dividends["day"] = days[paid > 0]
+            dividends["amount"] = paid[paid > 0]
+            result[symbol] = (bars, dividends)
+        return result
+
+
+class MarketDataEngine:
+    """Fetches FII quotes with one bulk bar download plus concurrent metadata lookups."""
+
+    def __init__(self, backend=None, max_workers: int = DEFAULT_MAX_WORKERS, cache=None):
+        self.backend = backend or YFinanceBackend()
+        self.max_workers = max_workers
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fii-data")
+
+    def fetch(self, tickers: list) -> dict:
+        """Blocking variant of :meth:`afetch`, for callers without an event loop."""
+        tickers = _unique(tickers)
+        if not tickers:
+            return {}
+        bars, infos, missing_bars, missing_info = self._lookup(tickers)
+
+        bars_future = self._executor.submit(self._load_bars, missing_bars) if missing_bars else None
+        info_futures = {symbol: self._executor.submit(self._load_info, symbol) for symbol in missing_info}
+        wait([f for f in (bars_future, *info_futures.values()) if f is not None])
+
+        if bars_future is not None:
+            _merge_bars(bars, missing_bars, _outcome(bars_future))
+        for symbol, future in info_futures.items():
+            infos[symbol] = _outcome(future)
+        return self._assemble(tickers, bars, infos)
+
+    async def afetch(self, tickers: list) -> dict:
+        """
+        Retrieves quotes for all tickers without blocking the event loop.
+
+        Args:
+            tickers: FII ticker symbols without the exchange suffix (e.g., ["HGLG11", "KNRI11"])
+
+        Returns:
+            Dictionary mapping each ticker to a :class:`FiiQuote`. Funds that could
+            not be fetched get a quote carrying the error instead of prices.
+        """
+        tickers = _unique(tickers)
+        if not tickers:
+            return {}
+        bars, infos, missing_bars, missing_info = self._lookup(tickers)
+
+        loop = asyncio.get_running_loop()
+        calls = [loop.run_in_executor(self._executor, self._load_info, symbol) for symbol in missing_info]
+        if missing_bars:
+            calls.append(loop.run_in_executor(self._executor, self._load_bars, missing_bars))
+        outcomes = await asyncio.gather(*calls, return_exceptions=True)
+
+        if missing_bars:
+            _merge_bars(bars, missing_bars, outcomes.pop())
+        infos.update(zip(missing_info, outcomes))
+        return self._assemble(tickers, bars, infos)
+
+    def _lookup(self, tickers: list):
+        """Serves what the cache can and returns the symbols that must be fetched now."""
+        symbols = [f"{ticker}{SYMBOL_SUFFIX}" for ticker in tickers]
+        if self.cache is None:
+            return {}, {}, symbols, symbols
+
+        bars, infos = {}, {}
+        missing_bars, missing_info, stale_bars, stale_info = [], [], [], []
+        for symbol in symbols:
+            for kind, found, missing, stale in (
+                (BARS, bars, missing_bars, stale_bars),
+                (META, infos, missing_info, stale_info),
+            ):
+                value, status = self.cache.get(kind, symbol)
+                if status == MISS:
+                    missing.append(symbol)
+                    continue
+                found[symbol] = value
+                if status != FRESH and self.cache.begin_refresh(kind, symbol):
+                    stale.append(symbol)
+
+        if stale_bars:
+            self._executor.submit(self._revalidate, BARS, stale_bars)
+        for symbol in stale_info:
+            self._executor.submit(self._revalidate, META, [symbol])
+        return bars, infos, missing_bars, missing_info
+
+    def _load_bars(self, symbols: list) -> dict:
+        bars = self.backend.bars(symbols)
+        if self.cache is not None:
+            for symbol, value in bars.items():
+                self.cache.put(BARS, symbol, list(value))
+        return bars
+
+    def _load_info(self, symbol: str) -> dict:
+        info = self.backend.info(symbol)
+        info = {field: info[field] for field in META_FIELDS if field in info}
+        if self.cache is not None:
+            self.cache.put(META, symbol, info)
+        return info
+
+    def _revalidate(self, kind: str, symbols: list):
+        try:
+            if kind == BARS:
+                self._load_bars(symbols)
+            else:
+                self._load_info(symbols[0])
+        except Exception:
+            # The stale entry keeps being served until a later refresh succeeds.
+            pass
+        finally:
+            for symbol in symbols:
+                self.cache.end_refresh(kind, symbol)
+
+    def _assemble(self, tickers: list, bars: dict, infos: dict) -> dict:
+        result = {}
+        for ticker in tickers:
+            symbol = f"{ticker}{SYMBOL_SUFFIX}"
+            bar = bars.get(symbol)
+            info = infos.get(symbol)
+            if isinstance(bar, BaseException):
+                result[ticker] = FiiQuote.failed(ticker, bar)
+            elif isinstance(info, BaseException):
+                result[ticker] = FiiQuote.failed(ticker, info)
+            elif bar is None:
+                result[ticker] = FiiQuote.failed(ticker, f"no price data found for {symbol}")
+            else:
+                close, high, low = bar
+                result[ticker] = FiiQuote(
+                    ticker=ticker,
+                    fund_name=info.get('longName', 'Unknown'),
+                    current_price=close,
+                    daily_high=high,
+                    daily_low=low,
+                    dividend_yield=info.get('dividendYield', 0.0),
+                )
+        return result
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+_shared_engine = None
+_shared_lock = threading.Lock()
+
+
+def shared_engine() -> MarketDataEngine:
+    """Engine backed by yfinance and the process-wide quote cache, shared by all agents."""
+    global _shared_engine
+    with _shared_lock:
+        if _shared_engine is None:
+            _shared_engine = MarketDataEngine(cache=default_cache())
+        return _shared_engine
+
+
+def _unique(tickers) -> list:
+    return list(dict.fromkeys(ticker for ticker in tickers if ticker))
+
+
+def _outcome(future):
+    exc = future.exception()
+    return exc if exc is not None else future.result()
+
+
+def _merge_bars(bars: dict, requested: list, outcome):
+    if isinstance(outcome, BaseException):
+        bars.update((symbol, outcome) for symbol in requested)
+    else:
+        bars.update(outcome)
@@ -0,0 +1,38 @@
+"""Compact record type returned by the FII market-data engine."""
+from dataclasses import dataclass
+
+
+@dataclass(slots=True, frozen=True)
+class FiiQuote:
+    """Latest quote of one fund, or the error that prevented fetching it."""
+
+    ticker: str
+    fund_name: str = "Unknown"
+    current_price: float = None
+    daily_high: float = None
+    daily_low: float = None
+    dividend_yield: float = 0.0
+    currency: str = "BRL"
+    error: str = None
+
+    @classmethod
+    def failed(cls, ticker: str, error) -> "FiiQuote":
+        return cls(ticker=ticker, error=f"Failed to retrieve FII information: {str(error)}")
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> dict:
+        """Tool-response shape, kept identical to the original ``get_fii_data`` output."""
+        if self.error is not None:
+            return {"error": self.error, "ticker": self.ticker}
+        return {
+            "fund_name": self.fund_name,
+            "current_price": self.current_price,
+            "daily_high": self.daily_high,
+            "daily_low": self.daily_low,
+            "dividend_yield": self.dividend_yield,
+            "currency": self.currency,
+            "ticker": self.ticker,
+        }
@@ -0,0 +1,62 @@
+"""Normalization of the ticker arguments the agents hand to the FII tools."""
+import re
+
+_SEPARATORS = re.compile(r"[\s,;]+")
+_TICKER = re.compile(r"[A-Z]{4}\d{2}")
+_QUOTES = "'\"{}[]()"
+
+
+def normalize_tickers(tickers) -> list:
+    """
+    Turns any ticker input into an ordered list of unique, upper-case symbols.
+
+    Args:
+        tickers: A comma/space separated string (e.g., "HGLG11, KNRI11"), or any
+            iterable of symbols (list, tuple, set or the keys of a dict).
+
+    Returns:
+        List of tickers without the ".SA" exchange suffix, in first-seen order.
+    """
+    if tickers is None:
+        return []
+    if isinstance(tickers, str):
+        items = _SEPARATORS.split(tickers)
+    else:
+        items = (str(ticker) for ticker in tickers)
+
+    result = {}
+    for item in items:
+        ticker = item.strip().strip(_QUOTES).strip().upper()
+        if ticker.endswith(".SA"):
+            ticker = ticker[:-3]
+        if ticker:
+            result[ticker] = None
+    return list(result)
+
+
+def is_ticker_list(text: str) -> bool:
+    """
+    Whether ``text`` is only FII tickers (e.g., "HGLG11,KNRI11"), as ``tickers_string`` must be.
+
+    Args:
+        text: Model output to validate; quotes and separators are tolerated.
+
+    Returns:
+        True if it holds at least one ticker and nothing but tickers.
+    """
+    tickers = normalize_tickers(text)
+    return bool(tickers) and all(_TICKER.fullmatch(ticker) for ticker in tickers)
+
+
+def extract_tickers(text: str):
+    """
+    Rewrites a prose answer that mentions tickers as the comma-separated list ``tickers_string`` expects.
+
+    Args:
+        text: Model output, e.g. "Os fundos são HGLG11 e KNRI11.SA".
+
+    Returns:
+        The tickers in first-seen order (e.g., "HGLG11,KNRI11"), or None if the text has none.
+    """
+    tickers = dict.fromkeys(_TICKER.findall(text.upper()))
+    return ",".join(tickers) or None
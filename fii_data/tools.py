@@ -0,0 +1,114 @@
+"""ADK function tools over the shared FII market-data engine."""
+from . import deps
+from .market_data import shared_engine
+from .tickers import normalize_tickers
+
+
+def quotes_to_response(quotes: dict) -> dict:
+    """Serializes engine records into the JSON-friendly tool response."""
+    return {ticker: quote.to_dict() for ticker, quote in quotes.items()}
+
+
+async def get_fii_data(tickers_string: str) -> dict:
+    """
+    Retrieves the current data for multiple Brazilian Real Estate Investment Funds (FIIs).
+
+    Args:
+        tickers_string: A string with FII ticker symbols separated by commas (e.g., "HGLG11,KNRI11,XPLG11")
+
+    Returns:
+        Dictionary with ticker symbols as keys and their respective information as values,
+        including current price, daily high/low, dividend yield and fund name.
+    """
+    quotes = await shared_engine().afetch(normalize_tickers(tickers_string))
+    return quotes_to_response(quotes)
+
+
+async def get_fii_history(tickers_string: str, start: str, end: str, frequency: str) -> dict:
+    """
+    Retrieves the price and dividend history of multiple FIIs from the local time-series store.
+
+    Args:
+        tickers_string: A string with FII ticker symbols separated by commas (e.g., "HGLG11,KNRI11,XPLG11")
+        start: First date of the range as YYYY-MM-DD, or an empty string for one year ago.
+        end: Last date of the range as YYYY-MM-DD, or an empty string for today.
+        frequency: "D" for daily, "W" for weekly or "M" for monthly closes.
+
+    Returns:
+        Dictionary with ticker symbols as keys and, for each fund, the closes in the
+        requested frequency, period return, annualized volatility and dividends paid.
+    """
+    import asyncio
+    import datetime as dt
+
+    from .history import FREQUENCIES, default_history_store, from_day, resample
+
+    np = deps.numpy()
+    frequency = (frequency or "W").upper()
+    if frequency not in FREQUENCIES:
+        return {"error": f"Unsupported frequency {frequency!r}; use one of {', '.join(FREQUENCIES)}"}
+    tickers = normalize_tickers(tickers_string)
+    store = default_history_store()
+    await asyncio.to_thread(store.refresh, tickers)
+
+    start = start or (dt.date.today() - dt.timedelta(days=365)).isoformat()
+    end = end or None
+    result = {}
+    for ticker in tickers:
+        # Prices adjusted for the dividends in the range, so returns and volatility include them
+        bars = store.read_adjusted(ticker, start, end)
+        if len(bars) == 0:
+            result[ticker] = {"error": "No history available for this FII", "ticker": ticker}
+            continue
+        closes = bars["close"]
+        returns = np.diff(np.log(closes))
+        dividends = store.dividends(ticker, start, end)
+        sampled = resample(bars, frequency)
+        result[ticker] = {
+            "ticker": ticker,
+            "frequency": frequency,
+            "closes": [[from_day(day), round(float(close), 4)] for day, close in zip(sampled["day"], sampled["close"])],
+            "period_return": float(closes[-1] / closes[0] - 1),
+            "annualized_volatility": float(returns.std() * np.sqrt(252)) if len(returns) > 1 else 0.0,
+            "dividends": [[from_day(day), float(amount)] for day, amount in zip(dividends["day"], dividends["amount"])],
+            "total_dividends": float(dividends["amount"].sum()),
+        }
+    return result
+
+
+async def compare_fiis(tickers_string: str) -> dict:
+    """
+    Computes comparison metrics across multiple FIIs in a single vectorized pass.
+
+    Args:
+        tickers_string: A string with FII ticker symbols separated by commas (e.g., "HGLG11,KNRI11,XPLG11")
+
+    Returns:
+        Dictionary with a compact table ("columns" and "rows", ordered by dividend yield)
+        holding yield rank and z-score, intraday range %, price vs. 20/50-day moving
+        averages, price z-score, mean return correlation and closest peer, plus the
+        tickers that could not be compared.
+    """
+    import asyncio
+
+    from .analytics import DEFAULT_WINDOW, closes_matrix, compare
+    from .history import default_history_store
+
+    tickers = normalize_tickers(tickers_string)
+    store = default_history_store()
+    quotes, _ = await asyncio.gather(
+        shared_engine().afetch(tickers),
+        asyncio.to_thread(store.refresh, tickers),
+    )
+
+    valid = [quote for quote in quotes.values() if quote.ok]
+    table = compare(
+        [quote.ticker for quote in valid],
+        [quote.current_price for quote in valid],
+        [quote.daily_high for quote in valid],
+        [quote.daily_low for quote in valid],
+        [quote.dividend_yield or 0.0 for quote in valid],
+        closes_matrix([store.read_adjusted(quote.ticker)["close"] for quote in valid], DEFAULT_WINDOW),
+    )
+    table["failed"] = [quote.ticker for quote in quotes.values() if not quote.ok]
+    return table